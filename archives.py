@@ -0,0 +1,134 @@
+"""
+Archives
+Reads the members of zip and tar bundles straight from the archive, on a background
+thread that stays a few members ahead of the parser, so handoff packages validate in
+a single pass without being unpacked. Members are reported as 'archive.zip!/path'.
+"""
+
+import os
+import queue
+import posixpath
+import threading
+import time
+import zlib
+
+from config import ARCHIVE_READ_AHEAD, ARCHIVE_MAX_MEMBER_BYTES
+
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tgz", ".tar.gz", ".tbz2", ".tar.bz2", ".txz", ".tar.xz")
+
+_COMPRESSED_TAR_EXTENSIONS = (".gz", ".bz2", ".xz")
+_END = object()
+
+def file_extension(name: str) -> str:
+    """Returns the lower-case extension of name, keeping compound ones such as '.tar.gz' whole."""
+    extension = os.path.splitext(name)[1].lower()
+    if extension in _COMPRESSED_TAR_EXTENSIONS and name[:-len(extension)].lower().endswith(".tar"):
+        return ".tar" + extension
+    return extension
+
+def is_archive(path: str) -> bool:
+    return file_extension(path) in ARCHIVE_EXTENSIONS
+
+def member_prefix(archive_path: str) -> str:
+    """Returns 'archive_path!/', which the paths of all of the archive's members start with."""
+    return f"{archive_path}!/"
+
+def member_path(archive_path: str, member_name: str) -> str:
+    """Returns 'archive_path!/member', with the member name normalised so './x' and 'x' match."""
+    # tar files made with 'tar -C dir .' name every member './...'.
+    return member_prefix(archive_path) + posixpath.normpath(member_name).lstrip('/')
+
+def _iter_members(stream, extension: str, extensions):
+    """
+    Yields (member name, extension, bytes or the exception met reading the member) for the
+    archive's regular files with one of the given extensions, in archive order.
+    Raises if the archive itself cannot be read.
+    """
+    # zipfile and tarfile are imported on first use; most runs never open an archive.
+    import tarfile
+    import zipfile
+
+    member_errors = (zipfile.BadZipFile, tarfile.TarError, zlib.error, EOFError, RuntimeError, NotImplementedError,
+                     OSError)
+    if extension == ".zip":
+        with zipfile.ZipFile(stream) as archive:
+            for info in archive.infolist():
+                member_extension = file_extension(info.filename)
+                if info.is_dir() or member_extension not in extensions:
+                    continue
+                if info.file_size > ARCHIVE_MAX_MEMBER_BYTES:
+                    yield info.filename, member_extension, ValueError("Archive member is too large to validate")
+                    continue
+                try:
+                    yield info.filename, member_extension, archive.read(info)
+                except member_errors as e:
+                    yield info.filename, member_extension, e
+    else:
+        # Members are taken in order, so the archive is still decompressed front to back
+        # once; random-access mode just reads headers much faster than stream mode.
+        with tarfile.open(fileobj=stream, mode="r:*") as archive:
+            for info in archive:
+                member_extension = file_extension(info.name)
+                if not info.isfile() or member_extension not in extensions:
+                    continue
+                if info.size > ARCHIVE_MAX_MEMBER_BYTES:
+                    yield info.name, member_extension, ValueError("Archive member is too large to validate")
+                    continue
+                try:
+                    data = archive.extractfile(info).read()
+                except member_errors as e:
+                    yield info.name, member_extension, e
+                    continue
+                yield info.name, member_extension, data
+
+def read_members(archive_path: str, extension: str, extensions, stream=None):
+    """
+    Yields (member path, extension, bytes or exception, seconds spent waiting) for each
+    matching member. Members are decompressed on a background thread up to
+    ARCHIVE_READ_AHEAD members ahead of the consumer. stream, if given, is a binary
+    file object over the archive, e.g. from a prefetched FileBuffer; otherwise the file
+    is opened. Raises if the archive itself cannot be read. Close the generator to stop early.
+    """
+    members = queue.Queue(maxsize=ARCHIVE_READ_AHEAD)
+    stop = threading.Event()
+
+    def put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                members.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            source = stream if stream is not None else open(archive_path, "rb")
+            try:
+                for member in _iter_members(source, extension, extensions):
+                    if not put(member):
+                        return
+            finally:
+                if stream is None:
+                    source.close()
+        except Exception as e:
+            put(e)
+        finally:
+            put(_END)
+
+    reader = threading.Thread(target=produce, name="archive-reader", daemon=True)
+    reader.start()
+    try:
+        while True:
+            started = time.perf_counter()
+            member = members.get()
+            waited = time.perf_counter() - started
+            if member is _END:
+                return
+            if isinstance(member, Exception):
+                raise member
+            name, member_extension, data = member
+            yield member_path(archive_path, name), member_extension, data, waited
+    finally:
+        stop.set()
+        reader.join()
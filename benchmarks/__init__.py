@@ -0,0 +1,11 @@
+"""
+Benchmarks
+Deterministic synthetic corpora and a headless runner that reports throughput,
+peak memory and latency as JSON, so runs can be diffed to catch regressions.
+
+    python -m benchmarks run smoke
+    python -m benchmarks compare before.json after.json
+"""
+
+from benchmarks.corpus import CorpusSpec, PROFILES, generate_corpus
+from benchmarks.runner import run_benchmark, compare_results
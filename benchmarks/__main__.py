@@ -0,0 +1,83 @@
+"""
+Benchmark Command Line
+    python -m benchmarks generate PROFILE [--corpus DIR]
+    python -m benchmarks run PROFILE [--corpus DIR] [--workers N] [--syntax-only] [--repeat N] [--output FILE]
+    python -m benchmarks compare OLD.json NEW.json [--threshold PERCENT]
+"""
+
+import os
+import sys
+import json
+import argparse
+
+from benchmarks.corpus import PROFILES, generate_corpus, dtd_paths
+from benchmarks.runner import run_benchmark, compare_results
+
+DEFAULT_CORPUS_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpora")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Validator benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("generate", "run"):
+        command = commands.add_parser(name, help=f"{name.capitalize()} a benchmark profile.")
+        command.add_argument("profile", choices=sorted(PROFILES))
+        command.add_argument("--corpus", metavar="DIR",
+                             help=f"Corpus directory (default: {DEFAULT_CORPUS_ROOT}{os.sep}<profile>).")
+        command.add_argument("--no-dtd", action="store_true", help="Generate XML files without DOCTYPEs or DTDs.")
+        command.add_argument("--seed", type=int, default=0, help="Corpus seed (default: 0).")
+
+    run = commands.choices["run"]
+    run.add_argument("--workers", type=int, default=1, metavar="N", help="Validation processes (default: 1).")
+    run.add_argument("--syntax-only", action="store_true", help="Benchmark the syntax-only mode.")
+    run.add_argument("--repeat", type=int, default=3, metavar="N", help="Runs to take the median of (default: 3).")
+    run.add_argument("--output", metavar="FILE", help="Write the JSON result to FILE instead of stdout.")
+
+    compare = commands.add_parser("compare", help="Compare two JSON results and flag regressions.")
+    compare.add_argument("old")
+    compare.add_argument("new")
+    compare.add_argument("--threshold", type=float, default=5.0, metavar="PERCENT",
+                         help="Change treated as a regression (default: 5).")
+    return parser
+
+def _prepare_corpus(args):
+    spec = PROFILES[args.profile]._replace(with_dtd=not args.no_dtd, seed=args.seed)
+    corpus_dir = args.corpus or os.path.join(DEFAULT_CORPUS_ROOT, args.profile)
+
+    def progress(done: int, total: int):
+        if done == total or done % 1000 == 0:
+            print(f"\rGenerating {args.profile}: {done}/{total}", end="", file=sys.stderr, flush=True)
+
+    if generate_corpus(corpus_dir, spec, progress):
+        print(file=sys.stderr)
+    return corpus_dir, spec
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.old, encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new = json.load(f)
+        lines, regressed = compare_results(old, new, args.threshold)
+        print("\n".join(lines))
+        return 1 if regressed else 0
+
+    corpus_dir, spec = _prepare_corpus(args)
+    if args.command == "generate":
+        return 0
+
+    result = run_benchmark(corpus_dir, dtd_paths(corpus_dir, spec), args.workers, args.syntax_only, args.repeat)
+    result["profile"] = args.profile
+    result["corpus"] = spec._asdict()
+    output = json.dumps(result, indent=2, sort_keys=True) + "\n"
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        sys.stdout.write(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Corpus Generator
+Writes reproducible JSON, XML, DITA, XLIFF, PO and YAML test files. The same spec
+and seed always produce byte-identical files. Files are streamed to disk, so
+multi-gigabyte profiles need no more memory than small ones.
+"""
+
+import os
+import json
+import random
+from typing import NamedTuple
+
+FORMATS = ("json", "xml", "dita", "xliff", "po", "yaml")
+
+_EXTENSIONS = {"json": ".json", "xml": ".xml", "dita": ".dita", "xliff": ".xlf", "po": ".po", "yaml": ".yaml"}
+_FILES_PER_DIR = 1000
+_MANIFEST_NAME = ".benchmark_corpus"
+_WORDS = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet")
+
+class CorpusSpec(NamedTuple):
+    """
+    Shape of a synthetic corpus. files is the total across formats, spread evenly;
+    file_size is the approximate size of each file in bytes; depth is the nesting
+    depth of each record; error_rate is the fraction of files with an injected error.
+    """
+    files: int
+    file_size: int
+    depth: int = 3
+    error_rate: float = 0.05
+    formats: tuple[str, ...] = FORMATS
+    with_dtd: bool = True
+    seed: int = 0
+
+PROFILES = {
+    "smoke": CorpusSpec(files=600, file_size=2_000, depth=4, error_rate=0.1),
+    "small-files-100k": CorpusSpec(files=100_000, file_size=1_000, depth=3, error_rate=0.01),
+    "deep-nesting": CorpusSpec(files=600, file_size=50_000, depth=40, error_rate=0.05),
+    "medium-files": CorpusSpec(files=300, file_size=5_000_000, depth=5, error_rate=0.05),
+    # Large enough to go through the streaming XML path; JSON, PO and YAML are loaded whole, so they are left out.
+    "few-large-files": CorpusSpec(files=4, file_size=2 * 1024 ** 3, depth=6, error_rate=0.5, formats=("xml", "xliff")),
+}
+
+# --- DTDs -----------------------------------------------------------------------
+
+_DTDS = {
+    "bench.dtd": """<!-- Benchmark corpus DTD for generic XML.
+     PUBLIC "-//BENCH//DTD Bench Root//EN" -->
+<!ELEMENT root (section)*>
+<!ELEMENT section (title, (item | section)*)>
+<!ATTLIST section id ID #REQUIRED>
+<!ELEMENT title (#PCDATA)>
+<!ELEMENT item (#PCDATA)>
+<!ATTLIST item n CDATA #IMPLIED>
+""",
+    "topic.dtd": """<!-- Benchmark corpus DTD for DITA-like topics.
+     PUBLIC "-//BENCH//DTD Topic//EN" -->
+<!ELEMENT topic (title, body)>
+<!ATTLIST topic id ID #REQUIRED>
+<!ELEMENT title (#PCDATA)>
+<!ELEMENT body (section)*>
+<!ELEMENT section (p | section)*>
+<!ELEMENT p (#PCDATA)>
+""",
+    "xliff.dtd": """<!-- Benchmark corpus DTD for XLIFF 1.2-like files.
+     PUBLIC "-//BENCH//DTD XLIFF//EN" -->
+<!ELEMENT xliff (file)>
+<!ATTLIST xliff version CDATA #REQUIRED>
+<!ELEMENT file (body)>
+<!ATTLIST file original CDATA #REQUIRED source-language CDATA #REQUIRED datatype CDATA #REQUIRED>
+<!ELEMENT body (group | trans-unit)*>
+<!ELEMENT group (group | trans-unit)*>
+<!ELEMENT trans-unit (source, target?)>
+<!ATTLIST trans-unit id CDATA #REQUIRED>
+<!ELEMENT source (#PCDATA)>
+<!ELEMENT target (#PCDATA)>
+""",
+}
+
+_DOCTYPES = {
+    "xml": '<!DOCTYPE root PUBLIC "-//BENCH//DTD Bench Root//EN" "bench.dtd">\n',
+    "dita": '<!DOCTYPE topic PUBLIC "-//BENCH//DTD Topic//EN" "topic.dtd">\n',
+    "xliff": '<!DOCTYPE xliff PUBLIC "-//BENCH//DTD XLIFF//EN" "xliff.dtd">\n',
+}
+
+def dtd_paths(corpus_dir: str, spec: CorpusSpec) -> list[str]:
+    """Returns the DTDs a corpus should be validated against (none when generated without DTDs)."""
+    if not spec.with_dtd:
+        return []
+    return [os.path.join(corpus_dir, "dtd", name) for name in sorted(_DTDS)]
+
+# --- Record writers ---------------------------------------------------------------
+# Each writer returns one record as a string; `broken` asks for an injected error.
+
+def _text(rng: random.Random, words: int = 4) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+def _json_record(rng: random.Random, depth: int, broken: bool) -> str:
+    record = node = {}
+    for level in range(depth):
+        node["id"] = rng.randrange(1_000_000)
+        node["name"] = _text(rng)
+        node["tags"] = [rng.choice(_WORDS) for _ in range(3)]
+        if level < depth - 1:
+            node["child"] = {}
+            node = node["child"]
+    text = json.dumps(record)
+    # A trailing comma before the closing brace.
+    return text[:-1] + ",}" if broken else text
+
+def _xml_record(rng: random.Random, depth: int, broken: bool, index: int) -> str:
+    bad = rng.choice(("<item>fish & chips</item>", "<bogus/>")) if broken else ""
+    opening = "".join(f'<section id="s{index}_{level}"><title>{_text(rng, 2)}</title>' for level in range(depth))
+    items = "".join(f'<item n="{rng.randrange(100)}">{_text(rng)}</item>' for _ in range(3))
+    return opening + items + bad + "</section>" * depth + "\n"
+
+def _dita_record(rng: random.Random, depth: int, broken: bool, index: int) -> str:
+    bad = rng.choice(("<p>salt & pepper</p>", "<bogus/>")) if broken else ""
+    body = f"<p>{_text(rng, 6)}</p>" * 2
+    return "<section>" * depth + body + bad + "</section>" * depth + "\n"
+
+def _xliff_record(rng: random.Random, depth: int, broken: bool, index: int) -> str:
+    bad = rng.choice(("<source>R&D</source>", "<bogus/>")) if broken else ""
+    unit = (f'<trans-unit id="u{index}"><source>{_text(rng)}</source>'
+            f'<target>{_text(rng)}</target>{bad}</trans-unit>')
+    return "<group>" * (depth - 1) + unit + "</group>" * (depth - 1) + "\n"
+
+def _po_record(rng: random.Random, depth: int, broken: bool, index: int) -> str:
+    if broken:
+        return "this line is not valid PO syntax\n\n"
+    context = f'msgctxt "ctx{index}"\n' if depth > 1 else ""
+    return f'{context}msgid "{_text(rng)} {index}"\nmsgstr "{_text(rng)}"\n\n'
+
+def _yaml_record(rng: random.Random, depth: int, broken: bool) -> str:
+    lines = []
+    for level in range(depth):
+        indent = "  " * level
+        prefix = "- " if level == 0 else "  "
+        lines.append(f"{indent}{prefix}id: {rng.randrange(1_000_000)}")
+        lines.append(f"{indent}  name: {_text(rng)}")
+        lines.append(f"{indent}  tags: [{', '.join(rng.choice(_WORDS) for _ in range(3))}]")
+        if level < depth - 1:
+            lines.append(f"{indent}  child:")
+    if broken:
+        lines.append("  unclosed: [a, b")
+    return "\n".join(lines) + "\n"
+
+# --- File writers -----------------------------------------------------------------
+
+_HEADERS = {
+    "json": '{"items": [',
+    "xml": "<root>\n",
+    "dita": '<topic id="bench"><title>Benchmark topic</title><body>\n',
+    "xliff": '<xliff version="1.2"><file original="bench" source-language="en" datatype="plaintext"><body>\n',
+    "po": 'msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n\n',
+    "yaml": "",
+}
+_FOOTERS = {
+    "json": "]}\n",
+    "xml": "</root>\n",
+    "dita": "</body></topic>\n",
+    "xliff": "</body></file></xliff>\n",
+    "po": "",
+    "yaml": "",
+}
+
+_RECORD_WRITERS = {"xml": _xml_record, "dita": _dita_record, "xliff": _xliff_record, "po": _po_record}
+
+def _write_file(path: str, file_format: str, spec: CorpusSpec, rng: random.Random, broken: bool):
+    """Streams records into path until it reaches roughly spec.file_size bytes."""
+    # Where in the file the single injected error goes, as a byte offset.
+    error_at = rng.randrange(max(1, spec.file_size)) if broken else -1
+    with open(path, "w", encoding="utf-8", newline="\n") as out:
+        header = _HEADERS[file_format]
+        if file_format in _DOCTYPES:
+            header = '<?xml version="1.0" encoding="UTF-8"?>\n' + (_DOCTYPES[file_format] if spec.with_dtd else "") + header
+        out.write(header)
+        written = len(header)
+        index = 0
+        pending = []
+        pending_size = 0
+        while index == 0 or written < spec.file_size or error_at >= 0:
+            # The last record carries the error if the file filled up before reaching error_at.
+            inject = 0 <= error_at and (error_at <= written or written >= spec.file_size)
+            if inject:
+                error_at = -1
+            if file_format == "json":
+                record = ("," if index else "") + _json_record(rng, spec.depth, inject)
+            elif file_format == "yaml":
+                record = _yaml_record(rng, spec.depth, inject)
+            else:
+                record = _RECORD_WRITERS[file_format](rng, spec.depth, inject, index)
+            pending.append(record)
+            pending_size += len(record)
+            written += len(record)
+            index += 1
+            if pending_size >= 1024 * 1024:
+                out.write("".join(pending))
+                pending.clear()
+                pending_size = 0
+        out.write("".join(pending))
+        out.write(_FOOTERS[file_format])
+
+def generate_corpus(corpus_dir: str, spec: CorpusSpec, progress=None) -> bool:
+    """
+    Writes the corpus described by spec into corpus_dir, laid out as
+    <format>/<batch>/file_<n>.<ext> with the DTDs under dtd/. Returns False without
+    writing anything when corpus_dir already holds a corpus generated from the same spec.
+    progress(done, total) is called after each file, if given.
+    """
+    manifest_path = os.path.join(corpus_dir, _MANIFEST_NAME)
+    manifest = json.dumps(spec._asdict(), sort_keys=True)
+    if os.path.isfile(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            if f.read() == manifest:
+                return False
+        os.remove(manifest_path)
+
+    if spec.with_dtd:
+        os.makedirs(os.path.join(corpus_dir, "dtd"), exist_ok=True)
+        for name, content in _DTDS.items():
+            with open(os.path.join(corpus_dir, "dtd", name), "w", encoding="utf-8", newline="\n") as f:
+                f.write(content)
+
+    for file_number in range(spec.files):
+        file_format = spec.formats[file_number % len(spec.formats)]
+        index = file_number // len(spec.formats)
+        # Seeded per file, so each file is reproducible on its own.
+        rng = random.Random(f"{spec.seed}:{file_format}:{index}")
+        broken = rng.random() < spec.error_rate
+        directory = os.path.join(corpus_dir, file_format, f"{index // _FILES_PER_DIR:04d}")
+        os.makedirs(directory, exist_ok=True)
+        _write_file(os.path.join(directory, f"file_{index}{_EXTENSIONS[file_format]}"), file_format, spec, rng, broken)
+        if progress is not None:
+            progress(file_number + 1, spec.files)
+
+    # Written last, so an interrupted generation is redone on the next run.
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        f.write(manifest)
+    return True
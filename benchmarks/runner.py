@@ -0,0 +1,118 @@
+"""
+Benchmark Runner
+Validates a corpus headlessly through ValidationEngine, the core behind ValidatorWorker,
+and reports files/s, MB/s, peak RSS and time to first result as JSON.
+"""
+
+import os
+import sys
+import time
+import platform
+import statistics
+
+from engine import ValidationEngine, shutdown_process_pool
+
+# Metrics compared between runs, and whether a larger value is better.
+METRICS = {
+    "files_per_s": True,
+    "mb_per_s": True,
+    "elapsed_s": False,
+    "time_to_first_result_s": False,
+    "peak_rss_mb": False,
+}
+
+def _peak_rss_mb() -> dict:
+    """Peak resident set size of this process and of its finished or pooled children, in MB."""
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows.
+        return {"peak_rss_mb": None, "peak_rss_children_mb": None}
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "peak_rss_children_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+def _run_once(corpus_dir: str, dtd_paths: list[str], workers: int, syntax_only: bool) -> dict:
+    """Runs one validation pass and returns its metrics."""
+    counts = {"files": 0, "failed": 0}
+    first_result = []
+
+    def on_result(result):
+        if result.is_system:
+            return
+        if not first_result:
+            first_result.append(time.perf_counter())
+        counts["files"] += 1
+        if not result.ok:
+            counts["failed"] += 1
+
+    engine = ValidationEngine(corpus_dir, dtd_paths, max_workers=workers, syntax_only=syntax_only, on_result=on_result)
+    started = time.perf_counter()
+    engine.run()
+    elapsed = time.perf_counter() - started
+
+    bytes_read = engine.stats.bytes_read
+    return {
+        "files": counts["files"],
+        "failed": counts["failed"],
+        "bytes": bytes_read,
+        "elapsed_s": round(elapsed, 4),
+        "files_per_s": round(counts["files"] / elapsed, 1) if elapsed else None,
+        "mb_per_s": round(bytes_read / elapsed / 1_000_000, 2) if elapsed else None,
+        "time_to_first_result_s": round(first_result[0] - started, 4) if first_result else None,
+        "phases_s": {phase: round(seconds, 4) for phase, seconds in engine.stats.phases.items()},
+    }
+
+def run_benchmark(corpus_dir: str, dtd_paths: list[str], workers: int = 1, syntax_only: bool = False,
+                  repeat: int = 1) -> dict:
+    """
+    Validates corpus_dir repeat times and returns the median run by elapsed time,
+    with the elapsed time of every run and the environment it ran in.
+    """
+    runs = []
+    try:
+        for _ in range(max(1, repeat)):
+            runs.append(_run_once(corpus_dir, dtd_paths, workers, syntax_only))
+    finally:
+        shutdown_process_pool()
+
+    elapsed = [run["elapsed_s"] for run in runs]
+    median = statistics.median_low(elapsed)
+    result = dict(next(run for run in runs if run["elapsed_s"] == median))
+    result.update(_peak_rss_mb())
+    result["runs_elapsed_s"] = elapsed
+    result["settings"] = {"workers": workers, "syntax_only": syntax_only, "dtds": len(dtd_paths), "repeat": len(runs)}
+    result["environment"] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    return result
+
+def compare_results(old: dict, new: dict, threshold_percent: float = 5.0) -> tuple[list[str], bool]:
+    """
+    Compares two benchmark results metric by metric. Returns report lines and
+    whether any metric got worse by more than threshold_percent.
+    """
+    lines = []
+    regressed = False
+    for metric, higher_is_better in METRICS.items():
+        before, after = old.get(metric), new.get(metric)
+        if not before or after is None:
+            lines.append(f"{metric:<24} {before!s:>12} -> {after!s:>12}")
+            continue
+        change = (after - before) / before * 100
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > threshold_percent:
+            flag = "  REGRESSION"
+            regressed = True
+        lines.append(f"{metric:<24} {before:>12} -> {after:>12}  {change:+.1f}%{flag}")
+    if old.get("failed") != new.get("failed") or old.get("files") != new.get("files"):
+        lines.append(f"results changed: {old.get('files')} files / {old.get('failed')} failed -> "
+                     f"{new.get('files')} files / {new.get('failed')} failed")
+        regressed = True
+    return lines, regressed
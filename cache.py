@@ -0,0 +1,167 @@
+"""
+Validation Cache
+Persists validation results between runs so unchanged files are not revalidated.
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+import logging
+
+from results import ValidationResult, ErrorEntry, FORMAT_BY_EXTENSION, FileFormat
+
+def _encode_result(result: ValidationResult) -> str:
+    return json.dumps([int(result.status), int(result.file_format), result.note, result.errors])
+
+def _decode_result(file_path: str, encoded: str) -> ValidationResult:
+    status, file_format, note, errors = json.loads(encoded)
+    return ValidationResult(file_path, FileFormat(file_format), status, note,
+                            tuple(ErrorEntry(*error) for error in errors))
+
+# Bump whenever the stored result format changes, so old entries stop matching.
+CACHE_SCHEMA_VERSION = 8
+
+def config_fingerprint(dtd_paths: list[str], allow_bom: bool, syntax_only: bool = False,
+                       extensions: dict | None = None, max_errors: int | None = None,
+                       dtd_signatures: dict | None = None) -> str:
+    """
+    Returns a digest of every setting that influences a file's result:
+    the content of each loaded DTD and of every module and entity file it includes
+    (the files listed in its dtd_signature, when given), the BOM option, the
+    validation mode, any extension mapped to a format other than its default and the error cap.
+    """
+    remapped = sorted((ext, int(fmt)) for ext, fmt in (extensions or {}).items() if FORMAT_BY_EXTENSION.get(ext) != fmt)
+    settings = f"v{CACHE_SCHEMA_VERSION};bom={int(allow_bom)};syntax={int(syntax_only)};ext={remapped}"
+    if max_errors:
+        # Uncapped runs keep the fingerprint they had before error caps existed.
+        settings += f";max_errors={max_errors}"
+    digest = hashlib.sha256(settings.encode())
+    for dtd_path in sorted(dtd_paths):
+        digest.update(b"\0" + os.path.abspath(dtd_path).encode("utf-8", "surrogatepass") + b"\0")
+        # The signature starts with the DTD itself, followed by the files it references.
+        signature = (dtd_signatures or {}).get(dtd_path) or ((os.path.abspath(dtd_path),),)
+        for index, (file_path, *_) in enumerate(signature):
+            if index:
+                digest.update(b"\0" + file_path.encode("utf-8", "surrogatepass") + b"\0")
+            try:
+                with open(file_path, "rb") as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(block)
+            except OSError:
+                digest.update(b"<missing>")
+    return digest.hexdigest()
+
+def hash_file(file_path: str) -> str | None:
+    """Returns a content digest for file_path, or None if it cannot be read."""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+class ValidationCache:
+    """
+    SQLite-backed store of validation results keyed by path, size, mtime_ns,
+    an optional content hash and the configuration fingerprint.
+    Each instance owns one connection and must only be used from one thread.
+    """
+    def __init__(self, db_path: str, fingerprint: str, hash_contents: bool = False):
+        self.db_path = db_path
+        self.fingerprint = fingerprint
+        self.hash_contents = hash_contents
+        self._pending_writes = []
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.connection = sqlite3.connect(db_path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER,"
+            " content_hash TEXT, fingerprint TEXT, results TEXT)"
+        )
+        self.connection.commit()
+
+    def lookup(self, file_path: str, size: int, mtime_ns: int) -> ValidationResult | None:
+        """
+        Returns the cached result for an unchanged file, or None on a miss.
+        With hash_contents enabled, a file whose mtime changed but whose content
+        did not (e.g. after a fresh checkout) is still a hit.
+        """
+        row = self.connection.execute(
+            "SELECT size, mtime_ns, content_hash, results FROM results WHERE path = ? AND fingerprint = ?",
+            (file_path, self.fingerprint),
+        ).fetchone()
+        if row is None or row[0] != size:
+            return None
+        if row[1] == mtime_ns:
+            return _decode_result(file_path, row[3])
+        if self.hash_contents and row[2] is not None and hash_file(file_path) == row[2]:
+            self.connection.execute("UPDATE results SET mtime_ns = ? WHERE path = ?", (mtime_ns, file_path))
+            self.connection.commit()
+            return _decode_result(file_path, row[3])
+        return None
+
+    def store(self, size: int, mtime_ns: int, result: ValidationResult):
+        """Queues a result for writing. Writes are committed in batches."""
+        file_path = result.path
+        content_hash = hash_file(file_path) if self.hash_contents else None
+        self._pending_writes.append((file_path, size, mtime_ns, content_hash, self.fingerprint, _encode_result(result)))
+        if len(self._pending_writes) >= 500:
+            self.flush()
+
+    def flush(self):
+        """Commits every queued write."""
+        if not self._pending_writes:
+            return
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO results (path, size, mtime_ns, content_hash, fingerprint, results) VALUES (?, ?, ?, ?, ?, ?)",
+            self._pending_writes,
+        )
+        self.connection.commit()
+        self._pending_writes.clear()
+
+    def forget(self, file_paths: list[str]):
+        """Deletes the entries for files that no longer exist."""
+        self.connection.executemany("DELETE FROM results WHERE path = ?", ((p,) for p in file_paths))
+        self.connection.commit()
+
+    def begin_sweep(self):
+        """Starts recording the paths seen during a walk, for evict_unseen()."""
+        self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS seen (path TEXT PRIMARY KEY)")
+        self.connection.execute("DELETE FROM seen")
+        self.connection.commit()
+
+    def mark_seen(self, file_paths: list[str]):
+        """Records a batch of paths found on disk."""
+        self.connection.executemany("INSERT OR IGNORE INTO seen (path) VALUES (?)", ((p,) for p in file_paths))
+        # Commit straight away: an open transaction would pin this connection to an old
+        # snapshot, and evict_unseen() could then never get the write lock once another
+        # connection has stored results (SQLITE_BUSY_SNAPSHOT, which no timeout resolves).
+        self.connection.commit()
+
+    def evict_unseen(self, directory_path: str) -> int:
+        """
+        Deletes entries under directory_path that were not seen since begin_sweep(),
+        i.e. files that were deleted or renamed. Returns the number of evicted entries.
+        """
+        prefix = os.path.join(directory_path, "")
+        cursor = self.connection.execute(
+            "DELETE FROM results WHERE substr(path, 1, ?) = ? AND path NOT IN (SELECT path FROM seen)",
+            (len(prefix), prefix),
+        )
+        self.connection.commit()
+        if cursor.rowcount:
+            logging.info(f"Evicted {cursor.rowcount} stale cache entries under {directory_path}")
+        return cursor.rowcount
+
+    def close(self):
+        """Flushes pending writes and closes the connection."""
+        try:
+            self.flush()
+        finally:
+            self.connection.close()
@@ -0,0 +1,351 @@
+"""
+Command Line Interface
+Headless validation mode. Streams one JSON object per result to stdout and never imports PySide6.
+"""
+
+import sys
+import json
+import logging
+import argparse
+import threading
+
+from config import (
+    CACHE_DB_PATH, PREFETCH_DEPTH, PREFETCH_MAX_BYTES, WATCH_DEBOUNCE_MS, WATCH_POLL_INTERVAL_MS, IGNORE_FILE_NAMES
+)
+from archives import ARCHIVE_EXTENSIONS, is_archive, member_prefix
+from engine import ValidationEngine, VALID_EXTENSIONS, extension_map
+from path_filter import PathFilter
+from git_changes import GitError
+from tree_index import TreeIndex, poll_changes
+from run_stats import format_summary, merge_summaries
+from shards import parse_shard, check_shards, ResultFileWriter, ResultFileReader
+from results import ndjson_record
+
+EXIT_OK = 0
+EXIT_INVALID = 1
+EXIT_ERROR = 2
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the argument parser for the headless mode."""
+    parser = argparse.ArgumentParser(
+        prog="run.py --cli",
+        description="Validate JSON, XML, DITA, XLIFF, PO and YAML files without starting the GUI. "
+                    "Results are written to stdout as NDJSON.",
+    )
+    parser.add_argument("directory", help="Directory to validate, or a zip or tar archive whose members are validated.")
+    parser.add_argument("--dtd", action="append", default=[], metavar="PATH",
+                        help="DTD file for XML-based formats. Repeat the option or separate paths with ';'.")
+    parser.add_argument("--allow-bom", action="store_true", help="Accept a UTF-8 BOM in JSON and YAML files.")
+    parser.add_argument("--syntax-only", action="store_true",
+                        help="Check JSON, YAML and PO files for well-formedness only, without fully loading them.")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="Number of validation processes (default: 1).")
+    parser.add_argument("--prefetch", type=int, default=PREFETCH_DEPTH, metavar="N",
+                        help="Files to read ahead of the parser when using one worker; 0 disables read-ahead "
+                             f"(default: {PREFETCH_DEPTH}).")
+    parser.add_argument("--prefetch-mb", type=int, default=PREFETCH_MAX_BYTES // (1024 * 1024), metavar="MB",
+                        help="Memory budget for read-ahead, in megabytes "
+                             f"(default: {PREFETCH_MAX_BYTES // (1024 * 1024)}).")
+    parser.add_argument("--cache", nargs="?", const=CACHE_DB_PATH, default=None, metavar="PATH",
+                        help="Reuse results for unchanged files from a cache database "
+                             f"(default location: {CACHE_DB_PATH}).")
+    parser.add_argument("--force", action="store_true", help="Ignore cached results and revalidate every file.")
+    parser.add_argument("--include", action="append", default=[], metavar="GLOB",
+                        help="Only validate files matching a .gitignore-style glob relative to the directory, "
+                             "e.g. 'docs/**' or '*.xliff'. Repeat the option for several globs.")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                        help="Skip files and directories matching a .gitignore-style glob, e.g. 'node_modules' or "
+                             "'build/'. Excluded directories are never entered. Repeat the option for several globs.")
+    parser.add_argument("--ignore-files", action="store_true",
+                        help=f"Also skip paths listed in {' and '.join(IGNORE_FILE_NAMES)} files found in the tree.")
+    parser.add_argument("--ext", action="append", default=[], metavar="EXT[=FORMAT]",
+                        help="Validate only these extensions, comma-separated or repeated. Map other extensions to "
+                             "a format with EXT=FORMAT, e.g. '.ditamap=dita' (default: all supported formats).")
+    parser.add_argument("--changed-since", metavar="REF",
+                        help="Only validate files git reports as added, modified or renamed since the merge base "
+                             "with REF (e.g. origin/main), plus uncommitted and untracked files.")
+    parser.add_argument("--archives", action="store_true",
+                        help="Also validate the members of zip and tar archives found in the directory, reported as "
+                             "'archive.zip!/path/in/archive', without extracting them.")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Validate byte-identical files once and report the shared result for each copy, "
+                             "with a \"group_size\" field. Results start once the whole tree has been discovered.")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="Stop at the first file that fails validation. Files already being validated still "
+                             "report their results. With --watch, only the initial run stops early.")
+    parser.add_argument("--max-errors", type=int, default=0, metavar="N",
+                        help="Keep at most N XML and DTD errors per file, plus one record counting the rest; "
+                             "0 keeps every error (default: 0).")
+    parser.add_argument("--shard", metavar="I/N",
+                        help="Validate only the files in shard I of N (counting from 1), chosen by a hash of each "
+                             "file's path relative to the directory, so N runs cover the tree exactly once.")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Also write a report to PATH: .html, .ndjson, .csv or .xml (JUnit), chosen by extension.")
+    parser.add_argument("--results", metavar="PATH",
+                        help="Also write a compact, gzip-compressed result file with run statistics to PATH, "
+                             "for combining shard runs with 'run.py --merge'.")
+    parser.add_argument("--stats", action="store_true",
+                        help="Write a final {\"stats\": ...} record with phase timings, per-format throughput "
+                             "and the slowest files, and print a summary to stderr.")
+    parser.add_argument("--watch", action="store_true",
+                        help="After the initial run, keep polling the directory and revalidate files as they are "
+                             "created or modified; deleted files are reported as {\"path\": ..., \"status\": "
+                             "\"deleted\"}. Stop with Ctrl+C. --report covers the initial run only.")
+    return parser
+
+class NdjsonWriter:
+    """
+    Writes result batches as NDJSON records and keeps pass/fail totals, plus the set
+    of files currently failing, which watch mode updates as files are fixed or removed.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.files = 0
+        self.failed = 0
+        self.failing = set()
+
+    def write_batch(self, batch: list):
+        lines = []
+        for result in batch:
+            if not result.is_system:
+                self.files += 1
+            if result.ok:
+                self.failing.discard(result.path)
+            else:
+                self.failed += 1
+                self.failing.add(result.path)
+            lines.append(json.dumps(ndjson_record(result)))
+        lines.append("")
+        self.stream.write("\n".join(lines))
+        self.stream.flush()
+
+    def write_deleted(self, file_paths: list[str]):
+        self.failing.difference_update(file_paths)
+        self.forget_members(file_paths)
+        self.stream.write("".join(json.dumps({"path": path, "status": "deleted"}) + "\n" for path in file_paths))
+        self.stream.flush()
+
+    def forget_members(self, archive_paths: list[str]):
+        """Drops the members of the given archives from failing; paths that are not archives are ignored."""
+        prefixes = tuple(member_prefix(path) for path in archive_paths if is_archive(path))
+        if prefixes:
+            self.failing = {path for path in self.failing if not path.startswith(prefixes)}
+
+    def write_stats(self, summary: dict):
+        self.stream.write(json.dumps({"stats": summary}) + "\n")
+        self.stream.flush()
+
+def main(argv: list[str] | None = None) -> int:
+    """Runs a headless validation and returns the process exit code."""
+    args = build_parser().parse_args(argv)
+    dtd_paths = [path.strip() for value in args.dtd for path in value.split(';') if path.strip()]
+    try:
+        extensions = extension_map([spec for value in args.ext for spec in value.split(',') if spec.strip()])
+    except ValueError as e:
+        logging.error(str(e))
+        return EXIT_ERROR
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+    except ValueError as e:
+        logging.error(str(e))
+        return EXIT_ERROR
+    if args.max_errors < 0:
+        logging.error("--max-errors must be 0 or more")
+        return EXIT_ERROR
+    directory = args.directory.rstrip()
+    path_filter = PathFilter(directory, args.include, args.exclude, IGNORE_FILE_NAMES if args.ignore_files else ())
+
+    writer = NdjsonWriter(sys.stdout)
+    tree_index = None
+    if args.watch:
+        # Index before the initial run, so files edited while it runs are picked up afterwards.
+        tree_index = TreeIndex(directory, (tuple(extensions) or VALID_EXTENSIONS)
+                               + (ARCHIVE_EXTENSIONS if args.archives else ()), path_filter)
+        tree_index.build()
+    report = None
+    if args.report:
+        # Report exporters are only imported when asked for, keeping startup fast.
+        from exporters import open_report, close_report
+        try:
+            report = open_report(args.report)
+        except (ValueError, OSError) as e:
+            logging.error(f"Cannot write report: {e}")
+            return EXIT_ERROR
+    results_file = None
+    if args.results:
+        try:
+            results_file = ResultFileWriter(args.results, directory, shard)
+        except OSError as e:
+            logging.error(f"Cannot write result file: {e}")
+            if report is not None:
+                close_report(report, args.report, completed=False)
+            return EXIT_ERROR
+
+    def write_batch(batch: list):
+        writer.write_batch(batch)
+        if report is not None:
+            for result in batch:
+                report.add(result)
+        if results_file is not None:
+            for result in batch:
+                results_file.add(result)
+
+    engine = ValidationEngine(
+        directory, dtd_paths, args.allow_bom, args.workers,
+        cache_path=args.cache, force_revalidate=args.force, syntax_only=args.syntax_only,
+        prefetch_depth=args.prefetch, prefetch_bytes=args.prefetch_mb * 1024 * 1024,
+        extensions=extensions or None, path_filter=path_filter, dedup=args.dedup, changed_since=args.changed_since,
+        archives=args.archives, shard=shard, fail_fast=args.fail_fast, max_errors=args.max_errors,
+        on_batch=write_batch,
+    )
+    completed = False
+    try:
+        engine.run()
+        completed = True
+    except BrokenPipeError:
+        return EXIT_ERROR
+    except GitError as e:
+        logging.error(f"Cannot list changed files: {e}")
+        return EXIT_ERROR
+    except Exception as e:
+        logging.error(f"Critical worker error: {e}", exc_info=True)
+        return EXIT_ERROR
+    finally:
+        if report is not None:
+            close_report(report, args.report, engine.stats.summary() if args.stats else None, completed)
+            report = None
+        if results_file is not None:
+            results_file.close(engine.stats.summary(), completed)
+            results_file = None
+
+    if args.stats:
+        summary = engine.stats.summary()
+        writer.write_stats(summary)
+        for line in format_summary(summary):
+            print(line, file=sys.stderr)
+    print(f"{writer.files} files checked, {writer.failed} failed.", file=sys.stderr)
+    if engine.stopped:
+        print("Stopped at the first failing file (--fail-fast).", file=sys.stderr)
+    if tree_index is not None:
+        return watch(engine, tree_index, writer)
+    return EXIT_INVALID if writer.failed else EXIT_OK
+
+def build_merge_parser() -> argparse.ArgumentParser:
+    """Builds the argument parser for merging shard result files."""
+    parser = argparse.ArgumentParser(
+        prog="run.py --merge",
+        description="Combine result files written by shard runs with --results into one NDJSON stream on stdout, "
+                    "with aggregated run statistics.",
+    )
+    parser.add_argument("results", nargs="+", metavar="FILE", help="Result files to combine, one per shard.")
+    parser.add_argument("--root", metavar="PATH",
+                        help="Report paths under PATH instead of the directory each shard validated.")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Also write a report to PATH: .html, .ndjson, .csv or .xml (JUnit), chosen by extension.")
+    parser.add_argument("--stats", action="store_true",
+                        help="Write a final {\"stats\": ...} record combining the shards' statistics, and print "
+                             "a summary to stderr.")
+    return parser
+
+def merge_main(argv: list[str] | None = None) -> int:
+    """Merges shard result files and returns the process exit code."""
+    args = build_merge_parser().parse_args(argv)
+    readers = []
+    try:
+        for path in args.results:
+            readers.append(ResultFileReader(path, args.root))
+    except (ValueError, OSError) as e:
+        logging.error(f"Cannot read result file: {e}")
+        for reader in readers:
+            reader.close()
+        return EXIT_ERROR
+    for warning in check_shards(readers):
+        logging.warning(warning)
+
+    writer = NdjsonWriter(sys.stdout)
+    report = None
+    completed = False
+    summaries = []
+    try:
+        if args.report:
+            from exporters import open_report, close_report
+            try:
+                report = open_report(args.report)
+            except (ValueError, OSError) as e:
+                logging.error(f"Cannot write report: {e}")
+                return EXIT_ERROR
+        dtds = {}
+        for reader in readers:
+            batch = []
+            for result in reader:
+                if result.is_system:
+                    # Every shard loads the DTDs; report each once, failing if any shard failed it.
+                    if result.path in dtds and (result.ok or not dtds[result.path].ok):
+                        continue
+                    dtds[result.path] = result
+                    continue
+                batch.append(result)
+                if len(batch) >= 500:
+                    writer.write_batch(batch)
+                    batch = []
+                if report is not None:
+                    report.add(result)
+            if batch:
+                writer.write_batch(batch)
+            if reader.stats is None:
+                logging.warning(f"{reader.path} has no run statistics; it may be truncated")
+            else:
+                summaries.append(reader.stats)
+        if dtds:
+            writer.write_batch(list(dtds.values()))
+            if report is not None:
+                for result in dtds.values():
+                    report.add(result)
+        completed = True
+    except BrokenPipeError:
+        return EXIT_ERROR
+    except (ValueError, OSError, EOFError) as e:
+        logging.error(f"Cannot merge result files: {e}")
+        return EXIT_ERROR
+    finally:
+        for reader in readers:
+            reader.close()
+        if report is not None:
+            close_report(report, args.report, merge_summaries(summaries) if args.stats else None, completed)
+
+    if args.stats:
+        summary = merge_summaries(summaries)
+        writer.write_stats(summary)
+        for line in format_summary(summary):
+            print(line, file=sys.stderr)
+    print(f"{writer.files} files checked, {writer.failed} failed, from {len(readers)} result files.", file=sys.stderr)
+    return EXIT_INVALID if writer.failed else EXIT_OK
+
+def watch(engine: ValidationEngine, tree_index: TreeIndex, writer: NdjsonWriter) -> int:
+    """
+    Polls the tree until interrupted, revalidating created and modified files and
+    reporting deleted ones. Returns EXIT_INVALID if any file is failing at the end.
+    --fail-fast applies to the initial run only; every changed file is revalidated.
+    """
+    engine.fail_fast = False
+    def on_changes(changed: list, deleted: list):
+        if deleted:
+            writer.write_deleted(deleted)
+        # A rewritten archive is reported afresh, so members it no longer contains stop failing.
+        writer.forget_members([item[0] for item in changed])
+        try:
+            engine.run(changed, deleted)
+        except BrokenPipeError:
+            raise
+        except Exception as e:
+            logging.error(f"Critical worker error: {e}", exc_info=True)
+        print(f"{len(changed)} changed, {len(deleted)} deleted; {len(writer.failing)} failing.", file=sys.stderr)
+
+    print(f"Watching {tree_index.root} for changes. Press Ctrl+C to stop.", file=sys.stderr)
+    try:
+        poll_changes(tree_index, on_changes, threading.Event(), WATCH_POLL_INTERVAL_MS / 1000, WATCH_DEBOUNCE_MS / 1000)
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        return EXIT_ERROR
+    return EXIT_INVALID if writer.failing else EXIT_OK
@@ -8,3 +8,67 @@ import os
 WINDOW_WIDTH = 900
 WINDOW_HEIGHT = 600
 ICONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons")
+
+# Parallel validation
+DEFAULT_WORKER_COUNT = os.cpu_count() or 1
+WORKER_CHUNK_FILES = 64
+WORKER_CHUNK_BYTES = 4 * 1024 * 1024
+
+# File discovery
+DISCOVERY_QUEUE_SIZE = 1024
+PROGRESS_INTERVAL_MS = 100
+
+# Incremental validation cache
+CACHE_DB_PATH = os.path.join(os.path.expanduser("~"), ".master_file_validator", "validation_cache.sqlite3")
+CACHE_HASH_CONTENTS = False
+
+# Results view
+RESULTS_FLUSH_INTERVAL_MS = 100
+RESULT_BATCH_SIZE = 500
+RESULT_BATCH_INTERVAL_MS = 100
+
+# Compiled DTD cache
+DTD_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# XML files above this size are checked with a streaming parser, unless DTDs are
+# loaded: DTD validation needs the whole document in memory
+XML_STREAMING_THRESHOLD_BYTES = 256 * 1024 * 1024
+
+# Files at or above this size are memory-mapped instead of read into memory
+MMAP_THRESHOLD_BYTES = 16 * 1024 * 1024
+
+# Read-ahead for serial validation: files read ahead of the parser, their total size, and reader threads
+PREFETCH_DEPTH = 8
+PREFETCH_MAX_BYTES = 64 * 1024 * 1024
+PREFETCH_THREADS = 4
+
+# Archive inputs: members decompressed ahead of the parser, and the largest member
+# read into memory for validation
+ARCHIVE_READ_AHEAD = 8
+ARCHIVE_MAX_MEMBER_BYTES = 512 * 1024 * 1024
+
+# Duplicate detection: block size used when hashing candidate duplicates
+DEDUP_READ_SIZE = 1024 * 1024
+
+# Run statistics: number of slowest files kept for the summary and reports
+SLOWEST_FILES_COUNT = 20
+
+# Report export: rows per collapsible HTML section / JUnit test suite
+REPORT_SECTION_ROWS = 1000
+
+# File discovery filters: directories never entered unless filtering is overridden,
+# and the .gitignore-style files read when ignore files are enabled
+DEFAULT_EXCLUDE_PATTERNS = (".git/", ".hg/", ".svn/")
+IGNORE_FILE_NAMES = (".gitignore", ".validatorignore")
+
+# Watch mode: quiet period before changed files are revalidated, and the polling
+# interval used when native change notifications are not available (headless mode)
+WATCH_DEBOUNCE_MS = 500
+WATCH_POLL_INTERVAL_MS = 1000
+
+# Daemon mode: default localhost port, request-handling threads, largest accepted request
+# body, and how many differently configured checkers are kept warm
+DAEMON_PORT = 8765
+DAEMON_THREADS = min(8, DEFAULT_WORKER_COUNT * 2)
+DAEMON_MAX_REQUEST_BYTES = 64 * 1024 * 1024
+DAEMON_MAX_CHECKERS = 8
@@ -0,0 +1,386 @@
+"""
+Validation Daemon
+Long-lived headless mode for editor plugins and pre-commit hooks. Keeps checkers with
+compiled DTDs and per-thread parsers warm, and answers JSON requests over localhost
+HTTP or a Unix domain socket. Never imports PySide6.
+
+POST /validate with {"paths": [...]} validates files (directories are walked and archives
+read member by member), or with {"content": "...", "format": "json", "name": "..."}
+validates an in-memory buffer ("content_base64" carries raw bytes). "dtd", "allow_bom", "syntax_only" and "ext"
+override the daemon's settings for one request. POST /invalidate, optionally with
+{"dtd": [...]}, drops compiled DTDs so they are recompiled. GET /health reports liveness.
+POST bodies must be sent as application/json with a Content-Length, and over TCP only
+requests addressed to localhost or 127.0.0.1 are answered, so web pages cannot use the
+daemon through cross-site requests or DNS rebinding.
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import signal
+import logging
+import argparse
+import threading
+import socketserver
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from archives import ARCHIVE_EXTENSIONS, file_extension
+from cli import EXIT_OK, EXIT_ERROR
+from config import DAEMON_PORT, DAEMON_THREADS, DAEMON_MAX_REQUEST_BYTES, DAEMON_MAX_CHECKERS
+from dtd_cache import dtd_signature, signature_current, shared_dtd_cache
+from engine import CheckerSettings, FileChecker, discover_files, extension_map
+from path_filter import PathFilter
+from results import FileFormat, FORMAT_BY_EXTENSION, ndjson_record
+
+class CheckerCache:
+    """
+    FileCheckers keyed by their settings, most recently used last. A checker is
+    replaced when one of its DTD files changes, so edits to DTDs are picked up
+    without restarting the daemon. FileChecker is safe to share between threads.
+    """
+    def __init__(self, max_checkers: int = DAEMON_MAX_CHECKERS):
+        self.max_checkers = max_checkers
+        self._checkers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._checkers)
+
+    def get(self, dtd_paths: list[str], allow_bom: bool, syntax_only: bool, extensions: dict) -> tuple:
+        """
+        Returns (checker, DTD load results) for the settings, building the checker if needed.
+        A cached checker is checked by stating the files its DTD signatures recorded, so
+        warm requests do not read and scan the DTDs again.
+        """
+        key = CheckerSettings(tuple(dtd_paths), allow_bom, syntax_only, tuple(sorted(extensions.items())))
+        with self._lock:
+            entry = self._checkers.get(key)
+            if entry is not None:
+                self._checkers.move_to_end(key)
+        if entry is not None and self._current(dtd_paths, entry[2]):
+            return entry[:2]
+        signatures = {path: dtd_signature(path) for path in dtd_paths if os.path.isfile(path)}
+        checker = FileChecker.from_settings(key._replace(dtd_signatures=tuple(sorted(signatures.items()))))
+        entry = (checker, checker.load_dtds(), signatures)
+        with self._lock:
+            self._checkers[key] = entry
+            while len(self._checkers) > self.max_checkers:
+                self._checkers.popitem(last=False)
+        return entry[:2]
+
+    @staticmethod
+    def _current(dtd_paths: list[str], signatures: dict) -> bool:
+        """Returns whether no DTD file a checker was built from changed, appeared or disappeared."""
+        return all(signature_current(signatures[path]) if path in signatures else not os.path.isfile(path)
+                   for path in dtd_paths)
+
+    def clear(self) -> int:
+        """Drops every checker, returning how many there were."""
+        with self._lock:
+            count = len(self._checkers)
+            self._checkers.clear()
+        return count
+
+class ValidationService:
+    """Answers validation requests with the daemon's default settings, overridable per request."""
+    def __init__(self, dtd_paths: list[str], allow_bom: bool = False, syntax_only: bool = False,
+                 extensions: dict | None = None):
+        self.dtd_paths = dtd_paths
+        self.allow_bom = allow_bom
+        self.syntax_only = syntax_only
+        self.extensions = extensions or FORMAT_BY_EXTENSION
+        self.checkers = CheckerCache()
+        self.started = time.monotonic()
+        self.requests = 0
+        self._requests_lock = threading.Lock()
+
+    def warm_up(self):
+        """Imports the parsers and compiles the default DTDs before the first request arrives."""
+        from lxml import etree  # noqa: F401
+        import ruamel.yaml  # noqa: F401
+        import polib  # noqa: F401
+        for result in self.checkers.get(self.dtd_paths, self.allow_bom, self.syntax_only, self.extensions)[1]:
+            if not result.ok:
+                logging.warning(f"DTD {result.path}: {'; '.join(result.messages())}")
+
+    def health(self) -> dict:
+        return {"status": "ok", "uptime_s": round(time.monotonic() - self.started, 3),
+                "requests": self.requests, "checkers": len(self.checkers)}
+
+    def validate(self, request: dict) -> dict:
+        """Handles one /validate request. Raises ValueError for malformed requests."""
+        started = time.perf_counter()
+        with self._requests_lock:
+            self.requests += 1
+        dtd_paths = _dtd_paths(request.get("dtd"))
+        if dtd_paths is None:
+            dtd_paths = self.dtd_paths
+        ext = request.get("ext")
+        if isinstance(ext, str):
+            ext = ext.split(",")
+        if ext is not None and not (isinstance(ext, list) and all(isinstance(spec, str) for spec in ext)):
+            raise ValueError("'ext' must be a ','-separated string or a list of extensions")
+        extensions = extension_map([spec for spec in ext if spec.strip()]) if ext else self.extensions
+        checker, dtd_results = self.checkers.get(
+            dtd_paths, bool(request.get("allow_bom", self.allow_bom)),
+            bool(request.get("syntax_only", self.syntax_only)), extensions,
+        )
+
+        if "content" in request or "content_base64" in request:
+            name = str(request.get("name") or "<buffer>")
+            if "content_base64" in request:
+                data = base64.b64decode(request["content_base64"], validate=True)
+            else:
+                data = str(request["content"]).encode("utf-8")
+            results = [checker.validate_bytes(data, _buffer_format(request.get("format"), name, extensions), name)]
+        elif "paths" in request:
+            results = []
+            for file_path, extension, size in _expand_paths(request["paths"], extensions):
+                if extension in ARCHIVE_EXTENSIONS:
+                    results.extend(result for result, _ in checker.validate_archive(file_path, extension))
+                else:
+                    results.append(checker.validate_file(file_path, extension, size))
+        else:
+            raise ValueError("Expected 'paths' or 'content'")
+
+        return {
+            "results": [ndjson_record(result) for result in results],
+            "dtds": [ndjson_record(result) for result in dtd_results],
+            "files": len(results),
+            "failed": sum(not result.ok for result in results),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def invalidate(self, request: dict) -> dict:
+        """
+        Handles one /invalidate request: drops the compiled DTDs listed in 'dtd', or all
+        of them, and every checker, so the next request compiles DTDs from disk again.
+        Edits are normally noticed through DTD file signatures; this covers changes that
+        keep a file's size and modification time, e.g. on coarse-timestamp file systems.
+        """
+        dtd_paths = _dtd_paths(request.get("dtd"))
+        if dtd_paths is None:
+            shared_dtd_cache.invalidate()
+        else:
+            for dtd_path in dtd_paths:
+                shared_dtd_cache.invalidate(dtd_path)
+        return {"dtds": dtd_paths if dtd_paths is not None else "all", "checkers": self.checkers.clear()}
+
+def _dtd_paths(value) -> list[str] | None:
+    """Returns a request's 'dtd' field, a ';'-separated string or a list of paths, as a list, or None if absent."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [path.strip() for path in value.split(";") if path.strip()]
+    if isinstance(value, list) and all(isinstance(path, str) for path in value):
+        return value
+    raise ValueError("'dtd' must be a ';'-separated string of paths or a list of paths")
+
+def _buffer_format(format_name, name: str, extensions: dict) -> FileFormat:
+    """Resolves a buffer's format from a name such as 'dita', an extension, or else the buffer name."""
+    if format_name:
+        format_name = str(format_name).strip()
+        file_format = FileFormat.__members__.get(format_name.upper())
+        if file_format is None:
+            file_format = extensions.get("." + format_name.lstrip(".").lower())
+    else:
+        file_format = extensions.get(os.path.splitext(name)[1].lower())
+    if file_format in (None, FileFormat.UNKNOWN, FileFormat.DTD):
+        raise ValueError(f"Unknown format '{format_name or name}'")
+    return file_format
+
+def _expand_paths(paths, extensions: dict):
+    """
+    Yields (file_path, extension, size) for the requested files and the matching files
+    under directories. Archives are yielded as they are, to be validated member by member.
+    """
+    if isinstance(paths, str) or not isinstance(paths, list):
+        raise ValueError("'paths' must be a list")
+    for path in paths:
+        path = os.path.abspath(str(path))
+        if os.path.isdir(path):
+            for file_path, extension, size, _ in discover_files(path, tuple(extensions) + ARCHIVE_EXTENSIONS,
+                                                                PathFilter(path)):
+                yield file_path, extension, size
+        else:
+            yield path, file_extension(path), None
+
+# Host names a browser sends for the daemon's own address; any other name means the
+# request came from a page that merely resolves to 127.0.0.1.
+_LOOPBACK_HOSTS = ("localhost", "127.0.0.1")
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """JSON over HTTP/1.0: one request per connection, so idle clients never hold a thread."""
+    server_version = "MasterFileValidator"
+
+    def do_GET(self):
+        if not self._host_allowed():
+            self._reply(HTTPStatus.FORBIDDEN, {"error": "Requests must be addressed to localhost"})
+        elif self.path == "/health":
+            self._reply(HTTPStatus.OK, self.server.service.health())
+        else:
+            self._reply(HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        handlers = {"/validate": self.server.service.validate, "/invalidate": self.server.service.invalidate}
+        if not self._host_allowed():
+            self._reply(HTTPStatus.FORBIDDEN, {"error": "Requests must be addressed to localhost"})
+            return
+        if self.path not in handlers:
+            self._reply(HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint {self.path}"})
+            return
+        # Browsers send cross-site form posts without a preflight, but never as application/json.
+        if self.headers.get_content_type() != "application/json":
+            self._reply(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, {"error": "Content-Type must be application/json"})
+            return
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self._reply(HTTPStatus.LENGTH_REQUIRED, {"error": "Content-Length required"})
+            return
+        if not (length.isascii() and length.isdigit()):
+            self._reply(HTTPStatus.BAD_REQUEST, {"error": f"Invalid Content-Length '{length}'"})
+            return
+        length = int(length)
+        if length > DAEMON_MAX_REQUEST_BYTES:
+            self._reply(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request too large"})
+            return
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("Expected a JSON object")
+            response = handlers[self.path](request)
+        except (ValueError, TypeError) as e:
+            self._reply(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        except Exception as e:
+            logging.error(f"Request failed: {e}", exc_info=True)
+            self._reply(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+            return
+        self._reply(HTTPStatus.OK, response)
+
+    def _host_allowed(self) -> bool:
+        """Returns whether the Host header names the loopback address and port the daemon listens on."""
+        if not isinstance(self.client_address, tuple):
+            # Unix domain sockets cannot be reached from a browser.
+            return True
+        name, separator, port = (self.headers.get("Host") or "").lower().rpartition(":")
+        if not separator:
+            name, port = port, ""
+        return name in _LOOPBACK_HOSTS and port in ("", str(self.server.server_address[1]))
+
+    def _reply(self, status: HTTPStatus, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # Unix domain socket clients have no address.
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "local"
+
+    def log_message(self, format, *args):
+        logging.debug(f"{self.address_string()} {format % args}")
+
+class _PooledMixIn(socketserver.ThreadingMixIn):
+    """
+    Handles requests on a fixed set of threads rather than a new thread each, so the
+    per-thread parsers in engine.parser_pool stay warm between requests.
+    """
+    def start_pool(self, threads: int):
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="validator-daemon")
+
+    def process_request(self, request, client_address):
+        self._executor.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+class PooledHTTPServer(_PooledMixIn, HTTPServer):
+    pass
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class PooledUnixHTTPServer(_PooledMixIn, socketserver.UnixStreamServer):
+        def server_bind(self):
+            # Stale sockets from an earlier daemon would make bind fail.
+            if os.path.exists(self.server_address) and not os.path.isfile(self.server_address):
+                os.unlink(self.server_address)
+            super().server_bind()
+            os.chmod(self.server_address, 0o600)
+
+        def server_close(self):
+            super().server_close()
+            if os.path.exists(self.server_address):
+                os.unlink(self.server_address)
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the argument parser for daemon mode."""
+    parser = argparse.ArgumentParser(
+        prog="run.py --daemon",
+        description="Keep the validator resident and answer validation requests over localhost HTTP "
+                    "or a Unix domain socket. Results use the same records as the headless mode.",
+    )
+    parser.add_argument("--port", type=int, default=DAEMON_PORT,
+                        help=f"Localhost port to listen on (default: {DAEMON_PORT}).")
+    parser.add_argument("--socket", metavar="PATH",
+                        help="Listen on a Unix domain socket at PATH instead of a TCP port.")
+    parser.add_argument("--threads", type=int, default=DAEMON_THREADS, metavar="N",
+                        help=f"Requests handled concurrently (default: {DAEMON_THREADS}).")
+    parser.add_argument("--dtd", action="append", default=[], metavar="PATH",
+                        help="Default DTD file for XML-based formats. Repeat the option or separate paths with ';'.")
+    parser.add_argument("--allow-bom", action="store_true", help="Accept a UTF-8 BOM in JSON and YAML files by default.")
+    parser.add_argument("--syntax-only", action="store_true",
+                        help="Check JSON, YAML and PO files for well-formedness only by default.")
+    parser.add_argument("--ext", action="append", default=[], metavar="EXT[=FORMAT]",
+                        help="Default extensions to validate in directories, and extra extension mappings, "
+                             "as in the headless mode.")
+    return parser
+
+def main(argv: list[str] | None = None) -> int:
+    """Runs the daemon until interrupted and returns the process exit code."""
+    args = build_parser().parse_args(argv)
+    dtd_paths = [path.strip() for value in args.dtd for path in value.split(';') if path.strip()]
+    try:
+        extensions = extension_map([spec for value in args.ext for spec in value.split(',') if spec.strip()])
+    except ValueError as e:
+        logging.error(str(e))
+        return EXIT_ERROR
+
+    service = ValidationService(dtd_paths, args.allow_bom, args.syntax_only, extensions or None)
+    service.warm_up()
+    try:
+        if args.socket:
+            if not hasattr(socketserver, "UnixStreamServer"):
+                logging.error("Unix domain sockets are not supported on this platform; use --port.")
+                return EXIT_ERROR
+            server = PooledUnixHTTPServer(args.socket, RequestHandler)
+            address = args.socket
+        else:
+            server = PooledHTTPServer(("127.0.0.1", args.port), RequestHandler)
+            address = f"http://127.0.0.1:{server.server_address[1]}"
+    except OSError as e:
+        logging.error(f"Cannot listen: {e}")
+        return EXIT_ERROR
+    server.service = service
+    server.start_pool(max(1, args.threads))
+    # Service managers stop daemons with SIGTERM; shut down as cleanly as for Ctrl+C.
+    signal.signal(signal.SIGTERM, _interrupt)
+
+    print(f"Validator daemon listening on {address}. Press Ctrl+C to stop.", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return EXIT_OK
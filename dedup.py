@@ -0,0 +1,66 @@
+"""
+Duplicate Detection
+Groups byte-identical files so each group is validated once. Only files that share
+a size and format with another file are read and hashed, so a tree without
+duplicates costs no more than the walk that found it.
+"""
+
+import os
+import hashlib
+import threading
+
+from config import DEDUP_READ_SIZE
+from results import FileFormat
+
+_XML_FORMATS = (FileFormat.XML, FileFormat.DITA, FileFormat.XLIFF)
+
+def content_key(file_path: str, file_format: FileFormat) -> tuple | None:
+    """
+    Returns a key equal for files whose validation cannot differ, or None if the file
+    cannot be read. XML documents that declare entities may pull in files relative to
+    their own location, so they only match copies in the same directory.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    scope = None
+    try:
+        with open(file_path, "rb") as f:
+            block = f.read(DEDUP_READ_SIZE)
+            if file_format in _XML_FORMATS and b"<!ENTITY" in block:
+                scope = os.path.dirname(file_path)
+            while block:
+                digest.update(block)
+                block = f.read(DEDUP_READ_SIZE)
+    except OSError:
+        return None
+    return digest.digest(), scope
+
+def group_duplicates(items: list[tuple], formats: dict,
+                     stop: threading.Event | None = None) -> tuple[list[tuple], dict[str, list[tuple]]]:
+    """
+    Splits discovery entries, (file_path, extension, size, mtime_ns), into the ones to
+    validate and their duplicates. Returns (representatives in discovery order,
+    {representative path: duplicate entries}). Unreadable files stay representatives,
+    so validation reports them. Returns nothing once stop is set.
+    """
+    candidates = {}
+    for item in items:
+        candidates.setdefault((item[2], formats.get(item[1])), []).append(item)
+
+    duplicates = {}
+    skipped = set()
+    for (_, file_format), bucket in candidates.items():
+        # Archives have no format of their own and are never grouped.
+        if len(bucket) < 2 or file_format is None:
+            continue
+        if stop is not None and stop.is_set():
+            return [], {}
+        groups = {}
+        for item in bucket:
+            key = content_key(item[0], file_format)
+            if key is not None:
+                groups.setdefault(key, []).append(item)
+        for representative, *copies in groups.values():
+            if copies:
+                duplicates[representative[0]] = copies
+                skipped.update(item[0] for item in copies)
+    return [item for item in items if item[0] not in skipped], duplicates
@@ -0,0 +1,124 @@
+"""
+DTD Cache
+Keeps compiled DTDs in memory across validation runs, keyed by path and the
+modification times of every file they pull in.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from config import DTD_CACHE_MAX_BYTES
+
+# External entity declarations, e.g. <!ENTITY % topic-dec PUBLIC "-//OASIS//..." "topic.mod">
+_ENTITY_PATTERN = re.compile(
+    rb'<!ENTITY\s+(?:%\s*)?[^\s"]+\s+(?:SYSTEM\s+"([^"]+)"|PUBLIC\s+"[^"]*"\s+"([^"]+)")'
+)
+
+def dtd_signature(dtd_path: str) -> tuple:
+    """
+    Returns ((path, size, mtime_ns), ...) for a DTD and every local file it
+    references through external entities, followed recursively. Any change to
+    one of those files changes the signature.
+    """
+    signature = []
+    pending = [os.path.abspath(dtd_path)]
+    visited = set()
+    while pending:
+        path = pending.pop()
+        if path in visited:
+            continue
+        visited.add(path)
+        try:
+            stat = os.stat(path)
+            with open(path, "rb") as f:
+                content = f.read()
+        except OSError:
+            signature.append((path, -1, -1))
+            continue
+        signature.append((path, stat.st_size, stat.st_mtime_ns))
+        base_dir = os.path.dirname(path)
+        for match in _ENTITY_PATTERN.finditer(content):
+            reference = (match.group(1) or match.group(2)).decode("utf-8", "replace")
+            if "://" in reference:
+                continue
+            pending.append(os.path.normpath(os.path.join(base_dir, reference)))
+    return tuple(sorted(signature))
+
+def signature_current(signature: tuple) -> bool:
+    """
+    Returns whether every file in a dtd_signature still has the size and modification
+    time recorded. Only stats the files, so it is much cheaper than a new signature;
+    a changed file may reference different modules, which takes a new signature to find.
+    """
+    for path, size, mtime_ns in signature:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            if size != -1:
+                return False
+            continue
+        if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+            return False
+    return True
+
+class DtdCache:
+    """
+    Thread-safe LRU cache of compiled lxml DTDs. Memory use is estimated from the
+    size of the source files behind each DTD and capped at max_bytes.
+    A DTD keeps the error log of its last validation on the object itself, so each
+    compiled DTD comes with a lock that every user of it must hold while validating
+    and reading that log.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, dtd_path: str, signature: tuple | None = None) -> tuple:
+        """
+        Returns (dtd, lock) for dtd_path, compiling the DTD if it is missing or any
+        of its files changed. Pass a precomputed signature to skip the stat calls.
+        Raises the lxml parse error if the DTD cannot be compiled.
+        """
+        key = os.path.abspath(dtd_path)
+        if signature is None:
+            signature = dtd_signature(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                return entry[1], entry[3]
+
+        from lxml import etree
+        # Loading by path lets lxml resolve relative entity modules.
+        dtd = etree.DTD(key)
+        size = sum(max(file_size, 0) for _, file_size, _ in signature)
+        lock = threading.Lock()
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[2]
+            self._entries[key] = (signature, dtd, size, lock)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, _, evicted_size, _) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+        return dtd, lock
+
+    def invalidate(self, dtd_path: str | None = None):
+        """Drops one DTD, or every DTD when no path is given."""
+        with self._lock:
+            if dtd_path is None:
+                self._entries.clear()
+                self._total_bytes = 0
+                return
+            entry = self._entries.pop(os.path.abspath(dtd_path), None)
+            if entry is not None:
+                self._total_bytes -= entry[2]
+
+# Shared by every run in this process, including successive runs in pool processes.
+shared_dtd_cache = DtdCache(DTD_CACHE_MAX_BYTES)
@@ -0,0 +1,65 @@
+"""
+DTD Routing
+Picks the DTD a document should be validated against from its DOCTYPE and root element.
+"""
+
+import os
+import re
+
+# DTD headers (DITA, XLIFF and most OASIS shells) document the public identifier
+# they are meant to be referenced by, e.g.  PUBLIC "-//OASIS//DTD DITA Topic//EN"
+_PUBLIC_ID_PATTERN = re.compile(rb'PUBLIC\s+"([^"]*//DTD [^"]*)"')
+_HEADER_BYTES = 16 * 1024
+
+def read_public_id(dtd_path: str) -> str | None:
+    """Returns the public identifier declared in a DTD's header comment, if any."""
+    try:
+        with open(dtd_path, "rb") as f:
+            header = f.read(_HEADER_BYTES)
+    except OSError:
+        return None
+    match = _PUBLIC_ID_PATTERN.search(header)
+    return match.group(1).decode("utf-8", "replace").strip() if match else None
+
+class DtdRouter:
+    """
+    Index from DOCTYPE public IDs, system ID file names and root element names
+    to loaded DTDs. Routes are tried in that order; a document that matches no
+    route is validated against every DTD, as before.
+    """
+    def __init__(self):
+        self._by_public_id = {}
+        self._by_system_name = {}
+        self._by_stem = {}
+        self._by_element = {}
+
+    def add(self, dtd_path: str, dtd):
+        """Registers a compiled DTD under every key it can be routed by."""
+        entry = (os.path.basename(dtd_path), dtd)
+        public_id = read_public_id(dtd_path)
+        if public_id:
+            self._by_public_id.setdefault(public_id, entry)
+        self._by_system_name.setdefault(entry[0].lower(), entry)
+        self._by_stem.setdefault(os.path.splitext(entry[0])[0].lower(), entry)
+        for element in dtd.elements():
+            # Elements declared by several DTDs (shared DITA modules) cannot route on their own.
+            self._by_element.setdefault(element.name, []).append(entry)
+
+    def route(self, doc) -> tuple[str, object] | None:
+        """Returns the (dtd_name, dtd) pair doc should be validated against, or None."""
+        docinfo = doc.docinfo
+        if docinfo.public_id and docinfo.public_id in self._by_public_id:
+            return self._by_public_id[docinfo.public_id]
+        if docinfo.system_url:
+            system_name = os.path.basename(docinfo.system_url.replace("\\", "/")).lower()
+            if system_name in self._by_system_name:
+                return self._by_system_name[system_name]
+
+        root = doc.getroot()
+        if root is None or not isinstance(root.tag, str):
+            return None
+        root_name = root.tag.rpartition('}')[2]
+        if root_name.lower() in self._by_stem:
+            return self._by_stem[root_name.lower()]
+        candidates = self._by_element.get(root_name, [])
+        return candidates[0] if len(candidates) == 1 else None
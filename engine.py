@@ -0,0 +1,924 @@
+"""
+Validation Engine
+Contains the Qt-free validation core: file discovery, per-file checks and the
+parallel pipeline. Heavy parser modules are imported on first use, so headless
+runs only pay for the formats they actually meet.
+"""
+
+import os
+import sys
+import json
+import queue
+import threading
+import time
+import itertools
+from collections.abc import Callable, Iterator
+from typing import NamedTuple
+
+from archives import ARCHIVE_EXTENSIONS, file_extension, is_archive, read_members
+from dtd_cache import shared_dtd_cache, dtd_signature
+from dtd_routing import DtdRouter
+from dedup import group_duplicates
+from git_changes import changed_files
+from file_buffer import FileBuffer
+from path_filter import PathFilter
+from shards import shard_of
+from prefetch import prefetch_files
+from run_stats import RunStats, FileTiming
+from results import ValidationResult, ErrorEntry, FileFormat, FORMAT_BY_EXTENSION
+from syntax_check import check_json_syntax, check_yaml_syntax, check_po_syntax, decode_po
+from config import (
+    WORKER_CHUNK_FILES, WORKER_CHUNK_BYTES, DISCOVERY_QUEUE_SIZE, PROGRESS_INTERVAL_MS,
+    CACHE_HASH_CONTENTS, RESULT_BATCH_SIZE, RESULT_BATCH_INTERVAL_MS, XML_STREAMING_THRESHOLD_BYTES,
+    PREFETCH_DEPTH, PREFETCH_MAX_BYTES, PREFETCH_THREADS
+)
+
+# Extensions validated by default; ValidationEngine and FileChecker accept their own
+# extension -> FileFormat mapping, e.g. to check .ditamap files as DITA.
+VALID_EXTENSIONS = tuple(FORMAT_BY_EXTENSION)
+
+def extension_map(specs: list[str]) -> dict:
+    """
+    Builds an extension -> FileFormat mapping from specs such as ".json", "yml" or
+    ".ditamap=dita". Without a format, the extension must be one of VALID_EXTENSIONS.
+    Raises ValueError for unknown extensions or formats.
+    """
+    extensions = {}
+    for spec in specs:
+        extension, _, format_name = spec.strip().partition("=")
+        extension = "." + extension.strip().lstrip(".").lower()
+        if format_name:
+            file_format = FileFormat.__members__.get(format_name.strip().upper())
+            if file_format in (None, FileFormat.UNKNOWN, FileFormat.DTD):
+                raise ValueError(f"Unknown format '{format_name.strip()}' for {extension}")
+        else:
+            file_format = FORMAT_BY_EXTENSION.get(extension)
+            if file_format is None:
+                raise ValueError(f"Unsupported extension {extension}; map it to a format, e.g. {extension}=xml")
+        extensions[extension] = file_format
+    return extensions
+
+def _xml_error(error) -> ErrorEntry:
+    """Converts an lxml log entry to an ErrorEntry coded by libxml2 error type, with a hint for bare ampersands."""
+    # Older libxml2 reports "EntityRef: expecting ';'", newer "xmlParseEntityRef: no name".
+    if "EntityRef: expecting" in error.message or "EntityRef: no name" in error.message:
+        message = "Unescaped ampersand '&' must be written as '&amp;'."
+    else:
+        message = error.message
+    return ErrorEntry(error.line, error.column, sys.intern(error.type_name), message)
+
+def _dtd_error(error) -> ErrorEntry:
+    """Converts an lxml DTD validation log entry to an ErrorEntry."""
+    return ErrorEntry(error.line, error.column, sys.intern(error.type_name), error.message)
+
+class ResultBatcher:
+    """
+    Buffers ValidationResults and hands them to deliver() as a single list
+    every batch_size results or interval_ms milliseconds, whichever comes first.
+    Safe to call from several threads; a timer thread flushes stragglers.
+    deliver() is never called concurrently, and batches arrive in the order their
+    results were added, so it may write to unsynchronised outputs.
+    """
+    def __init__(self, deliver: Callable[[list], None], batch_size: int, interval_ms: int):
+        self.deliver = deliver
+        self.batch_size = batch_size
+        self.interval = interval_ms / 1000
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._deliver_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._timer_thread = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._timer_thread.start()
+
+    def add(self, result: ValidationResult):
+        with self._lock:
+            self._buffer.append(result)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        # Taking the batch under the delivery lock keeps batches in order; adding
+        # only needs the buffer lock, so producers are not held up by a slow deliver().
+        with self._deliver_lock:
+            with self._lock:
+                if not self._buffer:
+                    return
+                batch, self._buffer = self._buffer, []
+            self.deliver(batch)
+
+    def close(self):
+        """Stops the timer thread and delivers whatever is still buffered."""
+        self._closed.set()
+        self._timer_thread.join()
+        self.flush()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.interval):
+            self.flush()
+
+class ParserPool(threading.local):
+    """
+    Per-thread parser and loader instances, created on first use and reused for
+    every file the thread validates. Pool processes each get their own copy, and
+    a parser's error log is never shared with a file parsed on another thread.
+    """
+    def __init__(self):
+        self._xml_parser = None
+        self._yaml_loader = None
+        self._json_decoder = None
+
+    @property
+    def xml_parser(self):
+        if self._xml_parser is None:
+            from lxml import etree
+            self._xml_parser = etree.XMLParser(recover=True, dtd_validation=False)
+        return self._xml_parser
+
+    @property
+    def yaml_loader(self):
+        if self._yaml_loader is None:
+            import ruamel.yaml
+            self._yaml_loader = ruamel.yaml.YAML(typ='safe')
+        return self._yaml_loader
+
+    @property
+    def json_decoder(self) -> json.JSONDecoder:
+        if self._json_decoder is None:
+            self._json_decoder = json.JSONDecoder()
+        return self._json_decoder
+
+parser_pool = ParserPool()
+
+class CheckerSettings(NamedTuple):
+    """
+    Everything a FileChecker is built from, in a hashable form: DTD signatures and
+    extensions are sorted (key, value) pairs. A run builds its settings once and sends
+    them to pool processes with every chunk, where they also key the cached checker.
+    """
+    dtd_paths: tuple[str, ...] = ()
+    allow_bom: bool = False
+    syntax_only: bool = False
+    extensions: tuple[tuple[str, FileFormat], ...] = ()
+    max_errors: int | None = None
+    dtd_signatures: tuple[tuple[str, tuple], ...] = ()
+
+class FileChecker:
+    """
+    Validates individual files against the loaded DTDs.
+    Holds no Qt objects, so it can be rebuilt inside pool processes, and takes its
+    parsers from the per-thread parser_pool, so one checker can serve several threads.
+    With max_errors, at most that many parser or DTD errors are kept per file, followed
+    by one entry counting the rest.
+    """
+    def __init__(self, dtd_paths: list[str], allow_bom: bool = False, dtd_signatures: dict | None = None,
+                 syntax_only: bool = False, extensions: dict | None = None, max_errors: int | None = None):
+        self.dtd_paths = dtd_paths
+        self.allow_bom = allow_bom
+        self.syntax_only = syntax_only
+        self.max_errors = max_errors or None
+        self.extensions = extensions or FORMAT_BY_EXTENSION
+        self.dtd_signatures = dtd_signatures or {}
+        self.dtds = []  # (dtd_name, dtd) pairs, in the order the DTDs were given
+        self.dtd_router = DtdRouter()
+        # Locks shared through the DTD cache with every other checker using the same DTD.
+        self._dtd_locks = {}
+
+    @classmethod
+    def from_settings(cls, settings: CheckerSettings) -> "FileChecker":
+        """Builds a checker for settings; call load_dtds() before validating."""
+        return cls(list(settings.dtd_paths), settings.allow_bom, dict(settings.dtd_signatures), settings.syntax_only,
+                   dict(settings.extensions) or None, settings.max_errors)
+
+    def load_dtds(self) -> list[ValidationResult]:
+        """
+        Compiles every configured DTD, returning a DTD-format result per path.
+        Compiled DTDs come from the process-wide DTD cache when their files are unchanged.
+        """
+        results = []
+        for dtd_path in self.dtd_paths:
+            if not os.path.isfile(dtd_path):
+                error = ErrorEntry(0, 0, "dtd-missing", "Error: File not found")
+                results.append(ValidationResult.invalid(dtd_path, FileFormat.DTD, [error]))
+                continue
+            try:
+                dtd_obj, dtd_lock = shared_dtd_cache.get(dtd_path, self.dtd_signatures.get(dtd_path))
+                self.dtds.append((os.path.basename(dtd_path), dtd_obj))
+                self.dtd_router.add(dtd_path, dtd_obj)
+                self._dtd_locks[id(dtd_obj)] = dtd_lock
+                results.append(ValidationResult.valid(dtd_path, FileFormat.DTD, "Successfully loaded"))
+            except Exception as e:
+                error = ErrorEntry(0, 0, "dtd-parse", f"Error parsing DTD: {e}")
+                results.append(ValidationResult.invalid(dtd_path, FileFormat.DTD, [error]))
+        return results
+
+    def validate_file(self, file_path: str, extension: str, size: int | None = None, prefetched=None,
+                      timing: FileTiming | None = None) -> ValidationResult:
+        """
+        Validates a single file and returns its result.
+        size is the file size from discovery, if known; it saves a stat call.
+        The file is read once into a FileBuffer and every format works from that buffer.
+        prefetched is a future already reading that buffer, as yielded by prefetch_files.
+        When timing is given, the read, parse and validation times are recorded on it.
+        In syntax-only mode JSON, YAML and PO files are only checked for well-formedness:
+        YAML and PO build no document, and JSON keeps no objects.
+        """
+        file_format = self.extensions.get(extension, FileFormat.UNKNOWN)
+        if file_format == FileFormat.UNKNOWN:
+            error = ErrorEntry(0, 0, "unsupported", "Unsupported file format")
+            return ValidationResult.invalid(file_path, file_format, [error])
+        if timing is None:
+            timing = FileTiming(file_path, extension)
+        started = time.perf_counter()
+        read_done = None
+        try:
+            buffer = prefetched.result() if prefetched is not None else FileBuffer(file_path, size)
+            read_done = time.perf_counter()
+            timing.read_time = read_done - started
+            timing.bytes_read = buffer.size
+            with buffer:
+                note, errors = self._validate_buffer(buffer, file_format, timing)
+        except Exception as e:
+            return ValidationResult.critical(file_path, file_format, str(e))
+        finally:
+            if read_done is None:
+                timing.read_time = time.perf_counter() - started
+            else:
+                timing.parse_time = time.perf_counter() - read_done - timing.validate_time
+        if errors:
+            return ValidationResult.invalid(file_path, file_format, errors, note)
+        return ValidationResult.valid(file_path, file_format, note)
+
+    def validate_bytes(self, data: bytes, file_format: FileFormat, name: str,
+                       timing: FileTiming | None = None) -> ValidationResult:
+        """
+        Validates contents that are not on disk, such as an editor's unsaved buffer or an
+        archive member, as file_format. name stands in for the file path in the result
+        and in XML base URLs. When timing is given, parse and validation times are recorded on it.
+        """
+        if timing is None:
+            timing = FileTiming(name, "")
+        started = time.perf_counter()
+        try:
+            with FileBuffer.from_bytes(data, name) as buffer:
+                note, errors = self._validate_buffer(buffer, file_format, timing)
+        except Exception as e:
+            return ValidationResult.critical(name, file_format, str(e))
+        finally:
+            timing.bytes_read = len(data)
+            timing.parse_time = time.perf_counter() - started - timing.validate_time
+        if errors:
+            return ValidationResult.invalid(name, file_format, errors, note)
+        return ValidationResult.valid(name, file_format, note)
+
+    def validate_archive(self, archive_path: str, extension: str,
+                         prefetched=None) -> Iterator[tuple[ValidationResult, FileTiming]]:
+        """
+        Validates the members of a zip or tar archive with a supported extension, yielding
+        a (result, timing) pair per member as soon as it is parsed, while the following
+        members are decompressed in the background. prefetched is a future reading the
+        archive into a FileBuffer, as for validate_file. An archive that cannot be read
+        yields a single ARCHIVE-format error for the archive itself, after any members
+        already read.
+        """
+        try:
+            buffer = prefetched.result() if prefetched is not None else None
+            members = read_members(archive_path, extension, self.extensions,
+                                   buffer.stream() if buffer is not None else None)
+            for file_path, member_extension, data, waited in members:
+                timing = FileTiming(file_path, member_extension, len(data) if isinstance(data, bytes) else 0)
+                timing.read_time = waited
+                file_format = self.extensions[member_extension]
+                if isinstance(data, Exception):
+                    yield ValidationResult.critical(file_path, file_format, f"Cannot read archive member: {data}"), timing
+                else:
+                    yield self.validate_bytes(data, file_format, file_path, timing), timing
+        except Exception as e:
+            timing = FileTiming(archive_path, extension)
+            yield ValidationResult.critical(archive_path, FileFormat.ARCHIVE, f"Cannot read archive: {e}"), timing
+
+    def _validate_buffer(self, buffer: FileBuffer, file_format: FileFormat,
+                         timing: FileTiming) -> tuple[str, list[ErrorEntry]]:
+        """
+        Dispatches a file's contents to the checker for its format, timing DTD validation.
+        Returns (note, errors); the file is valid when errors is empty.
+        """
+        # Only a UTF-8 BOM is ever accepted; any other BOM fails UTF-8 decoding, as before.
+        skip_bom = self.allow_bom and buffer.bom == "utf-8"
+
+        if file_format == FileFormat.JSON:
+            if buffer.bom == "utf-8" and not self.allow_bom:
+                raise json.JSONDecodeError("Unexpected UTF-8 BOM (decode using utf-8-sig)", "", 0)
+            text = buffer.text("utf-8", skip_bom)
+            if self.syntax_only:
+                errors = check_json_syntax(text)
+                return "" if errors else "Valid JSON", errors
+            parser_pool.json_decoder.decode(text)
+            return "Valid JSON", []
+
+        elif file_format in (FileFormat.XML, FileFormat.DITA, FileFormat.XLIFF):
+            # DTD validation needs the whole tree, so with DTDs loaded even very large
+            # files are parsed in full rather than passed on well-formedness alone.
+            if buffer.size > XML_STREAMING_THRESHOLD_BYTES and not self.dtds:
+                return self._validate_xml_streaming(buffer)
+
+            from lxml import etree
+            parser = parser_pool.xml_parser
+            if buffer.is_mapped:
+                doc = etree.parse(buffer.stream(), parser, base_url=buffer.file_path)
+            else:
+                # Parses straight from the bytes already in memory.
+                root = etree.fromstring(buffer.data, parser, base_url=buffer.file_path)
+                doc = root.getroottree() if root is not None else None
+
+            errors = self._collect_errors(parser.error_log)
+
+            if errors:
+                return "", errors
+            if not self.dtds:
+                return "Valid", []
+
+            validation_started = time.perf_counter()
+            try:
+                route = self.dtd_router.route(doc)
+                if route is not None:
+                    dtd_name, dtd = route
+                    dtd_errors = self._validate_dtd(dtd, doc)
+                    if not dtd_errors:
+                        return f"Valid and DTD compliant ({dtd_name})", []
+                    return f"Validated against {dtd_name}", dtd_errors
+
+                # No route matched: fall back to trying every DTD until one passes,
+                # reporting the errors of the last one tried.
+                for dtd_name, dtd in self.dtds:
+                    dtd_errors = self._validate_dtd(dtd, doc)
+                    if not dtd_errors:
+                        return f"Valid and DTD compliant ({dtd_name})", []
+                return f"Validated against {dtd_name}", dtd_errors
+            finally:
+                timing.validate_time = time.perf_counter() - validation_started
+
+        elif file_format == FileFormat.PO:
+            with buffer.view() as view:
+                text = decode_po(view)
+            if self.syntax_only:
+                errors = check_po_syntax(text)
+                return "" if errors else "Valid PO", errors
+            import polib
+            # polib accepts the file's content in place of a path.
+            polib.pofile(text)
+            return "Valid PO", []
+
+        else:
+            yaml_stream = buffer.text_stream("utf-8", skip_bom)
+            if self.syntax_only:
+                errors = check_yaml_syntax(yaml_stream, parser_pool.yaml_loader)
+                return "" if errors else "Valid YAML", errors
+            parser_pool.yaml_loader.load(yaml_stream)
+            return "Valid YAML", []
+
+    def _validate_dtd(self, dtd, doc) -> list[ErrorEntry]:
+        """Validates doc against dtd, returning its errors (empty when valid)."""
+        with self._dtd_locks[id(dtd)]:
+            if dtd.validate(doc):
+                return []
+            return self._collect_errors(dtd.error_log, _dtd_error)
+
+    def _collect_errors(self, error_log, convert=_xml_error, complete: bool = True) -> list[ErrorEntry]:
+        """
+        Converts an lxml error log, keeping at most max_errors entries and noting how many
+        were left out. complete is False when parsing stopped before the end of the file.
+        """
+        if self.max_errors is None or len(error_log) <= self.max_errors:
+            return [convert(error) for error in error_log]
+        errors = [convert(error) for error in itertools.islice(error_log, self.max_errors)]
+        if complete:
+            message = f"{len(error_log) - self.max_errors} more errors not shown"
+        else:
+            message = f"Stopped after {self.max_errors} errors; the rest of the file was not checked"
+        errors.append(ErrorEntry(0, 0, "truncated", message))
+        return errors
+
+    def _validate_xml_streaming(self, buffer: FileBuffer) -> tuple[str, list[ErrorEntry]]:
+        """
+        Checks well-formedness of a very large XML file with iterparse, clearing each
+        element once it is closed so peak memory does not grow with the file size.
+        Only used when no DTDs are loaded.
+        """
+        from lxml import etree
+        context = etree.iterparse(buffer.stream(), events=("end",), recover=True, huge_tree=True)
+        complete = True
+        for count, (_, element) in enumerate(context, start=1):
+            element.clear(keep_tail=True)
+            # Drop already-processed siblings still referenced by the parent.
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+            # With an error cap, a badly broken file is abandoned once the cap is exceeded.
+            if self.max_errors is not None and count % 1024 == 0 and len(context.error_log) > self.max_errors:
+                complete = False
+                break
+
+        errors = self._collect_errors(context.error_log, complete=complete)
+        return ("", errors) if errors else ("Valid", [])
+
+# The pool outlives individual runs so its processes keep their compiled DTDs warm.
+_shared_pool = None
+_shared_pool_size = 0
+_shared_pool_lock = threading.Lock()
+
+def get_process_pool(max_workers: int):
+    """Returns the process pool shared by all runs, recreating it if the size changed."""
+    global _shared_pool, _shared_pool_size
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool_size != max_workers:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            if _shared_pool is not None:
+                _shared_pool.shutdown(wait=False, cancel_futures=True)
+            _shared_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                # Forking a process that already runs other threads (Qt, discovery) is unsafe; always spawn.
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _shared_pool_size = max_workers
+        return _shared_pool
+
+def shutdown_process_pool():
+    """Stops the shared process pool. The next parallel run starts a fresh one."""
+    global _shared_pool, _shared_pool_size
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.shutdown(wait=False, cancel_futures=True)
+        _shared_pool = None
+        _shared_pool_size = 0
+
+# Per-process checker and the run settings it was built for. It is rebuilt only
+# when the settings change, and DTDs come from the process-wide DTD cache.
+_pool_checker: FileChecker | None = None
+_pool_checker_settings: CheckerSettings | None = None
+
+def _validate_chunk(settings: CheckerSettings, chunk: list[tuple]) -> list[tuple[ValidationResult, FileTiming]]:
+    """
+    Validates a batch of discovered (file_path, extension, size, mtime_ns) entries inside
+    a pool process with the checker settings of the run the chunk belongs to, returning
+    one (result, timing) pair per entry, in order, or for an archive a list of such
+    pairs, one per member.
+    """
+    global _pool_checker, _pool_checker_settings
+    if _pool_checker_settings != settings:
+        _pool_checker = FileChecker.from_settings(settings)
+        _pool_checker.load_dtds()
+        _pool_checker_settings = settings
+    outcomes = []
+    for file_path, extension, size, *_ in chunk:
+        if extension in ARCHIVE_EXTENSIONS:
+            outcomes.append(list(_pool_checker.validate_archive(file_path, extension)))
+            continue
+        timing = FileTiming(file_path, extension, size)
+        outcomes.append((_pool_checker.validate_file(file_path, extension, size, timing=timing), timing))
+    return outcomes
+
+# Marks the end of discovery on the file queue.
+_DISCOVERY_DONE = object()
+
+def discover_files(directory_path: str, extensions, path_filter: PathFilter | None = None):
+    """
+    Lazily walks directory_path with os.scandir, yielding (file_path, extension, size, mtime_ns)
+    for every matching file. Unreadable directories are skipped, as os.walk does, and so
+    are directories path_filter excludes, without being listed.
+    """
+    pending_dirs = [directory_path]
+    while pending_dirs:
+        current_dir = pending_dirs.pop()
+        subdirs = []
+        try:
+            with os.scandir(current_dir) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if path_filter is None or path_filter.allows_dir(entry.path):
+                                subdirs.append(entry.path)
+                            continue
+                        extension = file_extension(entry.name)
+                        if (extension in extensions and entry.is_file()
+                                and (path_filter is None or path_filter.allows_file(entry.path))):
+                            stat = entry.stat()
+                            yield entry.path, extension, stat.st_size, stat.st_mtime_ns
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        pending_dirs.extend(reversed(subdirs))
+
+def _iter_chunks(file_queue: queue.Queue, max_files: int, max_bytes: int, poll_interval: float):
+    """
+    Groups queued files into batches of at most max_files entries or max_bytes total size,
+    so many small files share a single IPC round trip while large files travel alone.
+    A batch is released early whenever the queue runs dry, so slow discovery never holds
+    results back, and an empty batch is yielded on each poll timeout so the caller can
+    collect finished work while waiting.
+    """
+    chunk = []
+    chunk_bytes = 0
+    while True:
+        try:
+            item = file_queue.get(timeout=poll_interval) if not chunk else file_queue.get_nowait()
+        except queue.Empty:
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+            continue
+        if item is _DISCOVERY_DONE:
+            break
+        size = item[2]
+        if chunk and (len(chunk) >= max_files or chunk_bytes + size > max_bytes):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(item)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+class ValidationEngine:
+    """
+    Runs one complete validation pass. Progress and results are reported through
+    plain callbacks, so the same engine drives the GUI worker and the headless CLI.
+
+    on_result(result) receives each ValidationResult, DTD load results included, unless
+    on_batch is given, in which case results are delivered as lists.
+    on_discovered(count) reports the running discovery total and on_total(count)
+    the final one. Callbacks may be invoked from the discovery thread.
+    With a single worker, up to prefetch_depth files (prefetch_bytes in total) are
+    read ahead of the parser; a depth of 0 disables read-ahead.
+    Discovery keeps files whose extension is in extensions (an extension -> FileFormat
+    mapping, all supported formats by default) and that path_filter allows; without a
+    filter, only VCS metadata directories are skipped.
+    With changed_since, a git ref, only the files git reports as changed since the
+    merge base with that ref (committed, uncommitted or untracked) are validated
+    instead of the whole tree.
+    With archives, zip and tar files found in the tree are validated member by member;
+    when directory_path is itself an archive, its members are always validated. Archive
+    members are reported as 'archive.zip!/path/in/archive' and are not cached.
+    With shard, an (index, count) pair with 0 <= index < count, only the files whose
+    relative path hashes to that index are validated, so count runs on separate
+    machines cover the tree between them exactly once.
+    With dedup, byte-identical files are grouped once discovery has finished and only
+    one file per group is validated; its result is reported for every file in the
+    group, carrying the group size. Files answered from the cache are not grouped.
+    With fail_fast, the run stops at the first file that fails; max_errors caps the errors
+    kept per file. cancel() stops a run cooperatively from any thread: files already being
+    validated finish, nothing further is started, and run() returns normally with
+    stopped set.
+    Timings are collected in stats; on_stats(summary) receives a RunStats summary
+    periodically while files are validated, and a final one when the run completes.
+    An engine can be run repeatedly; watch mode reruns it on just the files that changed.
+    """
+    def __init__(self, directory_path: str, dtd_paths: list[str], allow_bom: bool = False, max_workers: int = 1,
+                 cache_path: str | None = None, force_revalidate: bool = False, syntax_only: bool = False,
+                 prefetch_depth: int = PREFETCH_DEPTH, prefetch_bytes: int = PREFETCH_MAX_BYTES,
+                 extensions: dict | None = None, path_filter: PathFilter | None = None, dedup: bool = False,
+                 changed_since: str | None = None, archives: bool = False, shard: tuple[int, int] | None = None,
+                 fail_fast: bool = False, max_errors: int | None = None,
+                 on_result: Callable[[ValidationResult], None] | None = None,
+                 on_batch: Callable[[list], None] | None = None,
+                 on_discovered: Callable[[int], None] | None = None,
+                 on_total: Callable[[int], None] | None = None,
+                 on_stats: Callable[[dict], None] | None = None):
+        self.directory_path = directory_path
+        self.dtd_paths = dtd_paths
+        self.allow_bom = allow_bom
+        self.syntax_only = syntax_only
+        self.max_workers = max(1, max_workers)
+        self.prefetch_depth = max(0, prefetch_depth)
+        self.prefetch_bytes = prefetch_bytes
+        self.extensions = extensions or FORMAT_BY_EXTENSION
+        self.path_filter = path_filter if path_filter is not None else PathFilter(directory_path)
+        self.dedup = dedup
+        self.changed_since = changed_since
+        self.archives = archives or is_archive(directory_path)
+        self.shard = shard
+        self.fail_fast = fail_fast
+        self.max_errors = max_errors or None
+        self.stopped = False
+        self._total = None
+        self._extra_results = 0
+        self._duplicates = {}
+        self.dtd_signatures = {}
+        self.checker_settings = None
+        self.checker = None
+        self.cache_path = cache_path
+        self.force_revalidate = force_revalidate
+        self.on_result = on_result
+        self.on_batch = on_batch
+        self.on_discovered = on_discovered
+        self.on_total = on_total
+        self.on_stats = on_stats
+        self.stats = RunStats()
+        self._last_stats_report = 0.0
+        self.batcher = None
+        self.cache = None
+        self._cache_fingerprint = None
+        self._stop_discovery = threading.Event()
+        self._cancelled = threading.Event()
+        self._discovery_error = None
+
+    def cancel(self):
+        """Asks the current run, or the next one if none is running, to stop as soon as possible."""
+        self._cancelled.set()
+
+    def run(self, files: list[tuple] | None = None, deleted: list[str] = ()):
+        """
+        Discovers files on a background thread and validates them as they arrive.
+        Given files, a list of (file_path, extension, size, mtime_ns) entries, validates only
+        those instead of walking the directory, without reporting the DTDs again, and drops
+        the deleted paths from the cache. Raises if discovery or validation fails.
+        """
+        self.stats = RunStats()
+        file_queue = queue.Queue(maxsize=DISCOVERY_QUEUE_SIZE)
+        self._stop_discovery.clear()
+        self._discovery_error = None
+        self._duplicates = {}
+        self._total = None
+        self._extra_results = 0
+        self.stopped = False
+        discovery_thread = threading.Thread(target=self._discover, args=(file_queue, files, deleted), daemon=True)
+        try:
+            if self.on_batch is not None:
+                self.batcher = ResultBatcher(self.on_batch, RESULT_BATCH_SIZE, RESULT_BATCH_INTERVAL_MS)
+            # Stat each DTD's file tree once per run; the signatures let every process
+            # reuse its cached compiled DTDs without checking the files again, and tie
+            # cached results to the modules and entity files the DTDs include.
+            signatures_started = time.monotonic()
+            self.dtd_signatures = {path: dtd_signature(path) for path in self.dtd_paths if os.path.isfile(path)}
+            signature_time = time.monotonic() - signatures_started
+            if self.cache_path:
+                from cache import ValidationCache, config_fingerprint
+                self._cache_fingerprint = config_fingerprint(self.dtd_paths, self.allow_bom, self.syntax_only,
+                                                             self.extensions, self.max_errors, self.dtd_signatures)
+                self.cache = ValidationCache(self.cache_path, self._cache_fingerprint, CACHE_HASH_CONTENTS)
+            discovery_thread.start()
+
+            dtd_load_started = time.monotonic() - signature_time
+            self.checker_settings = CheckerSettings(
+                tuple(self.dtd_paths), self.allow_bom, self.syntax_only, tuple(sorted(self.extensions.items())),
+                self.max_errors, tuple(sorted(self.dtd_signatures.items())),
+            )
+            self.checker = FileChecker.from_settings(self.checker_settings)
+            dtd_results = self.checker.load_dtds()
+            self.stats.add_phase("dtd_load", time.monotonic() - dtd_load_started)
+            if files is None:
+                for dtd_result in dtd_results:
+                    self._emit_result(dtd_result)
+
+            if self.max_workers > 1:
+                self._run_parallel(file_queue)
+            elif self.prefetch_depth > 0:
+                self._run_prefetched(file_queue)
+            else:
+                while not self._cancelled.is_set() and (item := file_queue.get()) is not _DISCOVERY_DONE:
+                    self._validate_item(item)
+
+            if self._discovery_error is not None:
+                raise self._discovery_error
+            self.stats.finish()
+            if self.on_stats is not None:
+                self.on_stats(self.stats.summary())
+        finally:
+            self.stopped = self._cancelled.is_set()
+            # Also stops discovery and dedup hashing when validation raised.
+            self._cancelled.set()
+            self._stop_discovery.set()
+            if discovery_thread.is_alive():
+                discovery_thread.join()
+            self._cancelled.clear()
+            if self.cache is not None:
+                self.cache.close()
+                self.cache = None
+            if self.batcher is not None:
+                self.batcher.close()
+                self.batcher = None
+
+    def _discover(self, file_queue: queue.Queue, files: list[tuple] | None = None, deleted: list[str] = ()):
+        """
+        Discovery thread body. Feeds the bounded file queue, reporting a running total,
+        and always finishes with the _DISCOVERY_DONE marker.
+        Files with a valid cache entry are reported directly and never queued.
+        Discovery ends early, without evicting anything, once the run is cancelled.
+        Once a full walk completes, cache entries for files no longer on disk are evicted;
+        when an explicit list of files is given, only the deleted paths are, and when
+        validating git changes, none are.
+        With dedup, files are held back until discovery ends and only group representatives are queued.
+        """
+        discovered = 0
+        started = time.monotonic()
+        last_progress = started
+        progress_interval = PROGRESS_INTERVAL_MS / 1000
+        cache = None
+        walking = files is None and self.changed_since is None
+        try:
+            if self.cache_path:
+                from cache import ValidationCache
+                # SQLite connections are bound to their thread, so discovery opens its own.
+                cache = ValidationCache(self.cache_path, self._cache_fingerprint, CACHE_HASH_CONTENTS)
+                if walking:
+                    cache.begin_sweep()
+                elif deleted:
+                    cache.forget(deleted)
+            seen_batch = []
+            held_back = []
+            extensions = tuple(self.extensions) + (ARCHIVE_EXTENSIONS if self.archives else ())
+            if walking and os.path.isfile(self.directory_path):
+                stat = os.stat(self.directory_path)
+                files = [(self.directory_path, file_extension(self.directory_path), stat.st_size, stat.st_mtime_ns)]
+            elif walking:
+                files = discover_files(self.directory_path, extensions, self.path_filter)
+            elif files is None:
+                files = changed_files(self.directory_path, self.changed_since, extensions, self.path_filter)
+            for item in files:
+                if self._cancelled.is_set():
+                    break
+                if cache is not None and walking:
+                    # Every file on disk counts as seen, including other shards' files.
+                    seen_batch.append(item[0])
+                    if len(seen_batch) >= 500:
+                        cache.mark_seen(seen_batch)
+                        seen_batch.clear()
+                if self.shard is not None and shard_of(self._relative(item[0]), self.shard[1]) != self.shard[0]:
+                    continue
+
+                discovered += 1
+                now = time.monotonic()
+                if now - last_progress >= progress_interval:
+                    last_progress = now
+                    if self.on_discovered is not None:
+                        self.on_discovered(discovered)
+
+                if cache is not None and not self.force_revalidate:
+                    cached_result = cache.lookup(item[0], item[2], item[3])
+                    if cached_result is not None:
+                        self.stats.add_cached()
+                        self._emit_result(cached_result)
+                        continue
+
+                if self.dedup:
+                    held_back.append(item)
+                elif not self._put(file_queue, item):
+                    return
+            self._total = discovered
+            if self.on_total is not None:
+                self.on_total(discovered + self._extra_results)
+            if held_back:
+                held_back, self._duplicates = group_duplicates(held_back, self.extensions, self._cancelled)
+                for item in held_back:
+                    if not self._put(file_queue, item):
+                        return
+            self.stats.add_phase("discovery", time.monotonic() - started)
+
+            if cache is not None and walking and not self._cancelled.is_set():
+                cache.mark_seen(seen_batch)
+                cache.evict_unseen(self.directory_path)
+        except Exception as e:
+            self._discovery_error = e
+        finally:
+            if cache is not None:
+                cache.close()
+            self._put(file_queue, _DISCOVERY_DONE)
+
+    def _relative(self, file_path: str) -> str:
+        """Returns file_path relative to the validated directory, with '/' separators on every platform."""
+        root = os.path.join(self.directory_path, "")
+        relative_path = file_path[len(root):] if file_path.startswith(root) else os.path.relpath(file_path, root)
+        return relative_path.replace(os.sep, "/") if os.sep != "/" else relative_path
+
+    def _report(self, item: tuple, result: ValidationResult, timing: FileTiming):
+        """
+        Emits a freshly validated file's result, records it in the cache and adds its timing.
+        A group representative's result is also emitted and cached for each of its duplicates.
+        """
+        duplicates = self._duplicates.pop(item[0], ())
+        if duplicates:
+            result.group_size = len(duplicates) + 1
+        if self.cache is not None:
+            self.cache.store(item[2], item[3], result)
+        self.stats.add_file(timing)
+        self._emit_result(result)
+        for duplicate in duplicates:
+            duplicate_result = result.for_duplicate(duplicate[0], result.group_size)
+            if self.cache is not None:
+                self.cache.store(duplicate[2], duplicate[3], duplicate_result)
+            self.stats.add_duplicate(duplicate[2])
+            self._emit_result(duplicate_result)
+        self._report_stats()
+
+    def _report_archive(self, outcomes):
+        """
+        Emits the results of an archive's members as they arrive and adds their timings.
+        The archive was counted as one discovered file, so the total is corrected for
+        the number of results it actually produced.
+        """
+        count = 0
+        for result, timing in outcomes:
+            count += 1
+            self.stats.add_file(timing)
+            self._emit_result(result)
+            self._report_stats()
+            if self._cancelled.is_set():
+                break
+        self._extra_results += count - 1
+        if self._total is not None and self.on_total is not None:
+            self.on_total(self._total + self._extra_results)
+
+    def _report_stats(self):
+        """Sends a stats summary to on_stats, at most once per progress interval."""
+        if self.on_stats is not None:
+            now = time.monotonic()
+            if now - self._last_stats_report >= PROGRESS_INTERVAL_MS / 1000:
+                self._last_stats_report = now
+                self.on_stats(self.stats.summary())
+
+    def _emit_result(self, result: ValidationResult):
+        """
+        Delivers one result, through the batcher when batching is enabled.
+        With fail_fast, a failing file cancels the run.
+        """
+        if self.fail_fast and not result.ok and not result.is_system:
+            self._cancelled.set()
+        if self.batcher is not None:
+            self.batcher.add(result)
+        elif self.on_result is not None:
+            self.on_result(result)
+
+    def _put(self, file_queue: queue.Queue, item) -> bool:
+        """Blocking put that gives up once the consumer has stopped."""
+        while not self._stop_discovery.is_set():
+            try:
+                file_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run_prefetched(self, file_queue: queue.Queue):
+        """Validates files one at a time while the next ones are read on background threads."""
+        files = prefetch_files(file_queue, _DISCOVERY_DONE, self.prefetch_depth, self.prefetch_bytes, PREFETCH_THREADS)
+        try:
+            for item, prefetched in files:
+                if self._cancelled.is_set():
+                    break
+                self._validate_item(item, prefetched)
+        finally:
+            files.close()
+
+    def _validate_item(self, item: tuple, prefetched=None):
+        """Validates one discovered file, or each member of an archive, on this thread."""
+        if item[1] in ARCHIVE_EXTENSIONS:
+            self._report_archive(self.checker.validate_archive(item[0], item[1], prefetched))
+            return
+        timing = FileTiming(item[0], item[1], item[2])
+        self._report(item, self.checker.validate_file(item[0], item[1], item[2], prefetched, timing), timing)
+
+    def _run_parallel(self, file_queue: queue.Queue):
+        """
+        Fans chunks of files out to a process pool and emits results as chunks complete.
+        At most two chunks per process are in flight, keeping memory flat.
+        """
+        from concurrent.futures.process import BrokenProcessPool
+
+        executor = get_process_pool(self.max_workers)
+        max_in_flight = self.max_workers * 2
+        pending = {}
+        try:
+            for chunk in _iter_chunks(file_queue, WORKER_CHUNK_FILES, WORKER_CHUNK_BYTES, poll_interval=0.05):
+                if self._cancelled.is_set():
+                    break
+                if chunk:
+                    pending[executor.submit(_validate_chunk, self.checker_settings, chunk)] = chunk
+                pending = self._emit_completed(pending, block=len(pending) >= max_in_flight)
+            # Chunks already running in the pool cannot be interrupted; a cancelled run does not wait for them.
+            while pending and not self._cancelled.is_set():
+                pending = self._emit_completed(pending, block=True)
+        except BrokenProcessPool:
+            shutdown_process_pool()
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _emit_completed(self, pending: dict, block: bool) -> dict:
+        """
+        Reports results for finished chunks and returns the futures still running,
+        mapped to their chunks.
+        """
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        done, _ = wait(pending, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            chunk = pending.pop(future)
+            for item, outcome in zip(chunk, future.result()):
+                if item[1] in ARCHIVE_EXTENSIONS:
+                    self._report_archive(outcome)
+                else:
+                    self._report(item, *outcome)
+        return pending
@@ -0,0 +1,278 @@
+"""
+Report Exporters
+Stream validation results to HTML, NDJSON, CSV or JUnit XML files one result at
+a time, so exporting never holds more than one section of the report in memory.
+"""
+
+import os
+import re
+import csv
+import html
+import json
+from collections.abc import Callable, Iterable
+
+from config import REPORT_SECTION_ROWS
+from results import ValidationResult, Status, ndjson_record
+from run_stats import format_summary
+
+# Characters XML 1.0 does not allow, even escaped.
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+# xml.sax.saxutils would pull urllib and email into every headless start, so escape here.
+_ATTRIBUTE_WHITESPACE = str.maketrans({"\n": "&#10;", "\r": "&#13;", "\t": "&#9;"})
+
+def _xml_attribute(value: str) -> str:
+    """Returns value escaped and quoted as an XML attribute value, keeping line breaks."""
+    return '"' + html.escape(value).translate(_ATTRIBUTE_WHITESPACE) + '"'
+
+class ReportExporter:
+    """
+    Base class for exporters. Call begin(), add() for every result, then finish().
+    Counts files and failures as results go past; DTD results are not counted as files.
+    """
+    extension = ""
+    description = ""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.files = 0
+        self.failed = 0
+
+    def begin(self):
+        pass
+
+    def add(self, result: ValidationResult):
+        if not result.is_system:
+            self.files += 1
+            if not result.ok:
+                self.failed += 1
+        self.write_result(result)
+
+    def write_result(self, result: ValidationResult):
+        raise NotImplementedError
+
+    def finish(self, stats: dict | None = None):
+        pass
+
+class SectionedExporter(ReportExporter):
+    """
+    Groups consecutive results from the same directory into sections of at most
+    REPORT_SECTION_ROWS results, so a section's totals can be written before its rows.
+    """
+    def __init__(self, stream):
+        super().__init__(stream)
+        self._section_dir = None
+        self._section = []
+
+    def write_result(self, result: ValidationResult):
+        dir_path = result.dir_path
+        if dir_path != self._section_dir or len(self._section) >= REPORT_SECTION_ROWS:
+            self._flush_section()
+            self._section_dir = dir_path
+        self._section.append(result)
+
+    def _flush_section(self):
+        if self._section:
+            self.write_section(self._section_dir, self._section)
+            self._section = []
+
+    def write_section(self, dir_path: str, results: list[ValidationResult]):
+        raise NotImplementedError
+
+    def finish(self, stats: dict | None = None):
+        self._flush_section()
+
+class HtmlExporter(SectionedExporter):
+    """Styled HTML report with one collapsible section per directory; failing sections start expanded."""
+    extension = ".html"
+    description = "HTML Files (*.html)"
+
+    def begin(self):
+        self.stream.write("".join([
+            "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Validation Report</title><style>",
+            "body { font-family: sans-serif; }",
+            "table { border-collapse: collapse; width: 100%; }",
+            "th, td { border: 1px solid #ddd; padding: 8px; text-align: left; vertical-align: top; }",
+            "th { background-color: #f2f2f2; }",
+            "details { margin-bottom: 6px; }",
+            "summary { cursor: pointer; padding: 4px; font-weight: bold; }",
+            ".failed-count { color: #dc3545; }",
+            "tr.valid-row { background-color: #e9f5e9; }",
+            "tr.invalid-row { background-color: #fbe9e9; }",
+            "ul { margin: 0; padding-left: 20px; }",
+            "</style></head><body><h1>Validation Report</h1>\n",
+        ]))
+
+    def write_section(self, dir_path: str, results: list[ValidationResult]):
+        failed = sum(1 for result in results if not result.ok)
+        failed_html = f", <span class='failed-count'>{failed} failed</span>" if failed else ""
+        parts = [
+            f"<details{' open' if failed else ''}><summary>{html.escape(dir_path)} "
+            f"({len(results)} rows{failed_html})</summary>",
+            "<table><thead><tr><th>Filename</th><th>Details</th></tr></thead><tbody>",
+        ]
+        for result in results:
+            messages = result.messages()
+            if len(messages) > 1:
+                details_html = f"<ul>{''.join(f'<li>{html.escape(line)}</li>' for line in messages)}</ul>"
+            else:
+                details_html = html.escape("".join(messages))
+            parts.append(f"<tr class='{'valid-row' if result.ok else 'invalid-row'}'>"
+                         f"<td>{html.escape(result.display_name)}</td><td>{details_html}</td></tr>")
+        parts.append("</tbody></table></details>\n")
+        self.stream.write("".join(parts))
+
+    def finish(self, stats: dict | None = None):
+        super().finish(stats)
+        self.stream.write(f"<p>{self.files} files checked, {self.failed} failed.</p>")
+        if stats is not None:
+            self.stream.write(self._stats_html(stats))
+        self.stream.write("</body></html>\n")
+
+    @staticmethod
+    def _stats_html(summary: dict) -> str:
+        """Builds the performance section: phases, per-format throughput and slowest files."""
+        parts = [
+            "<h2>Performance</h2>",
+            f"<p>{html.escape(format_summary(summary)[0])}</p>",
+            "<table><thead><tr><th>Phase</th><th>Seconds</th></tr></thead><tbody>",
+        ]
+        for phase, seconds in summary["phases_s"].items():
+            parts.append(f"<tr><td>{html.escape(phase.replace('_', ' '))}</td><td>{seconds:.3f}</td></tr>")
+        parts.append("</tbody></table><h3>Per format</h3><table><thead><tr>"
+                     "<th>Format</th><th>Files</th><th>MB</th><th>Seconds</th><th>Files/s</th><th>MB/s</th>"
+                     "</tr></thead><tbody>")
+        for name, totals in summary["formats"].items():
+            parts.append(
+                f"<tr><td>{html.escape(name)}</td><td>{totals['files']}</td><td>{totals['bytes'] / 1_000_000:.2f}</td>"
+                f"<td>{totals['seconds']:.3f}</td><td>{totals['files_per_s'] or 0:.1f}</td><td>{totals['mb_per_s'] or 0:.2f}</td></tr>"
+            )
+        parts.append("</tbody></table><h3>Slowest files</h3><table><thead><tr>"
+                     "<th>File</th><th>Size</th><th>Read (ms)</th><th>Parse (ms)</th><th>Validate (ms)</th><th>Total (ms)</th>"
+                     "</tr></thead><tbody>")
+        for entry in summary["slowest"]:
+            parts.append(
+                f"<tr><td>{html.escape(entry['path'])}</td><td>{entry['size']}</td><td>{entry['read_s'] * 1000:.1f}</td>"
+                f"<td>{entry['parse_s'] * 1000:.1f}</td><td>{entry['validate_s'] * 1000:.1f}</td><td>{entry['total_s'] * 1000:.1f}</td></tr>"
+            )
+        parts.append("</tbody></table>")
+        return "".join(parts)
+
+class NdjsonExporter(ReportExporter):
+    """One JSON object per line, in the same shape as the headless mode's output."""
+    extension = ".ndjson"
+    description = "NDJSON Files (*.ndjson)"
+
+    def write_result(self, result: ValidationResult):
+        self.stream.write(json.dumps(ndjson_record(result)) + "\n")
+
+    def finish(self, stats: dict | None = None):
+        if stats is not None:
+            self.stream.write(json.dumps({"stats": stats}) + "\n")
+
+class CsvExporter(ReportExporter):
+    """Comma-separated rows: path, filename, format, status and details."""
+    extension = ".csv"
+    description = "CSV Files (*.csv)"
+
+    def begin(self):
+        self.writer = csv.writer(self.stream)
+        self.writer.writerow(("path", "filename", "format", "status", "details"))
+
+    def write_result(self, result: ValidationResult):
+        self.writer.writerow((result.dir_path, result.display_name, result.file_format.name.lower(),
+                              result.status.name.lower(), "\n".join(result.messages())))
+
+class JunitExporter(SectionedExporter):
+    """
+    JUnit XML for CI dashboards: one test suite per directory section and one test case
+    per file. Invalid files are failures; unreadable files and DTDs that failed to load are errors.
+    """
+    extension = ".xml"
+    description = "JUnit XML (*.xml)"
+
+    def begin(self):
+        self.stream.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites name="Master File Validator">\n')
+
+    def write_section(self, dir_path: str, results: list[ValidationResult]):
+        suite_name = _XML_ILLEGAL.sub("", dir_path)
+        failures = errors = 0
+        cases = []
+        for result in results:
+            case = (f'    <testcase classname={_xml_attribute(suite_name)} '
+                    f'name={_xml_attribute(_XML_ILLEGAL.sub("", result.display_name))}')
+            if result.ok:
+                cases.append(case + "/>\n")
+                continue
+            # Files that are invalid fail; files that could not be processed, and broken DTDs, are errors.
+            tag = "failure" if result.status == Status.INVALID and not result.is_system else "error"
+            if tag == "error":
+                errors += 1
+            else:
+                failures += 1
+            details = _XML_ILLEGAL.sub("\ufffd", "\n".join(result.messages()))
+            message = details.split("\n", 1)[0]
+            cases.append(f"{case}>\n      <{tag} message={_xml_attribute(message)}>{html.escape(details, quote=False)}</{tag}>\n    </testcase>\n")
+        self.stream.write(f'  <testsuite name={_xml_attribute(suite_name)} tests="{len(results)}" '
+                          f'failures="{failures}" errors="{errors}">\n')
+        self.stream.write("".join(cases))
+        self.stream.write("  </testsuite>\n")
+
+    def finish(self, stats: dict | None = None):
+        super().finish(stats)
+        self.stream.write("</testsuites>\n")
+
+EXPORTERS = (HtmlExporter, NdjsonExporter, CsvExporter, JunitExporter)
+
+def exporter_for_path(path: str) -> type[ReportExporter]:
+    """Picks the exporter from a report path's extension. Raises ValueError for unknown extensions."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        extension = ".ndjson"
+    for exporter in EXPORTERS:
+        if exporter.extension == extension:
+            return exporter
+    supported = ", ".join(exporter.extension for exporter in EXPORTERS)
+    raise ValueError(f"Unsupported report format '{extension}' (expected one of: {supported})")
+
+def open_report(path: str) -> ReportExporter:
+    """
+    Opens an exporter writing to a temporary file next to path. Pass it to
+    close_report() to move the finished file into place.
+    """
+    exporter_class = exporter_for_path(path)
+    stream = open(path + ".part", "w", encoding="utf-8", newline="" if exporter_class is CsvExporter else None,
+                  buffering=1024 * 1024)
+    exporter = exporter_class(stream)
+    exporter.begin()
+    return exporter
+
+def close_report(exporter: ReportExporter, path: str, stats: dict | None = None, completed: bool = True):
+    """Finishes the report and moves it to path, or discards it when completed is False."""
+    try:
+        if completed:
+            exporter.finish(stats)
+    finally:
+        exporter.stream.close()
+    if completed:
+        os.replace(path + ".part", path)
+    else:
+        os.remove(path + ".part")
+
+def export_results(path: str, results: Iterable[ValidationResult], stats: dict | None = None,
+                   progress: Callable[[int], None] | None = None):
+    """
+    Streams results into a report at path, in the format its extension names.
+    progress(results_written) is called every REPORT_SECTION_ROWS results. If writing
+    fails part way through, no file is left behind.
+    """
+    exporter = open_report(path)
+    completed = False
+    try:
+        for count, result in enumerate(results, start=1):
+            exporter.add(result)
+            if progress is not None and count % REPORT_SECTION_ROWS == 0:
+                progress(count)
+        completed = True
+    finally:
+        close_report(exporter, path, stats, completed)
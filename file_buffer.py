@@ -0,0 +1,117 @@
+"""
+File Buffer
+Reads each file exactly once, into memory or through a read-only memory map for
+large files, and hands the format validators views over the same bytes.
+"""
+
+import io
+import os
+import mmap
+import codecs
+
+from config import MMAP_THRESHOLD_BYTES
+
+# Longest first, so a UTF-32 LE BOM is not mistaken for UTF-16 LE.
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+class FileBuffer:
+    """
+    The contents of one file, read with a single call or memory-mapped when the file
+    is at least mmap_threshold bytes. The byte order mark is detected once on open:
+    bom is the encoding it announces (None without a BOM) and bom_length its size.
+    Use as a context manager so the map and file handle are released promptly.
+    """
+    def __init__(self, file_path: str, size: int | None = None, mmap_threshold: int = MMAP_THRESHOLD_BYTES):
+        self.file_path = file_path
+        self._mmap = None
+        # Unbuffered, so the bytes are not copied through an intermediate buffer.
+        with open(file_path, "rb", buffering=0) as f:
+            if size is None:
+                size = os.fstat(f.fileno()).st_size
+            if size >= mmap_threshold:
+                try:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    # Emptied since discovery, or a file system that cannot be mapped.
+                    self._mmap = None
+            self.data = self._mmap if self._mmap is not None else f.read()
+        self._detect_bom()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, file_path: str) -> "FileBuffer":
+        """Wraps contents already in memory, reported under file_path, without touching the disk."""
+        buffer = cls.__new__(cls)
+        buffer.file_path = file_path
+        buffer._mmap = None
+        buffer.data = data
+        buffer._detect_bom()
+        return buffer
+
+    def _detect_bom(self):
+        self.bom = None
+        self.bom_length = 0
+        head = self.data[:4]
+        for marker, encoding in _BOMS:
+            if head.startswith(marker):
+                self.bom = encoding
+                self.bom_length = len(marker)
+                break
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def is_mapped(self) -> bool:
+        return self._mmap is not None
+
+    def view(self, skip_bom: bool = False) -> memoryview:
+        """
+        Returns a zero-copy view of the contents, optionally past the BOM.
+        Release it (or use it in a with block) before the buffer is closed.
+        """
+        view = memoryview(self.data)
+        return view[self.bom_length:] if skip_bom else view
+
+    def text(self, encoding: str = "utf-8", skip_bom: bool = False) -> str:
+        """Decodes the contents, dropping the BOM first when skip_bom is set."""
+        with self.view(skip_bom) as view:
+            return str(view, encoding)
+
+    def text_stream(self, encoding: str = "utf-8", skip_bom: bool = False) -> io.StringIO:
+        """
+        Returns the decoded contents as a text stream named after the file, for
+        parsers that report the stream name in their error messages.
+        """
+        stream = io.StringIO(self.text(encoding, skip_bom))
+        stream.name = self.file_path
+        return stream
+
+    def stream(self):
+        """Returns a binary file-like object over the contents, positioned at the start."""
+        if self._mmap is not None:
+            self._mmap.seek(0)
+            return self._mmap
+        return io.BytesIO(self.data)
+
+    def close(self):
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A view is still alive (e.g. held by a traceback); the map is freed with it.
+                pass
+            self._mmap = None
+        self.data = b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
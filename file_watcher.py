@@ -0,0 +1,101 @@
+"""
+File Watcher
+Qt side of watch mode: turns QFileSystemWatcher notifications into debounced batches
+of created, modified and deleted files, falling back to polling the tree index when
+the platform cannot watch every path.
+"""
+
+import os
+import logging
+
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+
+from config import WATCH_DEBOUNCE_MS, WATCH_POLL_INTERVAL_MS
+from tree_index import TreeIndex, TreeChanges, PendingChanges
+
+class FileWatcher(QObject):
+    """
+    Watches the directories and files of a built TreeIndex. Each notification only
+    rescans the directory or stats the file it names. changes_pending is emitted once
+    the tree has been quiet for WATCH_DEBOUNCE_MS; call take_changes() to collect them.
+    """
+    changes_pending = Signal()
+
+    def __init__(self, tree_index: TreeIndex, parent=None):
+        super().__init__(parent)
+        self.tree_index = tree_index
+        self.pending = PendingChanges()
+        self._watched = set()
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(WATCH_DEBOUNCE_MS)
+        self._debounce_timer.timeout.connect(self.changes_pending)
+
+        self._poll_timer = None
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._watch(tree_index.directories() + tree_index.files())
+
+    @property
+    def is_polling(self) -> bool:
+        return self._poll_timer is not None
+
+    def take_changes(self) -> tuple[list, list]:
+        """Returns (changed entries, deleted paths) collected so far."""
+        return self.pending.take()
+
+    def stop(self):
+        self._debounce_timer.stop()
+        if self._poll_timer is not None:
+            self._poll_timer.stop()
+        self._unwatch()
+
+    def _watch(self, paths: list[str]):
+        if self._poll_timer is not None:
+            return
+        new_paths = [path for path in paths if path not in self._watched]
+        if not new_paths:
+            return
+        failed = set(self._watcher.addPaths(new_paths))
+        self._watched.update(path for path in new_paths if path not in failed)
+        # Paths that vanished before they could be watched are fine; anything else
+        # (usually the inotify watch limit) would make notifications miss changes.
+        if any(os.path.exists(path) for path in failed):
+            logging.warning(f"Cannot watch {len(failed)} paths; polling {self.tree_index.root} for changes instead.")
+            self._unwatch()
+            self._poll_timer = QTimer(self)
+            self._poll_timer.setInterval(WATCH_POLL_INTERVAL_MS)
+            self._poll_timer.timeout.connect(self._poll)
+            self._poll_timer.start()
+
+    def _unwatch(self):
+        paths = self._watcher.directories() + self._watcher.files()
+        if paths:
+            self._watcher.removePaths(paths)
+        self._watched.clear()
+
+    def _poll(self):
+        self._merge(self.tree_index.poll())
+
+    def _on_directory_changed(self, dir_path: str):
+        self._merge(self.tree_index.rescan(dir_path))
+
+    def _on_file_changed(self, file_path: str):
+        # Editors that save by replacing the file drop the watch along with the old inode,
+        # so watch the path afresh.
+        self._watcher.removePath(file_path)
+        self._watched.discard(file_path)
+        self._merge(self.tree_index.refresh_file(file_path))
+        if os.path.exists(file_path) and self.tree_index.contains(file_path):
+            self._watch([file_path])
+
+    def _merge(self, changes: TreeChanges):
+        if not changes:
+            return
+        self.pending.merge(changes)
+        self._watched.difference_update(changes.deleted)
+        self._watched.difference_update(changes.removed_dirs)
+        self._watch(changes.added_dirs + [item[0] for item in changes.changed])
+        self._debounce_timer.start()
@@ -0,0 +1,71 @@
+"""
+Git Changes
+Lists the files a branch touches, for validating only what changed: files added,
+modified or renamed since the merge base with a base ref, plus uncommitted and
+untracked files, as reported by the local git binary.
+"""
+
+import os
+import stat
+import subprocess
+
+from archives import file_extension
+
+class GitError(Exception):
+    """Raised when git is missing, the directory is not in a repository or the ref is unknown."""
+
+def _git(directory_path: str, *args: str) -> bytes:
+    try:
+        result = subprocess.run(["git", "-C", directory_path, *args], capture_output=True, check=False)
+    except OSError as e:
+        raise GitError(f"Cannot run git: {e}") from e
+    if result.returncode != 0:
+        message = result.stderr.decode(errors="replace").strip() or f"git {args[0]} failed"
+        raise GitError(message)
+    return result.stdout
+
+def changed_paths(directory_path: str, base_ref: str) -> list[str]:
+    """
+    Returns the paths under directory_path that were added, copied, modified, renamed or
+    had their type changed between the merge base of base_ref and HEAD and the working
+    tree, followed by untracked files that are not ignored. Deleted files are left out.
+    Raises GitError if git cannot answer.
+    """
+    merge_base = _git(directory_path, "merge-base", base_ref, "HEAD").decode().strip()
+    # --relative limits both commands to directory_path and makes their paths relative to it.
+    changed = _git(directory_path, "diff", "--name-only", "-z", "--relative", "--diff-filter=ACMRT", merge_base)
+    untracked = _git(directory_path, "ls-files", "-z", "--others", "--exclude-standard")
+    paths = dict.fromkeys(os.fsdecode(path) for path in (changed + untracked).split(b"\0") if path)
+    return [os.path.join(directory_path, os.path.normpath(path)) for path in paths]
+
+def changed_files(directory_path: str, base_ref: str, extensions, path_filter=None) -> list[tuple]:
+    """
+    Returns discovery entries, (file_path, extension, size, mtime_ns), for the changed files
+    with one of the given extensions that path_filter allows, directories included.
+    """
+    files = []
+    root = os.path.join(directory_path, "")
+    for file_path in changed_paths(directory_path, base_ref):
+        extension = file_extension(file_path)
+        if extension not in extensions:
+            continue
+        if path_filter is not None and not _allowed(path_filter, root, file_path):
+            continue
+        try:
+            info = os.stat(file_path)
+        except OSError:
+            continue
+        if stat.S_ISREG(info.st_mode):
+            files.append((file_path, extension, info.st_size, info.st_mtime_ns))
+    return files
+
+def _allowed(path_filter, root: str, file_path: str) -> bool:
+    """Applies path_filter to file_path and each directory between it and root, as a walk would."""
+    dir_path = root
+    for name in os.path.relpath(os.path.dirname(file_path), root).split(os.sep):
+        if name == os.curdir:
+            break
+        dir_path = os.path.join(dir_path, name)
+        if not path_filter.allows_dir(dir_path):
+            return False
+    return path_filter.allows_file(file_path)
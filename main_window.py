@@ -6,7 +6,6 @@ Contains the FileValidator class, which defines the main application GUI.
 import sys
 import os
 import logging
-import html
 import platform
 from PySide6 import QtCore, QtGui, QtWidgets
 from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, QTimer, QSize, Qt
@@ -14,13 +13,21 @@ from PySide6.QtGui import QIcon, QPalette, QColor, QFont
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
     QLineEdit, QPushButton, QFileDialog, QProgressBar,
-    QLabel, QFrame, QToolButton, QTableWidget, QTableWidgetItem, QHeaderView,
-    QCheckBox
+    QLabel, QFrame, QToolButton, QTableView, QHeaderView, QAbstractItemView,
+    QCheckBox, QSpinBox
 )
 
 # Local project imports
-from config import WINDOW_WIDTH, WINDOW_HEIGHT, ICONS_DIR
-from validator import ValidatorWorker
+from config import WINDOW_WIDTH, WINDOW_HEIGHT, ICONS_DIR, DEFAULT_WORKER_COUNT, CACHE_DB_PATH, IGNORE_FILE_NAMES
+from validator import ValidatorWorker, ExportWorker
+from archives import ARCHIVE_EXTENSIONS, is_archive
+from engine import VALID_EXTENSIONS
+from path_filter import PathFilter
+from tree_index import TreeIndex
+from file_watcher import FileWatcher
+from exporters import EXPORTERS, exporter_for_path
+from results_model import ResultTableModel, ResultSortProxyModel
+from run_stats import format_summary
 from ui_widgets import DragDropLineEdit, DragDropDtdInput
 import theme as theme_manager
 
@@ -33,6 +40,20 @@ class FileValidator(QtWidgets.QWidget):
         super().__init__()
         self.current_theme = theme_manager.detect_system_theme()
         self.threadpool = QThreadPool()
+        self.processed_count = 0
+        self.last_stats = None
+        self.exporting = False
+        # The initial run in progress, which the Run button stops while it is running.
+        self.validation_worker = None
+
+        # Watch mode: the run settings to revalidate with, the index the initial run
+        # built, the watcher started once it finishes, and the revalidation in progress.
+        self.watch_settings = None
+        self.tree_index = None
+        self.file_watcher = None
+        self.watch_worker = None
+        self.watch_updated = 0
+        self.watch_removed = 0
 
         self.initUI()
         self.apply_stylesheet(self.current_theme)
@@ -81,16 +102,90 @@ class FileValidator(QtWidgets.QWidget):
         self.browse_dtd_button.clicked.connect(self.browse_dtd_files)
         grid_layout.addWidget(self.browse_dtd_button, 1, 1)
 
+        # Discovery Filters
+        self.include_input = QLineEdit()
+        self.include_input.setPlaceholderText("Optional: Include globs, e.g. docs/**;*.xliff")
+        self.include_input.setToolTip("Only files matching one of these .gitignore-style patterns (separated by ';') are validated.")
+        self.exclude_input = QLineEdit()
+        self.exclude_input.setPlaceholderText("Optional: Exclude globs, e.g. node_modules;build/")
+        self.exclude_input.setToolTip("Files and folders matching these .gitignore-style patterns (separated by ';') are skipped; excluded folders are never scanned.")
+        self.ignore_files_checkbox = QtWidgets.QCheckBox("Use ignore files")
+        self.ignore_files_checkbox.setToolTip(f"If checked, paths listed in {' and '.join(IGNORE_FILE_NAMES)} files inside the folder are skipped.")
+        self.changed_since_input = QLineEdit()
+        self.changed_since_input.setPlaceholderText("Optional: Changed since git ref, e.g. origin/main")
+        self.changed_since_input.setToolTip("Only files git reports as added, modified or renamed since the merge base with this ref, plus uncommitted and untracked files, are validated.")
+
+        filters_layout = QHBoxLayout()
+        filters_layout.setContentsMargins(0, 0, 0, 0)
+        filters_layout.addWidget(self.include_input, 1)
+        filters_layout.addWidget(self.exclude_input, 1)
+        filters_layout.addWidget(self.changed_since_input, 1)
+        filters_layout.addWidget(self.ignore_files_checkbox)
+        grid_layout.addLayout(filters_layout, 2, 0)
+
         # BOM Checkbox
         self.bom_checkbox = QtWidgets.QCheckBox("Allow UTF-8 BOM (for JSON/YAML)")
         self.bom_checkbox.setToolTip("If checked, JSON and YAML files starting with a Byte Order Mark (BOM) will be processed correctly.")
-        grid_layout.addWidget(self.bom_checkbox, 2, 0)
+
+        # Syntax-only Checkbox
+        self.syntax_checkbox = QtWidgets.QCheckBox("Syntax only (JSON/YAML/PO)")
+        self.syntax_checkbox.setToolTip("If checked, JSON, YAML and PO files are only checked for well-formedness, which is faster and uses less memory on large files.")
+
+        # Cache Checkbox
+        self.force_checkbox = QtWidgets.QCheckBox("Force full revalidation")
+        self.force_checkbox.setToolTip("If checked, cached results are ignored and every file is validated again.")
+
+        # Dedup Checkbox
+        self.dedup_checkbox = QtWidgets.QCheckBox("Validate duplicates once")
+        self.dedup_checkbox.setToolTip("If checked, byte-identical files are validated once and share the result, which notes how many copies there are.")
+
+        # Archives Checkbox
+        self.archives_checkbox = QtWidgets.QCheckBox("Look inside archives")
+        self.archives_checkbox.setToolTip("If checked, the files inside zip and tar archives in the folder are validated without extracting them. A single archive can also be validated directly.")
+
+        # Watch Checkbox
+        self.watch_checkbox = QtWidgets.QCheckBox("Watch for changes")
+        self.watch_checkbox.setToolTip("If checked, files created or modified after the run are revalidated automatically and deleted files are removed from the results.")
+        self.watch_checkbox.toggled.connect(self.on_watch_toggled)
+
+        # Fail-fast Checkbox
+        self.fail_fast_checkbox = QtWidgets.QCheckBox("Stop at first failure")
+        self.fail_fast_checkbox.setToolTip("If checked, the run stops as soon as one file fails validation.")
+
+        # Error Cap
+        self.max_errors_spinbox = QSpinBox()
+        self.max_errors_spinbox.setRange(0, 100000)
+        self.max_errors_spinbox.setValue(0)
+        self.max_errors_spinbox.setSpecialValueText("All")
+        self.max_errors_spinbox.setToolTip("Maximum number of XML and DTD errors listed per file; the rest are counted in one extra line.")
+
+        # Worker Count
+        self.workers_spinbox = QSpinBox()
+        self.workers_spinbox.setRange(1, max(1, DEFAULT_WORKER_COUNT * 2))
+        self.workers_spinbox.setValue(DEFAULT_WORKER_COUNT)
+        self.workers_spinbox.setToolTip("Number of processes used to validate files in parallel.")
+
+        options_layout = QHBoxLayout()
+        options_layout.setContentsMargins(0, 0, 0, 0)
+        options_layout.addWidget(self.bom_checkbox)
+        options_layout.addWidget(self.syntax_checkbox)
+        options_layout.addWidget(self.force_checkbox)
+        options_layout.addWidget(self.dedup_checkbox)
+        options_layout.addWidget(self.archives_checkbox)
+        options_layout.addWidget(self.watch_checkbox)
+        options_layout.addWidget(self.fail_fast_checkbox)
+        options_layout.addStretch(1)
+        options_layout.addWidget(QLabel("Errors per file:"))
+        options_layout.addWidget(self.max_errors_spinbox)
+        options_layout.addWidget(QLabel("Workers:"))
+        options_layout.addWidget(self.workers_spinbox)
+        grid_layout.addLayout(options_layout, 3, 0)
 
         # Control Buttons
         self.validate_button = QtWidgets.QPushButton("Run")
         self.validate_button.setIcon(self._get_icon("run"))
         self.validate_button.setObjectName("runButton")
-        self.validate_button.clicked.connect(self.start_validation)
+        self.validate_button.clicked.connect(self.on_run_clicked)
         grid_layout.addWidget(self.validate_button, 0, 2)
 
         self.export_button = QtWidgets.QPushButton("Export")
@@ -102,9 +197,14 @@ class FileValidator(QtWidgets.QWidget):
         self.layout.addWidget(input_frame)
 
         # Results Table
-        self.result_table = QtWidgets.QTableWidget()
-        self.result_table.setColumnCount(3)
-        self.result_table.setHorizontalHeaderLabels(["Path", "Filename", "Details"])
+        self.result_model = ResultTableModel(self.current_theme, self)
+        self.result_model.rowsInserted.connect(self._on_rows_inserted)
+
+        self.sort_proxy = ResultSortProxyModel(self)
+        self.sort_proxy.setSourceModel(self.result_model)
+
+        self.result_table = QTableView()
+        self.result_table.setModel(self.sort_proxy)
         header = self.result_table.horizontalHeader()
 
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
@@ -112,12 +212,22 @@ class FileValidator(QtWidgets.QWidget):
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.Interactive)
         header.setStretchLastSection(True)
 
-        self.result_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.result_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.result_table.setAlternatingRowColors(True)
         self.result_table.verticalHeader().setVisible(False)
+        self.result_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.result_table.setWordWrap(True)
+        # Keep arrival order until the user picks a column to sort by.
+        header.setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
         self.result_table.setSortingEnabled(True)
 
+        # Row heights are only computed for rows that are actually on screen.
+        self.row_resize_timer = QTimer(self)
+        self.row_resize_timer.setSingleShot(True)
+        self.row_resize_timer.setInterval(50)
+        self.row_resize_timer.timeout.connect(self._resize_visible_rows)
+        self.result_table.verticalScrollBar().valueChanged.connect(self.row_resize_timer.start)
+
         self.layout.addWidget(self.result_table, 1)
 
         # Progress Bar
@@ -132,6 +242,10 @@ class FileValidator(QtWidgets.QWidget):
         self.progress_label = QLabel("")
         progress_layout.addWidget(self.progress_label, 0)
 
+        # Run summary: throughput while running, full breakdown in the tooltip
+        self.stats_label = QLabel("")
+        progress_layout.addWidget(self.stats_label, 0)
+
         self.layout.addWidget(self.progress_container)
         self.progress_container.hide()
 
@@ -153,143 +267,199 @@ class FileValidator(QtWidgets.QWidget):
             all_paths = sorted(list(current_paths.union(new_paths)))
             self.dtd_input.setText(";".join(all_paths))
 
+    def on_run_clicked(self):
+        """Starts a run, or stops the one in progress, which the button shows as 'Stop'."""
+        if self.validation_worker is None:
+            self.start_validation()
+            return
+        self.validation_worker.cancel()
+        self.validate_button.setEnabled(False)
+        self.progress_label.setText("Stopping...")
+
+    def _set_run_button(self, running: bool):
+        self.validate_button.setText("Stop" if running else "Run")
+        self.validate_button.setIcon(self._get_icon("stop" if running else "run"))
+
     def start_validation(self):
         """Begins the validation process in a worker thread."""
         input_path = self.path_input.text()
-        if not input_path or not os.path.isdir(input_path):
-            self.on_error("Input Error", "Please select a valid directory to validate.")
+        if not input_path or not (os.path.isdir(input_path) or (is_archive(input_path) and os.path.isfile(input_path))):
+            self.on_error("Input Error", "Please select a valid directory or archive to validate.")
             return
 
-        self.result_table.setRowCount(0)
+        self._stop_watching()
+        self.result_model.clear()
+        self.processed_count = 0
+        self.last_stats = None
+        self.stats_label.setText("")
+        self.stats_label.setToolTip("")
         self.progress_container.show()
         self.progress_bar.setRange(0, 0)
         self.progress_bar.setValue(0)
         self.progress_label.setText("Scanning files...")
-        self.validate_button.setEnabled(False)
+        self._set_run_button(True)
         self.export_button.setEnabled(False)
 
-        allow_bom = self.bom_checkbox.isChecked()
-        worker = ValidatorWorker(input_path, self.dtd_input.text(), allow_bom)
+        path_filter = PathFilter(
+            input_path.rstrip(),
+            include=[p.strip() for p in self.include_input.text().split(';') if p.strip()],
+            exclude=[p.strip() for p in self.exclude_input.text().split(';') if p.strip()],
+            ignore_file_names=IGNORE_FILE_NAMES if self.ignore_files_checkbox.isChecked() else (),
+        )
+        self.watch_settings = dict(
+            directory_path=input_path, dtd_paths_str=self.dtd_input.text(),
+            allow_bom=self.bom_checkbox.isChecked(), max_workers=self.workers_spinbox.value(),
+            cache_path=CACHE_DB_PATH, force_revalidate=self.force_checkbox.isChecked(), batch_results=True,
+            syntax_only=self.syntax_checkbox.isChecked(), path_filter=path_filter,
+            dedup=self.dedup_checkbox.isChecked(), changed_since=self.changed_since_input.text().strip() or None,
+            archives=self.archives_checkbox.isChecked(), max_errors=self.max_errors_spinbox.value()
+        )
+        if self.watch_checkbox.isChecked() and os.path.isdir(input_path):
+            self.tree_index = TreeIndex(
+                input_path.rstrip(),
+                VALID_EXTENSIONS + (ARCHIVE_EXTENSIONS if self.archives_checkbox.isChecked() else ()),
+                path_filter,
+            )
+        # Fail-fast applies to the initial run only; watch mode revalidates every changed file.
+        worker = ValidatorWorker(**self.watch_settings, fail_fast=self.fail_fast_checkbox.isChecked(),
+                                 tree_index=self.tree_index)
+        self.validation_worker = worker
 
         worker.signals.progress_max_set.connect(self.on_progress_max_set)
+        worker.signals.progress_discovered.connect(self.on_progress_discovered)
         worker.signals.file_processed.connect(self.on_file_processed)
+        worker.signals.results_batch.connect(self.on_results_batch)
+        worker.signals.stats_updated.connect(self.on_stats_updated)
         worker.signals.finished.connect(self.on_validation_finished)
         worker.signals.error.connect(self.on_error)
 
         self.threadpool.start(worker)
 
     def export_results(self):
-        """Exports the contents of the results table to an HTML file."""
-        if self.result_table.rowCount() == 0:
+        """Exports the results to an HTML, NDJSON, CSV or JUnit XML report on a background thread."""
+        self.result_model.flush()
+        if self.result_model.rowCount() == 0:
             self.on_error("Export Error", "There are no results to export.")
             return
 
         default_path = os.path.join(self.path_input.text(), "validation_report.html")
-        export_path, _ = QFileDialog.getSaveFileName(self, "Save Report", default_path, "HTML Files (*.html)")
+        filters = ";;".join(exporter.description for exporter in EXPORTERS)
+        export_path, selected_filter = QFileDialog.getSaveFileName(self, "Save Report", default_path, filters)
 
         if not export_path:
             return
-
+        if not os.path.splitext(export_path)[1]:
+            exporter = next((e for e in EXPORTERS if e.description == selected_filter), EXPORTERS[0])
+            export_path += exporter.extension
         try:
-            html_content = self._generate_html_report()
-            with open(export_path, "w", encoding="utf-8") as f:
-                f.write(html_content)
-            self.progress_label.setText(f"Report saved!")
-        except Exception as e:
-            self.on_error("Export Failed", f"Could not save the report: {e}")
-
-    def _generate_html_report(self) -> str:
-        """Constructs the HTML report string from table data."""
-        html_parts = [
-            "<!DOCTYPE html><html><head><title>Validation Report</title><style>",
-            "body { font-family: sans-serif; }",
-            "table { border-collapse: collapse; width: 100%; }",
-            "th, td { border: 1px solid #ddd; padding: 8px; text-align: left; vertical-align: top; }",
-            "th { background-color: #f2f2f2; }",
-            ".status { font-weight: bold; }",
-            ".valid { color: #28a745; }",
-            ".invalid { color: #dc3545; }",
-            ".info { color: #17a2b8; }",
-            ".error { color: #dc3545; }",
-            "tr.valid-row { background-color: #e9f5e9; }",
-            "tr.invalid-row { background-color: #fbe9e9; }",
-            "ul { margin: 0; padding-left: 20px; }",
-            "</style></head><body><h1>Validation Report</h1><table>",
-            "<thead><tr><th>Path</th><th>Filename</th><th>Details</th></tr></thead><tbody>"
-        ]
-
-        for row in range(self.result_table.rowCount()):
-            path = self.result_table.item(row, 0).text()
-            filename = self.result_table.item(row, 1).text()
-            details_text = self.result_table.item(row, 2).text()
-
-            if "Valid" in details_text:
-                row_class = "valid-row"
-            else:
-                row_class = "invalid-row"
-
-            html_parts.append(f"<tr class='{row_class}'>")
-            html_parts.append(f"<td>{html.escape(path)}</td>")
-            html_parts.append(f"<td>{html.escape(filename)}</td>")
-
-            details_list = [f"<li>{html.escape(line)}</li>" for line in details_text.split('\n') if line]
-            details_html = f"<ul>{''.join(details_list)}</ul>" if len(details_list) > 1 else html.escape(details_text)
-
-            html_parts.append(f"<td>{details_html}</td>")
-            html_parts.append("</tr>")
-
-        html_parts.append("</tbody></table></body></html>")
-        return "".join(html_parts)
+            exporter_for_path(export_path)
+        except ValueError as e:
+            self.on_error("Export Error", str(e))
+            return
 
-    def on_progress_max_set(self, max_value: int):
-        """Slot for 'progress_max_set' signal."""
-        self.progress_bar.setRange(0, max_value)
+        worker = ExportWorker(export_path, self.result_model.store, self.last_stats)
+        # Watch mode holds revalidations back until the export has read every row.
+        self.exporting = True
+        self.validate_button.setEnabled(False)
+        self.export_button.setEnabled(False)
+        self.progress_container.show()
+        self.progress_bar.setRange(0, worker.row_count)
         self.progress_bar.setValue(0)
-        self.progress_label.setText(f"0 / {max_value}")
-
-    def on_file_processed(self, file_path: str, results: list[str]):
-        """Slot for 'file_processed' signal. Adds a row to the table."""
-        is_special_message = file_path.startswith("DTD:")
-
-        if is_special_message:
-            is_ok = "Error" not in results[0]
-            dir_path = "System Message"
-            filename = file_path
-        else:
-            is_ok = len(results) == 1 and any(s in results[0] for s in ["Valid", "compliant"])
-            dir_path = os.path.dirname(file_path)
-            filename = os.path.basename(file_path)
-
-        row_position = self.result_table.rowCount()
-        self.result_table.insertRow(row_position)
+        self.progress_label.setText("Exporting...")
 
-        if self.current_theme == 'dark':
-            row_color = QColor("#1e4a2a") if is_ok else QColor("#5a2a2a")
-        else:
-            row_color = QColor("#d4edda") if is_ok else QColor("#f8d7da")
+        worker.signals.progress.connect(self.on_export_progress)
+        worker.signals.finished.connect(self.on_export_finished)
+        worker.signals.error.connect(self.on_error)
+        self.threadpool.start(worker)
 
-        path_item = QTableWidgetItem(dir_path)
-        filename_item = QTableWidgetItem(filename)
-        details_item = QTableWidgetItem("\n".join(results))
+    def on_export_progress(self, rows_written: int):
+        """Slot for the export worker's 'progress' signal."""
+        self.progress_bar.setValue(rows_written)
+        self.progress_label.setText(f"Exporting {rows_written} / {self.progress_bar.maximum()}")
 
-        items = [path_item, filename_item, details_item]
-        for i, item in enumerate(items):
-            item.setBackground(row_color)
-            self.result_table.setItem(row_position, i, item)
+    def on_export_finished(self, export_path: str):
+        """Slot for the export worker's 'finished' signal."""
+        self.progress_bar.setValue(self.progress_bar.maximum())
+        self.progress_label.setText("Report saved!")
+        self.validate_button.setEnabled(True)
+        self.export_button.setEnabled(True)
+        self.exporting = False
+        self._revalidate_changes()
 
-        self.result_table.resizeRowsToContents()
-        self.result_table.scrollToBottom()
+    def on_progress_discovered(self, discovered: int):
+        """Slot for 'progress_discovered' signal. Shows the running total while scanning."""
+        self.progress_label.setText(f"{self.processed_count} / {discovered} discovered so far")
 
-        if not is_special_message:
-            current_val = self.progress_bar.value() + 1
-            self.progress_bar.setValue(current_val)
-            self.progress_label.setText(f"{current_val} / {self.progress_bar.maximum()}")
+    def on_progress_max_set(self, max_value: int):
+        """Slot for 'progress_max_set' signal. Discovery is complete."""
+        self.progress_bar.setRange(0, max_value)
+        self.progress_bar.setValue(self.processed_count)
+        self.progress_label.setText(f"{self.processed_count} / {max_value}")
+
+    def on_file_processed(self, result):
+        """Slot for 'file_processed' signal. Queues a row for the table."""
+        if self._add_result_row(result):
+            self.processed_count += 1
+            self._update_progress()
+
+    def on_results_batch(self, batch: list):
+        """Slot for 'results_batch' signal. Queues every row, then updates progress once."""
+        for result in batch:
+            if self._add_result_row(result):
+                self.processed_count += 1
+        self._update_progress()
+
+    def on_stats_updated(self, summary: dict):
+        """Slot for 'stats_updated' signal. Shows throughput next to the progress bar."""
+        self.last_stats = summary
+        self.stats_label.setText(f"{summary['files_per_s'] or 0:.0f} files/s · {summary['mb_per_s'] or 0:.1f} MB/s")
+        self.stats_label.setToolTip("\n".join(format_summary(summary)))
+
+    def _update_progress(self):
+        """Reflects the processed count once discovery has set the total."""
+        if self.progress_bar.maximum() > 0:
+            self.progress_bar.setValue(self.processed_count)
+            self.progress_label.setText(f"{self.processed_count} / {self.progress_bar.maximum()}")
+
+    def _add_result_row(self, result) -> bool:
+        """Queues a result row. Returns False for system messages, which are not counted as files."""
+        self.result_model.add_result(result)
+        return not result.is_system
+
+    def _on_rows_inserted(self, parent, first: int, last: int):
+        """Follows new rows while the view is scrolled to the bottom."""
+        scroll_bar = self.result_table.verticalScrollBar()
+        if scroll_bar.value() >= scroll_bar.maximum() - 1:
+            self.result_table.scrollToBottom()
+        self.row_resize_timer.start()
+
+    def _resize_visible_rows(self):
+        """Fits the height of the rows currently in the viewport to their contents."""
+        viewport = self.result_table.viewport()
+        first = self.result_table.rowAt(0)
+        if first < 0:
+            return
+        last = self.result_table.rowAt(viewport.height() - 1)
+        if last < 0:
+            last = self.sort_proxy.rowCount() - 1
+        for row in range(first, last + 1):
+            self.result_table.resizeRowToContents(row)
 
     def on_validation_finished(self):
         """Slot for 'finished' signal."""
-        total = self.progress_bar.maximum()
-        self.progress_label.setText(f"100%")
-        self.progress_bar.setValue(total)
+        stopped = self.validation_worker is not None and self.validation_worker.engine.stopped
+        self.validation_worker = None
+        self._set_run_button(False)
+        self.result_model.flush()
+        if stopped:
+            # The total may never have been set; show what was checked before the run stopped.
+            self.progress_bar.setRange(0, max(self.progress_bar.maximum(), self.processed_count, 1))
+            self.progress_bar.setValue(self.processed_count)
+            self.progress_label.setText(f"Stopped after {self.processed_count} files")
+        else:
+            total = self.progress_bar.maximum()
+            self.progress_label.setText(f"100%")
+            self.progress_bar.setValue(total)
         self.validate_button.setEnabled(True)
         self.export_button.setEnabled(True)
 
@@ -300,6 +470,69 @@ class FileValidator(QtWidgets.QWidget):
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.Interactive)
         header.setStretchLastSection(True)
 
+        if self.tree_index is not None and self.watch_checkbox.isChecked() and not stopped:
+            self.watch_updated = self.watch_removed = 0
+            self.file_watcher = FileWatcher(self.tree_index, self)
+            self.file_watcher.changes_pending.connect(self._revalidate_changes)
+            self._show_watch_status()
+
+    def on_watch_toggled(self, checked: bool):
+        """Stops watching when watch mode is switched off; switching it on takes effect on the next run."""
+        if not checked:
+            self._stop_watching()
+
+    def _stop_watching(self):
+        if self.file_watcher is not None:
+            self.file_watcher.stop()
+            self.file_watcher.deleteLater()
+            self.file_watcher = None
+        self.tree_index = None
+        # A revalidation still running finishes on its own; its results are ignored.
+        self.watch_worker = None
+
+    def _revalidate_changes(self):
+        """Removes rows of deleted files and revalidates created and modified ones on a worker."""
+        if self.file_watcher is None or self.watch_worker is not None or self.exporting:
+            return
+        changed, deleted = self.file_watcher.take_changes()
+        if not changed and not deleted:
+            return
+        self.watch_removed += self.result_model.remove_paths(deleted)
+        # A rewritten archive is reported afresh; members it no longer contains must not linger.
+        self.result_model.remove_members([item[0] for item in changed if is_archive(item[0])])
+
+        self.watch_worker = ValidatorWorker(**self.watch_settings, files=changed, deleted=deleted)
+        self.watch_worker.signals.results_batch.connect(self.on_watch_results)
+        self.watch_worker.signals.finished.connect(self.on_watch_finished)
+        self.watch_worker.signals.error.connect(self.on_error)
+        self.export_button.setEnabled(False)
+        self.progress_label.setText(f"Revalidating {len(changed)} changed files...")
+        self.threadpool.start(self.watch_worker)
+
+    def on_watch_results(self, batch: list):
+        """Slot for a watch revalidation's 'results_batch' signal. Updates rows in place."""
+        if self.watch_worker is None or self.sender() is not self.watch_worker.signals:
+            return
+        for result in batch:
+            self.result_model.update_result(result)
+        self.watch_updated += len(batch)
+
+    def on_watch_finished(self):
+        """Slot for a watch revalidation's 'finished' signal. Picks up changes made meanwhile."""
+        if self.watch_worker is None or self.sender() is not self.watch_worker.signals:
+            return
+        self.watch_worker = None
+        self.result_model.flush()
+        self.export_button.setEnabled(True)
+        self._show_watch_status()
+        self._revalidate_changes()
+
+    def _show_watch_status(self):
+        mode = "polling" if self.file_watcher.is_polling else "watching"
+        self.progress_label.setText(
+            f"{mode.capitalize()} for changes · {self.watch_updated} revalidated, {self.watch_removed} removed"
+        )
+
     def on_error(self, title: str, message: str):
         """Slot for 'error' signal. Displays a critical error message."""
         logging.error(f"{title}: {message}")
@@ -307,6 +540,7 @@ class FileValidator(QtWidgets.QWidget):
         QtWidgets.QMessageBox.critical(self, title, message)
         self.validate_button.setEnabled(True)
         self.export_button.setEnabled(True)
+        self.exporting = False
 
     def _get_icon(self, name: str) -> QIcon:
         """Gets a theme-aware icon."""
@@ -320,11 +554,12 @@ class FileValidator(QtWidgets.QWidget):
         if new_detected_theme != self.current_theme:
             self.current_theme = new_detected_theme
             self.apply_stylesheet(self.current_theme)
+            self.result_model.set_theme(self.current_theme)
 
             self.setWindowIcon(self._get_icon("app"))
             self.browse_button.setIcon(self._get_icon("folder"))
             self.browse_dtd_button.setIcon(self._get_icon("dtd"))
-            self.validate_button.setIcon(self._get_icon("run"))
+            self._set_run_button(self.validation_worker is not None)
             self.export_button.setIcon(self._get_icon("export"))
 
     def _style_run_button_dynamically(self):
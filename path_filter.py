@@ -0,0 +1,178 @@
+"""
+Path Filter
+Include/exclude globs and .gitignore-style ignore files, applied while walking a tree
+so excluded directories are never entered.
+"""
+
+import os
+import re
+import logging
+from typing import NamedTuple
+
+from config import DEFAULT_EXCLUDE_PATTERNS
+
+class _Pattern(NamedTuple):
+    regex: re.Pattern
+    dir_only: bool
+    negated: bool
+
+def _glob_to_regex(glob: str) -> str:
+    """Translates gitignore glob syntax (*, ?, [...], ** and backslash escapes) to a regex."""
+    parts = []
+    i = 0
+    while i < len(glob):
+        char = glob[i]
+        if char == "*":
+            if glob.startswith("**/", i):
+                parts.append("(?:.*/)?")
+                i += 3
+                continue
+            if glob.startswith("**", i):
+                parts.append(".*")
+                i += 2
+                continue
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = glob.find("]", i + 2)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = glob[i + 1:end]
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                parts.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end + 1
+                continue
+        elif char == "\\" and i + 1 < len(glob):
+            parts.append(re.escape(glob[i + 1]))
+            i += 2
+            continue
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return "".join(parts)
+
+def compile_pattern(line: str) -> _Pattern | None:
+    """
+    Compiles one gitignore-style line. A pattern with a slash is anchored to the
+    directory it is relative to; one without matches a name at any depth. A trailing
+    slash only matches directories and a leading '!' re-includes what an earlier
+    pattern excluded. Returns None for blank lines and comments.
+    """
+    if not line.endswith("\\ "):
+        line = line.rstrip()
+    if not line or line.startswith("#"):
+        return None
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith(("\\#", "\\!")):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    anchored = "/" in line
+    body = _glob_to_regex(line.lstrip("/"))
+    return _Pattern(re.compile(("" if anchored else "(?:.*/)?") + body + r"\Z"), dir_only, negated)
+
+class PatternSet:
+    """Ordered gitignore-style patterns, matched against '/'-separated relative paths."""
+    def __init__(self, lines):
+        self.patterns = [pattern for pattern in map(compile_pattern, lines) if pattern is not None]
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def match(self, relative_path: str, is_dir: bool) -> bool | None:
+        """Returns True if the last matching pattern excludes the path, False if it re-includes it, None if none match."""
+        for pattern in reversed(self.patterns):
+            if pattern.dir_only and not is_dir:
+                continue
+            if pattern.regex.match(relative_path):
+                return not pattern.negated
+        return None
+
+    def matches_within(self, relative_path: str) -> bool:
+        """True if the file at relative_path, or any directory above it, matches."""
+        if self.match(relative_path, False):
+            return True
+        parent = relative_path.rpartition("/")[0]
+        while parent:
+            if self.match(parent, True):
+                return True
+            parent = parent.rpartition("/")[0]
+        return False
+
+class PathFilter:
+    """
+    Decides which directories a walk enters and which files it keeps, relative to root.
+    Exclude patterns always win. When include patterns are given, only files matching
+    one of them (or inside a directory that does) are kept. Ignore files named in
+    ignore_file_names are read from each directory as the walk reaches it and apply
+    to that directory's subtree, deeper files taking precedence, as in git.
+    VCS metadata directories are excluded by default.
+    """
+    def __init__(self, root: str, include=(), exclude=(), ignore_file_names=(),
+                 default_excludes=DEFAULT_EXCLUDE_PATTERNS):
+        self.root = os.path.join(root, "")
+        self.include = PatternSet(include)
+        self.exclude = PatternSet(tuple(default_excludes) + tuple(exclude))
+        self.ignore_file_names = tuple(ignore_file_names)
+        self._dir_rules = {}  # relative dir -> ((base, PatternSet), ...) from the root down
+        self._filters_files = bool(self.include or self.ignore_file_names
+                                   or any(not pattern.dir_only for pattern in self.exclude.patterns))
+
+    def allows_dir(self, dir_path: str) -> bool:
+        """Whether a walk should enter dir_path, a directory below root."""
+        relative_path = self._relative(dir_path)
+        if self.exclude.match(relative_path, True):
+            return False
+        return not self._ignored(relative_path, True)
+
+    def allows_file(self, file_path: str) -> bool:
+        """Whether file_path, found in a directory the walk entered, should be validated."""
+        if not self._filters_files:
+            return True
+        relative_path = self._relative(file_path)
+        if self.exclude.match(relative_path, False):
+            return False
+        if self.include and not self.include.matches_within(relative_path):
+            return False
+        return not self._ignored(relative_path, False)
+
+    def _relative(self, path: str) -> str:
+        relative_path = path[len(self.root):] if path.startswith(self.root) else os.path.relpath(path, self.root)
+        return relative_path.replace(os.sep, "/") if os.sep != "/" else relative_path
+
+    def _ignored(self, relative_path: str, is_dir: bool) -> bool:
+        if not self.ignore_file_names:
+            return False
+        for base, patterns in reversed(self._rules(relative_path.rpartition("/")[0])):
+            decision = patterns.match(relative_path[len(base) + 1:] if base else relative_path, is_dir)
+            if decision is not None:
+                return decision
+        return False
+
+    def _rules(self, relative_dir: str) -> tuple:
+        """Returns the ignore rules in effect in relative_dir, loading its ignore files on first use."""
+        rules = self._dir_rules.get(relative_dir)
+        if rules is None:
+            rules = self._rules(relative_dir.rpartition("/")[0]) if relative_dir else ()
+            dir_path = os.path.join(self.root, relative_dir)
+            lines = []
+            for name in self.ignore_file_names:
+                try:
+                    with open(os.path.join(dir_path, name), encoding="utf-8", errors="replace") as f:
+                        lines.extend(f.read().splitlines())
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logging.warning(f"Cannot read ignore file: {e}")
+            patterns = PatternSet(lines)
+            if patterns:
+                rules = rules + ((relative_dir, patterns),)
+            self._dir_rules[relative_dir] = rules
+        return rules
@@ -0,0 +1,72 @@
+"""
+Prefetch
+Reads upcoming files on a small thread pool while the current one is parsed,
+so disk and network latency overlap with validation.
+"""
+
+import mmap
+import queue
+from collections import deque
+
+from file_buffer import FileBuffer
+
+def _read_ahead(item: tuple) -> FileBuffer:
+    """Reads one discovered (file_path, extension, size, mtime_ns) entry into a buffer."""
+    buffer = FileBuffer(item[0], item[2])
+    if buffer.is_mapped and hasattr(mmap, "MADV_WILLNEED"):
+        # A map is filled lazily; ask the kernel to start paging it in now.
+        buffer.data.madvise(mmap.MADV_WILLNEED)
+    return buffer
+
+def _close_buffer(future):
+    """Done-callback releasing a buffer the consumer never took or has finished with."""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+def prefetch_files(file_queue: queue.Queue, done_marker, depth: int, max_bytes: int, threads: int):
+    """
+    Yields (item, future) for each entry taken from file_queue until done_marker, in
+    queue order. future.result() is the file's FileBuffer, or raises the error met
+    while reading it. Up to depth files totalling at most max_bytes are read ahead;
+    a single file larger than max_bytes is still read, on its own.
+    A yielded buffer is closed once the consumer asks for the next item.
+    Close the generator to stop early; pending reads are then cancelled or released.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    ahead = deque()
+    ahead_bytes = 0
+    held = None
+    finished = False
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="prefetch") as executor:
+        try:
+            while True:
+                # Top up the read-ahead window. Only wait for discovery when nothing is ready to parse.
+                while not finished and len(ahead) < depth:
+                    if held is None:
+                        try:
+                            held = file_queue.get(block=not ahead)
+                        except queue.Empty:
+                            break
+                        if held is done_marker:
+                            finished = True
+                            held = None
+                            break
+                    if ahead and ahead_bytes + held[2] > max_bytes:
+                        break
+                    ahead.append((held, executor.submit(_read_ahead, held)))
+                    ahead_bytes += held[2]
+                    held = None
+
+                if not ahead:
+                    return
+                item, future = ahead.popleft()
+                try:
+                    yield item, future
+                finally:
+                    ahead_bytes -= item[2]
+                    future.add_done_callback(_close_buffer)
+        finally:
+            for _, future in ahead:
+                future.cancel()
+                future.add_done_callback(_close_buffer)
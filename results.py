@@ -0,0 +1,159 @@
+"""
+Validation Results
+Compact result records shared by the engine, cache, GUI and exporters: a status
+enum, a format code, an optional note and structured (line, column, code, message) errors.
+"""
+
+import os
+import sys
+from enum import IntEnum
+from typing import NamedTuple
+
+SYSTEM_MESSAGE_DIR = "System Message"
+
+class Status(IntEnum):
+    VALID = 0
+    INVALID = 1
+    ERROR = 2  # The file (or DTD) could not be read or processed at all.
+
+class FileFormat(IntEnum):
+    UNKNOWN = 0
+    JSON = 1
+    XML = 2
+    DITA = 3
+    XLIFF = 4
+    PO = 5
+    YAML = 6
+    DTD = 7
+    ARCHIVE = 8  # Only for archives that could not be read; their members carry their own formats.
+
+FORMAT_BY_EXTENSION = {
+    ".json": FileFormat.JSON,
+    ".xml": FileFormat.XML,
+    ".dita": FileFormat.DITA,
+    ".xliff": FileFormat.XLIFF,
+    ".xlf": FileFormat.XLIFF,
+    ".po": FileFormat.PO,
+    ".yaml": FileFormat.YAML,
+    ".yml": FileFormat.YAML,
+}
+
+class ErrorEntry(NamedTuple):
+    """
+    One problem found in a file. line and column are 1-based where the parser
+    reports them and 0 when unknown; code is a short machine-readable category.
+    """
+    line: int
+    column: int
+    code: str
+    message: str
+
+    def text(self) -> str:
+        """Formats the entry the way it is shown to users."""
+        if self.code == "critical":
+            return f"Critical Error: {self.message}"
+        if self.line or self.column:
+            return f"L{self.line}, C{self.column}: {self.message}"
+        return self.message
+
+def group_text(group_size: int) -> str:
+    """Describes a result shared by a group of byte-identical files."""
+    return f"Identical content in {group_size} files, validated once."
+
+class ValidationResult:
+    """
+    The outcome of validating one file, or of loading one DTD (file_format DTD).
+    note holds the success message, or a remark shown after the errors such as
+    the DTD a document was validated against. Notes repeat across many files,
+    so they are interned. group_size is the number of byte-identical files that
+    share the result when duplicates are validated once; it is not cached.
+    """
+    __slots__ = ("path", "file_format", "status", "note", "errors", "group_size")
+
+    def __init__(self, path: str, file_format: FileFormat, status: Status, note: str = "",
+                 errors: tuple[ErrorEntry, ...] = (), group_size: int = 1):
+        self.path = path
+        self.file_format = FileFormat(file_format)
+        self.status = Status(status)
+        self.note = sys.intern(note)
+        self.errors = errors
+        self.group_size = group_size
+
+    @classmethod
+    def valid(cls, path: str, file_format: FileFormat, note: str) -> "ValidationResult":
+        return cls(path, file_format, Status.VALID, note)
+
+    @classmethod
+    def invalid(cls, path: str, file_format: FileFormat, errors, note: str = "") -> "ValidationResult":
+        return cls(path, file_format, Status.INVALID, note, tuple(errors))
+
+    @classmethod
+    def critical(cls, path: str, file_format: FileFormat, message: str) -> "ValidationResult":
+        return cls(path, file_format, Status.ERROR, "", (ErrorEntry(0, 0, "critical", message),))
+
+    @property
+    def ok(self) -> bool:
+        return self.status == Status.VALID
+
+    @property
+    def is_system(self) -> bool:
+        """True for DTD load results, which are reported alongside files but are not files."""
+        return self.file_format == FileFormat.DTD
+
+    @property
+    def dir_path(self) -> str:
+        return SYSTEM_MESSAGE_DIR if self.is_system else os.path.dirname(self.path)
+
+    @property
+    def display_name(self) -> str:
+        name = os.path.basename(self.path)
+        return f"DTD: {name}" if self.is_system else name
+
+    def messages(self) -> list[str]:
+        """Returns the result as display lines: every error, then the note and any duplicate group."""
+        lines = [error.text() for error in self.errors]
+        if self.note:
+            lines.append(self.note)
+        if self.group_size > 1:
+            lines.append(group_text(self.group_size))
+        return lines
+
+    def for_duplicate(self, path: str, group_size: int) -> "ValidationResult":
+        """
+        Returns this result for a byte-identical copy at path. Parsers that name the
+        file in their messages (YAML does) have the representative's path swapped for path.
+        """
+        errors = tuple(
+            error._replace(message=error.message.replace(self.path, path)) if self.path in error.message else error
+            for error in self.errors
+        )
+        return ValidationResult(path, self.file_format, self.status, self.note, errors, group_size)
+
+    def __reduce__(self):
+        # Plain ints on the wire keep pool results small.
+        return ValidationResult, (self.path, int(self.file_format), int(self.status), self.note, self.errors,
+                                  self.group_size)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ValidationResult):
+            return NotImplemented
+        return (self.path, self.file_format, self.status, self.note, self.errors, self.group_size) == \
+               (other.path, other.file_format, other.status, other.note, other.errors, other.group_size)
+
+    def __repr__(self) -> str:
+        return f"ValidationResult({self.path!r}, {self.file_format.name}, {self.status.name}, {self.messages()!r})"
+
+def ndjson_record(result: ValidationResult) -> dict:
+    """Returns the JSON object written for a result by the NDJSON exporter and the headless mode."""
+    if result.is_system:
+        record = {"dtd": os.path.basename(result.path)}
+    else:
+        record = {"path": result.path, "format": result.file_format.name.lower()}
+    record["status"] = result.status.name.lower()
+    record["ok"] = result.ok
+    record["messages"] = result.messages()
+    if result.errors:
+        record["errors"] = [error._asdict() for error in result.errors]
+    if result.group_size > 1:
+        record["group_size"] = result.group_size
+    return record
@@ -0,0 +1,482 @@
+"""
+Results Model
+Contains the columnar result store and the Qt model that exposes it to the results view.
+"""
+
+import os
+from array import array
+from bisect import bisect_right
+from PySide6.QtCore import QAbstractProxyModel, QAbstractTableModel, QModelIndex, QTimer, Qt
+from PySide6.QtGui import QColor
+
+from archives import member_prefix
+from config import RESULTS_FLUSH_INTERVAL_MS
+from results import ValidationResult, Status, FileFormat, group_text
+
+class ResultStore:
+    """
+    Compact columnar storage for validation results.
+    Directory paths and notes are interned so each one is stored once, status and
+    format take one byte per row, and only rows with errors keep error entries
+    (likewise, only rows shared by a group of duplicates keep a group size).
+    Rows are appended during a run; watch mode also replaces and removes them,
+    looking files up through a path index that is only built when first needed.
+    """
+    def __init__(self):
+        self.dir_ids = array('I')
+        self.names = []
+        self.statuses = bytearray()
+        self.formats = bytearray()
+        self.note_ids = array('I')
+        self.errors = {}
+        self.group_sizes = {}
+        self._dirs = []
+        self._dir_index = {}
+        self._notes = []
+        self._note_index = {}
+        self._rows = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def _intern(value: str, values: list, index: dict) -> int:
+        value_id = index.get(value)
+        if value_id is None:
+            value_id = len(values)
+            values.append(value)
+            index[value] = value_id
+        return value_id
+
+    def append(self, result: ValidationResult):
+        """Appends one result row."""
+        self.dir_ids.append(self._intern(result.dir_path, self._dirs, self._dir_index))
+        self.names.append(os.path.basename(result.path))
+        self.statuses.append(result.status)
+        self.formats.append(result.file_format)
+        self.note_ids.append(self._intern(result.note, self._notes, self._note_index))
+        row = len(self.names) - 1
+        if result.errors:
+            self.errors[row] = result.errors
+        if result.group_size > 1:
+            self.group_sizes[row] = result.group_size
+        if self._rows is not None and not result.is_system:
+            self._rows[result.path] = row
+
+    def find(self, file_path: str) -> int | None:
+        """Returns the row holding file_path's result, or None. DTD rows are not indexed."""
+        return self._path_index().get(file_path)
+
+    def member_paths(self, archive_path: str) -> list[str]:
+        """Returns the paths of the rows holding results for members of archive_path."""
+        prefix = member_prefix(archive_path)
+        return [path for path in self._path_index() if path.startswith(prefix)]
+
+    def _path_index(self) -> dict:
+        if self._rows is None:
+            self._rows = {self._path(row): row for row in range(len(self.names))
+                          if self.formats[row] != FileFormat.DTD}
+        return self._rows
+
+    def replace(self, row: int, result: ValidationResult):
+        """Overwrites a row with a new result for the same file."""
+        self.statuses[row] = result.status
+        self.formats[row] = result.file_format
+        self.note_ids[row] = self._intern(result.note, self._notes, self._note_index)
+        if result.errors:
+            self.errors[row] = result.errors
+        else:
+            self.errors.pop(row, None)
+        if result.group_size > 1:
+            self.group_sizes[row] = result.group_size
+        else:
+            self.group_sizes.pop(row, None)
+
+    def move_last(self, row: int):
+        """
+        Copies the last row over row, leaving the last row to be dropped with pop().
+        Together they remove a row in constant time, at the cost of arrival order.
+        """
+        last = len(self.names) - 1
+        if self._rows is not None:
+            self._rows.pop(self._path(row), None)
+            if self.formats[last] != FileFormat.DTD:
+                self._rows[self._path(last)] = row
+        self.dir_ids[row] = self.dir_ids[last]
+        self.names[row] = self.names[last]
+        self.statuses[row] = self.statuses[last]
+        self.formats[row] = self.formats[last]
+        self.note_ids[row] = self.note_ids[last]
+        for column in (self.errors, self.group_sizes):
+            value = column.pop(last, None)
+            if value:
+                column[row] = value
+            else:
+                column.pop(row, None)
+
+    def pop(self):
+        """Drops the last row."""
+        last = len(self.names) - 1
+        if self._rows is not None and self._rows.get(self._path(last)) == last:
+            del self._rows[self._path(last)]
+        del self.dir_ids[last], self.statuses[last], self.formats[last], self.note_ids[last]
+        self.names.pop()
+        self.errors.pop(last, None)
+        self.group_sizes.pop(last, None)
+
+    def _path(self, row: int) -> str:
+        return os.path.join(self._dirs[self.dir_ids[row]], self.names[row])
+
+    def dir_path(self, row: int) -> str:
+        return self._dirs[self.dir_ids[row]]
+
+    def is_ok(self, row: int) -> bool:
+        return self.statuses[row] == Status.VALID
+
+    def display_name(self, row: int) -> str:
+        name = self.names[row]
+        return f"DTD: {name}" if self.formats[row] == FileFormat.DTD else name
+
+    def details(self, row: int) -> str:
+        """Returns the row's messages as newline-separated text."""
+        lines = [error.text() for error in self.errors.get(row, ())]
+        note = self._notes[self.note_ids[row]]
+        if note:
+            lines.append(note)
+        if row in self.group_sizes:
+            lines.append(group_text(self.group_sizes[row]))
+        return "\n".join(lines)
+
+    def result(self, row: int) -> ValidationResult:
+        """Rebuilds the ValidationResult stored in a row."""
+        file_format = self.formats[row]
+        path = self.names[row] if file_format == FileFormat.DTD else self._path(row)
+        return ValidationResult(path, file_format, self.statuses[row], self._notes[self.note_ids[row]],
+                                self.errors.get(row, ()), self.group_sizes.get(row, 1))
+
+    def results(self, limit: int | None = None):
+        """Yields the results of the first limit rows (all rows by default), in insertion order."""
+        for row in range(len(self.names) if limit is None else limit):
+            yield self.result(row)
+
+    def clear(self):
+        self.__init__()
+
+class ResultTableModel(QAbstractTableModel):
+    """
+    Read-only table model over a ResultStore. Rows are queued and inserted in
+    batches on a timer, so the view only does layout work a few times per second.
+    """
+    HEADERS = ("Path", "Filename", "Details")
+
+    def __init__(self, theme_name: str, parent=None):
+        super().__init__(parent)
+        self.store = ResultStore()
+        self._pending = []
+        self._colors = {}
+        self.set_theme(theme_name)
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(RESULTS_FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            column = index.column()
+            if column == 0:
+                return self.store.dir_path(row)
+            if column == 1:
+                return self.store.display_name(row)
+            return self.store.details(row)
+        if role == Qt.ItemDataRole.BackgroundRole:
+            return self._colors[self.store.is_ok(row)]
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def set_theme(self, theme_name: str):
+        """Switches the row background colors to match the theme."""
+        if theme_name == 'dark':
+            self._colors = {True: QColor("#1e4a2a"), False: QColor("#5a2a2a")}
+        else:
+            self._colors = {True: QColor("#d4edda"), False: QColor("#f8d7da")}
+        if len(self.store):
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.store) - 1, len(self.HEADERS) - 1),
+                                  [Qt.ItemDataRole.BackgroundRole])
+
+    def add_result(self, result: ValidationResult):
+        """Queues a row for the next batched insert."""
+        self._pending.append(result)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """Inserts every queued row in a single model update."""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+        first = len(self.store)
+        self.beginInsertRows(QModelIndex(), first, first + len(self._pending) - 1)
+        for result in self._pending:
+            self.store.append(result)
+        self._pending.clear()
+        self.endInsertRows()
+
+    def update_result(self, result: ValidationResult):
+        """Replaces the row of a revalidated file in place, or queues a row for a new file."""
+        self.flush()
+        row = self.store.find(result.path)
+        if row is None:
+            self.add_result(result)
+            return
+        self.store.replace(row, result)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    def remove_paths(self, file_paths: list[str]) -> int:
+        """
+        Removes the rows of deleted files and returns how many were shown.
+        A deleted archive's member rows are removed along with it.
+        """
+        self.flush()
+        removed = self.remove_members(file_paths)
+        for file_path in file_paths:
+            removed += self._remove_row(self.store.find(file_path))
+        return removed
+
+    def remove_members(self, archive_paths: list[str]) -> int:
+        """
+        Removes the rows of every member of the given archives, e.g. before a changed
+        archive is revalidated, and returns how many were shown. Other paths are ignored.
+        """
+        self.flush()
+        removed = 0
+        for archive_path in archive_paths:
+            for file_path in self.store.member_paths(archive_path):
+                removed += self._remove_row(self.store.find(file_path))
+        return removed
+
+    def _remove_row(self, row: int | None) -> int:
+        """Removes one row by moving the last row into its place; returns 1 if there was a row."""
+        if row is None:
+            return 0
+        last = len(self.store) - 1
+        if row != last:
+            self.store.move_last(row)
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+        self.beginRemoveRows(QModelIndex(), last, last)
+        self.store.pop()
+        self.endRemoveRows()
+        return 1
+
+    def clear(self):
+        """Removes every row, including queued ones."""
+        self._flush_timer.stop()
+        self.beginResetModel()
+        self._pending.clear()
+        self.store.clear()
+        self.endResetModel()
+
+class ResultSortProxyModel(QAbstractProxyModel):
+    """
+    Sorting proxy for ResultTableModel that keeps only a permutation of row numbers.
+    Sort keys are read straight from the columnar store, so sorting a million rows
+    is a single Python sort instead of millions of lessThan() calls through Qt.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._order = None  # Ascending permutation of source rows; None keeps arrival order.
+        self._inverse = None
+        self._sort_column = -1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+        self._removed_persistent = []
+
+    def setSourceModel(self, source_model: ResultTableModel):
+        self.beginResetModel()
+        super().setSourceModel(source_model)
+        source_model.rowsAboutToBeInserted.connect(self._on_rows_about_to_be_inserted)
+        source_model.rowsInserted.connect(self._on_rows_inserted)
+        source_model.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
+        source_model.rowsRemoved.connect(self._on_rows_removed)
+        source_model.modelAboutToBeReset.connect(self.beginResetModel)
+        source_model.modelReset.connect(self._on_model_reset)
+        source_model.dataChanged.connect(self._on_data_changed)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() or self.sourceModel() is None else self.sourceModel().rowCount()
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() or self.sourceModel() is None else self.sourceModel().columnCount()
+
+    def index(self, row: int, column: int, parent=QModelIndex()) -> QModelIndex:
+        if parent.isValid() or not (0 <= row < self.rowCount() and 0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()) -> QModelIndex:
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index: QModelIndex) -> QModelIndex:
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(self._source_row(proxy_index.row()), proxy_index.column())
+
+    def mapFromSource(self, source_index: QModelIndex) -> QModelIndex:
+        if not source_index.isValid():
+            return QModelIndex()
+        return self.index(self._proxy_row(source_index.row()), source_index.column())
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        source_rows = [self._source_row(index.row()) for index in persistent]
+
+        self._sort_column = column
+        self._sort_order = order
+        if column < 0:
+            self._order = None
+        else:
+            self._order = array('I', sorted(range(self.rowCount()), key=self._sort_key(column)))
+        self._inverse = None
+
+        self.changePersistentIndexList(
+            persistent, [self.index(self._proxy_row(row), index.column()) for row, index in zip(source_rows, persistent)]
+        )
+        self.layoutChanged.emit()
+
+    def _sort_key(self, column: int):
+        """Returns a key function mapping a source row to its sort key for column."""
+        store = self.sourceModel().store
+        if column == 0:
+            # Rank each interned directory once, then sort rows by integer rank.
+            dirs = store._dirs
+            rank = array('I', [0]) * len(dirs)
+            for position, dir_id in enumerate(sorted(range(len(dirs)), key=dirs.__getitem__)):
+                rank[dir_id] = position
+            dir_ids = store.dir_ids
+            return lambda row: rank[dir_ids[row]]
+        if column == 1:
+            return store.names.__getitem__
+        return store.details
+
+    def _source_row(self, proxy_row: int) -> int:
+        if self._order is None:
+            return proxy_row
+        if self._sort_order == Qt.SortOrder.DescendingOrder:
+            proxy_row = len(self._order) - 1 - proxy_row
+        return self._order[proxy_row]
+
+    def _proxy_row(self, source_row: int) -> int:
+        if self._order is None:
+            return source_row
+        if self._inverse is None:
+            self._inverse = array('I', [0]) * len(self._order)
+            for position, row in enumerate(self._order):
+                self._inverse[row] = position
+        position = self._inverse[source_row]
+        if self._sort_order == Qt.SortOrder.DescendingOrder:
+            return len(self._order) - 1 - position
+        return position
+
+    def _on_rows_about_to_be_inserted(self, parent: QModelIndex, first: int, last: int):
+        if self._order is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+        else:
+            self.layoutAboutToBeChanged.emit()
+
+    def _on_rows_inserted(self, parent: QModelIndex, first: int, last: int):
+        if self._order is None:
+            self.endInsertRows()
+            return
+        persistent = self.persistentIndexList()
+        source_rows = [self._source_row(index.row()) for index in persistent]
+
+        # The batch arrives already appended to the store; slot each row into place.
+        key = self._sort_key(self._sort_column)
+        for row in range(first, last + 1):
+            self._order.insert(bisect_right(self._order, key(row), key=key), row)
+        self._inverse = None
+
+        self.changePersistentIndexList(
+            persistent, [self.index(self._proxy_row(row), index.column()) for row, index in zip(source_rows, persistent)]
+        )
+        self.layoutChanged.emit()
+
+    def _on_rows_about_to_be_removed(self, parent: QModelIndex, first: int, last: int):
+        if self._order is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+        else:
+            self.layoutAboutToBeChanged.emit()
+            self._removed_persistent = [(index, self._source_row(index.row())) for index in self.persistentIndexList()]
+
+    def _on_rows_removed(self, parent: QModelIndex, first: int, last: int):
+        if self._order is None:
+            self.endRemoveRows()
+            return
+        count = last - first + 1
+        if last == len(self._order) - 1:
+            # Removing trailing rows (the source model's only case) renumbers nothing.
+            for row in range(first, last + 1):
+                self._order.remove(row)
+        else:
+            self._order = array('I', [row if row < first else row - count
+                                      for row in self._order if not first <= row <= last])
+        self._inverse = None
+
+        persistent, self._removed_persistent = self._removed_persistent, []
+        self.changePersistentIndexList(
+            [index for index, _ in persistent],
+            [QModelIndex() if first <= row <= last
+             else self.index(self._proxy_row(row if row < first else row - count), index.column())
+             for index, row in persistent]
+        )
+        self.layoutChanged.emit()
+
+    def _reslot_rows(self, first: int, last: int):
+        """Moves rows whose contents changed to their new sorted position."""
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        source_rows = [self._source_row(index.row()) for index in persistent]
+
+        key = self._sort_key(self._sort_column)
+        for row in range(first, last + 1):
+            self._order.remove(row)
+            self._order.insert(bisect_right(self._order, key(row), key=key), row)
+        self._inverse = None
+
+        self.changePersistentIndexList(
+            persistent, [self.index(self._proxy_row(row), index.column()) for row, index in zip(source_rows, persistent)]
+        )
+        self.layoutChanged.emit()
+
+    def _on_model_reset(self):
+        if self._order is not None:
+            self._order = array('I')
+        self._inverse = None
+        self.endResetModel()
+
+    def _on_data_changed(self, top_left: QModelIndex, bottom_right: QModelIndex, roles=()):
+        if not self.rowCount():
+            return
+        if self._order is None:
+            self.dataChanged.emit(self.index(top_left.row(), top_left.column()),
+                                  self.index(bottom_right.row(), bottom_right.column()), roles)
+        elif roles and Qt.ItemDataRole.DisplayRole not in roles:
+            # Theme switches only recolor rows; the order is unchanged.
+            self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1), roles)
+        else:
+            # Rows rewritten by watch mode may sort elsewhere now.
+            self._reslot_rows(top_left.row(), bottom_right.row())
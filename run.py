@@ -6,8 +6,6 @@ Main entry point for the application.
 import sys
 import os
 import logging
-from PySide6 import QtWidgets
-from main_window import FileValidator
 from config import ICONS_DIR
 
 def _create_dummy_icons_if_missing():
@@ -15,7 +13,7 @@ def _create_dummy_icons_if_missing():
     if not os.path.exists(ICONS_DIR):
         os.makedirs(ICONS_DIR, exist_ok=True)
 
-    icons_to_create = ["app", "folder", "run", "export", "dtd", "check"]
+    icons_to_create = ["app", "folder", "run", "stop", "export", "dtd", "check"]
 
     for name in icons_to_create:
         for variant in ["light", "dark"]:
@@ -29,7 +27,36 @@ def _create_dummy_icons_if_missing():
                         f.write("<svg width='16' height='16'><rect width='16' height='16' style='fill:gray'/></svg>")
 
 def main():
-    """Initializes and runs the application."""
+    """
+    Initializes and runs the application, the headless CLI with '--cli', the daemon
+    with '--daemon', or the shard result merge with '--merge'.
+    """
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+        multiprocessing.freeze_support()
+
+    if "--cli" in sys.argv[1:]:
+        # The headless path must never import PySide6.
+        import cli
+        logging.basicConfig(level=logging.WARNING, format='[%(levelname)s] %(message)s')
+        argv = [arg for arg in sys.argv[1:] if arg != "--cli"]
+        sys.exit(cli.main(argv))
+
+    if "--merge" in sys.argv[1:]:
+        import cli
+        logging.basicConfig(level=logging.WARNING, format='[%(levelname)s] %(message)s')
+        argv = [arg for arg in sys.argv[1:] if arg != "--merge"]
+        sys.exit(cli.merge_main(argv))
+
+    if "--daemon" in sys.argv[1:]:
+        import daemon
+        logging.basicConfig(level=logging.WARNING, format='[%(levelname)s] %(message)s')
+        argv = [arg for arg in sys.argv[1:] if arg != "--daemon"]
+        sys.exit(daemon.main(argv))
+
+    from PySide6 import QtWidgets
+    from main_window import FileValidator
+
     logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
     _create_dummy_icons_if_missing()
 
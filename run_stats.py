@@ -0,0 +1,194 @@
+"""
+Run Statistics
+Per-file and per-phase timings for a validation run, aggregated per format,
+with a list of the slowest files.
+"""
+
+import os
+import time
+import heapq
+
+from config import SLOWEST_FILES_COUNT
+
+PHASES = ("discovery", "dtd_load", "read", "parse", "validate")
+
+_FORMAT_NAMES = {".yml": "YAML", ".xlf": "XLIFF"}
+
+def format_name(extension: str) -> str:
+    """Returns the display name of the format behind a file extension, e.g. '.yml' -> 'YAML'."""
+    return _FORMAT_NAMES.get(extension, extension.lstrip(".").upper())
+
+class FileTiming:
+    """
+    Timings for one file, in seconds. read_time covers getting the bytes (or waiting
+    for read-ahead), parse_time decoding and parsing them, validate_time DTD validation.
+    """
+    __slots__ = ("file_path", "extension", "size", "bytes_read", "read_time", "parse_time", "validate_time")
+
+    def __init__(self, file_path: str, extension: str, size: int = 0):
+        self.file_path = file_path
+        self.extension = extension
+        self.size = size
+        self.bytes_read = 0
+        self.read_time = 0.0
+        self.parse_time = 0.0
+        self.validate_time = 0.0
+
+    @property
+    def total_time(self) -> float:
+        return self.read_time + self.parse_time + self.validate_time
+
+class RunStats:
+    """
+    Accumulates phase durations and FileTimings for one run. Files are added from
+    the thread consuming results, phases from whichever thread ran them.
+    """
+    def __init__(self, slowest_count: int = SLOWEST_FILES_COUNT):
+        self.slowest_count = slowest_count
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.formats = {}
+        self.files = 0
+        self.cached = 0
+        self.duplicates = 0
+        self.duplicate_bytes = 0
+        self.bytes_read = 0
+        self._slowest = []
+
+    def add_phase(self, phase: str, seconds: float):
+        self.phases[phase] += seconds
+
+    def add_cached(self):
+        """Counts a file whose result came from the cache and was not read."""
+        self.cached += 1
+
+    def add_duplicate(self, size: int):
+        """Counts a file that shared the result of a byte-identical file and was not read."""
+        self.duplicates += 1
+        self.duplicate_bytes += size
+
+    def add_file(self, timing: FileTiming):
+        self.files += 1
+        self.bytes_read += timing.bytes_read
+        self.phases["read"] += timing.read_time
+        self.phases["parse"] += timing.parse_time
+        self.phases["validate"] += timing.validate_time
+
+        totals = self.formats.setdefault(format_name(timing.extension), [0, 0, 0.0])
+        totals[0] += 1
+        totals[1] += timing.bytes_read
+        totals[2] += timing.total_time
+
+        # Min-heap on total time: the root is the fastest of the slowest files kept so far.
+        entry = (timing.total_time, self.files, timing)
+        if len(self._slowest) < self.slowest_count:
+            heapq.heappush(self._slowest, entry)
+        elif entry[0] > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def finish(self):
+        """Stops the run clock."""
+        self.elapsed = time.monotonic() - self.started
+
+    def slowest(self) -> list[FileTiming]:
+        """Returns the slowest files, slowest first."""
+        return [timing for _, _, timing in sorted(self._slowest, reverse=True)]
+
+    def summary(self) -> dict:
+        """Returns the statistics as plain, JSON-serialisable data."""
+        elapsed = self.elapsed or (time.monotonic() - self.started)
+        formats = {}
+        for name, (files, size, seconds) in sorted(self.formats.items()):
+            formats[name] = {
+                "files": files,
+                "bytes": size,
+                "seconds": round(seconds, 6),
+                "files_per_s": round(files / seconds, 1) if seconds else None,
+                "mb_per_s": round(size / seconds / 1_000_000, 2) if seconds else None,
+            }
+        return {
+            "files": self.files,
+            "cached": self.cached,
+            "duplicates": self.duplicates,
+            "duplicate_bytes": self.duplicate_bytes,
+            "bytes_read": self.bytes_read,
+            "elapsed_s": round(elapsed, 6),
+            "files_per_s": round((self.files + self.cached + self.duplicates) / elapsed, 1) if elapsed else None,
+            "mb_per_s": round(self.bytes_read / elapsed / 1_000_000, 2) if elapsed else None,
+            "phases_s": {phase: round(seconds, 6) for phase, seconds in self.phases.items()},
+            "formats": formats,
+            "slowest": [
+                {
+                    "path": timing.file_path,
+                    "size": timing.size,
+                    "read_s": round(timing.read_time, 6),
+                    "parse_s": round(timing.parse_time, 6),
+                    "validate_s": round(timing.validate_time, 6),
+                    "total_s": round(timing.total_time, 6),
+                }
+                for timing in self.slowest()
+            ],
+        }
+
+def merge_summaries(summaries: list[dict], slowest_count: int = SLOWEST_FILES_COUNT) -> dict:
+    """
+    Combines the summaries of runs made in parallel, e.g. one per shard: counts and
+    phase times are summed, elapsed time is the longest run's, rates are recomputed
+    and the slowest files are taken across all runs.
+    """
+    merged = {key: sum(summary[key] for summary in summaries)
+              for key in ("files", "cached", "duplicates", "duplicate_bytes", "bytes_read")}
+    elapsed = max((summary["elapsed_s"] for summary in summaries), default=0.0)
+    count = merged["files"] + merged["cached"] + merged["duplicates"]
+    merged["elapsed_s"] = elapsed
+    merged["files_per_s"] = round(count / elapsed, 1) if elapsed else None
+    merged["mb_per_s"] = round(merged["bytes_read"] / elapsed / 1_000_000, 2) if elapsed else None
+    merged["phases_s"] = {phase: round(sum(summary["phases_s"].get(phase, 0.0) for summary in summaries), 6)
+                          for phase in PHASES}
+
+    totals = {}
+    for summary in summaries:
+        for name, format_totals in summary["formats"].items():
+            entry = totals.setdefault(name, [0, 0, 0.0])
+            entry[0] += format_totals["files"]
+            entry[1] += format_totals["bytes"]
+            entry[2] += format_totals["seconds"]
+    merged["formats"] = {
+        name: {
+            "files": files,
+            "bytes": size,
+            "seconds": round(seconds, 6),
+            "files_per_s": round(files / seconds, 1) if seconds else None,
+            "mb_per_s": round(size / seconds / 1_000_000, 2) if seconds else None,
+        }
+        for name, (files, size, seconds) in sorted(totals.items())
+    }
+    merged["slowest"] = heapq.nlargest(slowest_count, (entry for summary in summaries for entry in summary["slowest"]),
+                                       key=lambda entry: entry["total_s"])
+    merged["runs"] = len(summaries)
+    return merged
+
+def format_summary(summary: dict) -> list[str]:
+    """Formats a RunStats summary as human-readable lines."""
+    counts = f"{summary['files']} files validated, {summary['cached']} from cache, "
+    if summary["duplicates"]:
+        counts += f"{summary['duplicates']} shared with identical files, "
+    lines = [
+        counts +
+        f"{summary['bytes_read'] / 1_000_000:.1f} MB read in {summary['elapsed_s']:.2f} s"
+        f" ({summary['files_per_s'] or 0:.1f} files/s, {summary['mb_per_s'] or 0:.2f} MB/s)",
+        "Phases (summed across workers): " + ", ".join(
+            f"{phase.replace('_', ' ')} {seconds:.2f} s" for phase, seconds in summary["phases_s"].items()
+        ),
+    ]
+    for name, totals in summary["formats"].items():
+        lines.append(
+            f"{name}: {totals['files']} files, {totals['bytes'] / 1_000_000:.1f} MB, {totals['seconds']:.2f} s"
+            f" ({totals['files_per_s'] or 0:.1f} files/s, {totals['mb_per_s'] or 0:.2f} MB/s)"
+        )
+    if summary["slowest"]:
+        lines.append("Slowest files:")
+        for entry in summary["slowest"]:
+            lines.append(f"  {entry['total_s'] * 1000:.1f} ms  {os.path.basename(entry['path'])}")
+    return lines
@@ -0,0 +1,141 @@
+"""
+Shards
+Splits one validation across machines by hashing each file's path relative to the
+validated directory, and reads and writes the compact result files that shard runs
+produce so they can be merged into a single report.
+"""
+
+import os
+import gzip
+import json
+import zlib
+
+from results import ValidationResult, ErrorEntry, FileFormat
+
+RESULT_FILE_FORMAT = "master-file-validator-results"
+RESULT_FILE_VERSION = 1
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """
+    Parses a shard spec written 'i/N', with i counted from 1 as on the command line,
+    into a 0-based (index, count) pair. Raises ValueError for malformed specs.
+    """
+    index, separator, count = spec.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        index = count = 0
+    if not separator or count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{spec}'; expected i/N with 1 <= i <= N, e.g. 1/4")
+    return index - 1, count
+
+def shard_of(relative_path: str, count: int) -> int:
+    """
+    Returns the 0-based shard a file belongs to. CRC-32 of the '/'-separated relative
+    path gives the same answer on every machine, platform and Python process.
+    """
+    return zlib.crc32(relative_path.encode("utf-8", "surrogateescape")) % count
+
+class ResultFileWriter:
+    """
+    Writes results as gzip-compressed JSON lines: a header naming the root and shard,
+    one compact [path, format, status, note, errors(, group_size)] array per result with
+    paths relative to the root, and a final {"stats": ...} line. The file is written
+    next to path and only moved into place by close(), so a crashed shard leaves no
+    file that looks complete.
+    """
+    def __init__(self, path: str, root: str, shard: tuple[int, int] | None = None):
+        self.path = path
+        self.root = os.path.join(root, "")
+        self.stream = gzip.open(path + ".part", "wt", encoding="utf-8")
+        header = {"format": RESULT_FILE_FORMAT, "version": RESULT_FILE_VERSION, "root": root,
+                  "shard": [shard[0] + 1, shard[1]] if shard is not None else None}
+        self.stream.write(json.dumps(header) + "\n")
+
+    def add(self, result: ValidationResult):
+        path = result.path
+        if not result.is_system and path.startswith(self.root):
+            path = path[len(self.root):].replace(os.sep, "/")
+        record = [path, int(result.file_format), int(result.status), result.note, [list(error) for error in result.errors]]
+        if result.group_size > 1:
+            record.append(result.group_size)
+        self.stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def close(self, stats: dict | None = None, completed: bool = True):
+        """Writes the stats line and moves the file to path, or discards it when completed is False."""
+        try:
+            if completed:
+                self.stream.write(json.dumps({"stats": stats}) + "\n")
+        finally:
+            self.stream.close()
+        if completed:
+            os.replace(self.path + ".part", self.path)
+        else:
+            os.remove(self.path + ".part")
+
+class ResultFileReader:
+    """
+    Reads a result file written by ResultFileWriter. Iterating yields its results with
+    paths joined to root (the root recorded in the file by default); stats is set
+    once the iteration has reached the end. Raises ValueError for files that are not
+    result files or that were written by a newer version.
+    """
+    def __init__(self, path: str, root: str | None = None):
+        self.path = path
+        self.stats = None
+        self.stream = gzip.open(path, "rt", encoding="utf-8")
+        try:
+            header = json.loads(self.stream.readline() or "null")
+        except (json.JSONDecodeError, OSError, EOFError) as e:
+            self.stream.close()
+            raise ValueError(f"{path} is not a result file: {e}") from e
+        if not isinstance(header, dict) or header.get("format") != RESULT_FILE_FORMAT:
+            self.stream.close()
+            raise ValueError(f"{path} is not a result file")
+        if header.get("version", 0) > RESULT_FILE_VERSION:
+            self.stream.close()
+            raise ValueError(f"{path} was written by a newer version (result file version {header['version']})")
+        self.root = root if root is not None else header["root"]
+        self.shard = tuple(header["shard"]) if header.get("shard") else None
+
+    def __iter__(self):
+        for line in self.stream:
+            record = json.loads(line)
+            if isinstance(record, dict):
+                self.stats = record.get("stats")
+                continue
+            path, file_format, status, note, errors, *rest = record
+            if file_format != FileFormat.DTD:
+                path = os.path.join(self.root, path)
+            yield ValidationResult(path, file_format, status, note, tuple(ErrorEntry(*error) for error in errors),
+                                   rest[0] if rest else 1)
+
+    def close(self):
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def check_shards(readers: list[ResultFileReader]) -> list[str]:
+    """Returns warnings about result files that do not form one complete set of shards."""
+    warnings = []
+    counts = {reader.shard[1] for reader in readers if reader.shard is not None}
+    if len(counts) > 1:
+        warnings.append(f"Result files come from runs split into different numbers of shards: {sorted(counts)}")
+    seen = {}
+    for reader in readers:
+        if reader.shard is None:
+            continue
+        if reader.shard in seen:
+            warnings.append(f"Shard {reader.shard[0]}/{reader.shard[1]} appears twice: "
+                            f"{seen[reader.shard]} and {reader.path}")
+        seen.setdefault(reader.shard, reader.path)
+    if len(counts) == 1:
+        count = counts.pop()
+        missing = [str(index) for index in range(1, count + 1) if (index, count) not in seen]
+        if missing:
+            warnings.append(f"Missing shards {', '.join(missing)} of {count}; the merged report is incomplete")
+    return warnings
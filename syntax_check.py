@@ -0,0 +1,132 @@
+"""
+Syntax Checks
+Well-formedness checkers for JSON, YAML and PO that avoid building the whole document:
+YAML and PO are checked from parser events and lines alone, and JSON objects are
+dropped as soon as they are parsed.
+Each checker returns a list of ErrorEntry, empty when the input is well-formed.
+"""
+
+import re
+import json
+
+from results import ErrorEntry
+
+# --- JSON -------------------------------------------------------------------
+
+def _discard_object(pairs) -> None:
+    return None
+
+# Objects are dropped as soon as the C scanner has parsed them. Strings, numbers and
+# arrays are still built (an array of objects becomes a list of None), so this saves
+# the dicts of a document rather than keeping memory flat.
+_JSON_SYNTAX_DECODER = json.JSONDecoder(object_pairs_hook=_discard_object)
+
+def check_json_syntax(text: str) -> list[ErrorEntry]:
+    """
+    Checks JSON text with the standard json module's C scanner, discarding each object
+    once parsed; arrays and strings are still materialized while decoding.
+    Accepts the same documents as json.loads, including NaN and Infinity.
+    """
+    try:
+        _JSON_SYNTAX_DECODER.decode(text)
+    except json.JSONDecodeError as e:
+        return [ErrorEntry(e.lineno, e.colno, "json-syntax", e.msg)]
+    return []
+
+# --- YAML -------------------------------------------------------------------
+
+def check_yaml_syntax(stream, yaml_loader) -> list[ErrorEntry]:
+    """
+    Runs the ruamel.yaml scanner and parser over stream, discarding the events,
+    so no nodes or Python objects are constructed.
+    """
+    from ruamel.yaml.error import MarkedYAMLError
+
+    try:
+        for _ in yaml_loader.parse(stream):
+            pass
+    except MarkedYAMLError as e:
+        mark = e.problem_mark or e.context_mark
+        message = e.problem or e.context or "Invalid YAML"
+        if mark is None:
+            return [ErrorEntry(0, 0, "yaml-syntax", message)]
+        return [ErrorEntry(mark.line + 1, mark.column + 1, "yaml-syntax", message)]
+    return []
+
+# --- PO ---------------------------------------------------------------------
+
+_PO_CHARSET = re.compile(rb"charset=\s*([\w.-]+)")
+_PO_HEADER_BYTES = 4096
+
+def decode_po(data) -> str:
+    """Decodes PO file bytes (any bytes-like object) using the charset declared in its header, defaulting to UTF-8."""
+    match = _PO_CHARSET.search(data, 0, _PO_HEADER_BYTES)
+    charset = match.group(1).decode("ascii") if match else "utf-8"
+    if charset.upper() == "CHARSET":
+        # Untouched template header.
+        charset = "utf-8"
+    return str(data, charset)
+
+_PO_STRING = re.compile(r'"(?:[^"\\]|\\.)*"\s*$')
+_PO_KEYWORD = re.compile(r"(msgctxt|msgid_plural|msgid|msgstr\[\d+\]|msgstr)\s+(.*)$")
+
+def _po_error(line: int, column: int, message: str) -> ErrorEntry:
+    return ErrorEntry(line, column, "po-syntax", message)
+
+# Entry states.
+_PO_START, _PO_CTXT, _PO_ID, _PO_PLURAL, _PO_STR, _PO_STR_N = range(6)
+
+def check_po_syntax(text: str) -> list[ErrorEntry]:
+    """
+    Checks the structure of a gettext PO file one line at a time: keyword order
+    (msgctxt, msgid, msgid_plural, msgstr / msgstr[n]), string quoting and
+    continuation lines. Comments, including obsolete '#~' entries, are skipped.
+    """
+    state = _PO_START
+    has_keyword = False
+    line_number = 0
+    for line_number, raw_line in enumerate(text.splitlines(), start=1):
+        line = raw_line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        if line.startswith('"'):
+            if not has_keyword:
+                return [_po_error(line_number, 1, "String continuation without a keyword")]
+            if not _PO_STRING.match(line):
+                return [_po_error(line_number, 1, "Unterminated or badly escaped string")]
+            continue
+
+        keyword_match = _PO_KEYWORD.match(line)
+        if keyword_match is None:
+            return [_po_error(line_number, 1, f"Unexpected content: {line[:40]}")]
+        keyword, value = keyword_match.groups()
+        if not _PO_STRING.match(value):
+            return [_po_error(line_number, len(raw_line) - len(raw_line.lstrip()) + len(keyword) + 2,
+                              "Unterminated or badly escaped string")]
+
+        if keyword == "msgctxt":
+            if state not in (_PO_START, _PO_STR, _PO_STR_N):
+                return [_po_error(line_number, 1, "msgctxt must start a new entry")]
+            state = _PO_CTXT
+        elif keyword == "msgid":
+            if state in (_PO_ID, _PO_PLURAL):
+                return [_po_error(line_number, 1, "Missing msgstr for the previous msgid")]
+            state = _PO_ID
+        elif keyword == "msgid_plural":
+            if state != _PO_ID:
+                return [_po_error(line_number, 1, "msgid_plural without a preceding msgid")]
+            state = _PO_PLURAL
+        elif keyword == "msgstr":
+            if state != _PO_ID:
+                return [_po_error(line_number, 1, "msgstr without a preceding msgid")]
+            state = _PO_STR
+        else:
+            if state not in (_PO_PLURAL, _PO_STR_N):
+                return [_po_error(line_number, 1, f"{keyword} without a preceding msgid_plural")]
+            state = _PO_STR_N
+        has_keyword = True
+
+    if state in (_PO_CTXT, _PO_ID, _PO_PLURAL):
+        return [_po_error(line_number, 1, "Entry is missing its msgstr")]
+    return []
@@ -0,0 +1,36 @@
+import io
+
+from cli import NdjsonWriter
+from results import ValidationResult, ErrorEntry, FileFormat
+from results_model import ResultStore
+
+ERROR = ErrorEntry(1, 1, "ERR", "broken")
+
+def results(archive):
+    return [
+        ValidationResult.valid("/tree/a.xml", FileFormat.XML, "Valid"),
+        ValidationResult.invalid(f"{archive}!/amp.xml", FileFormat.XML, [ERROR]),
+        ValidationResult.valid(f"{archive}!/sub/ok.json", FileFormat.JSON, "Valid JSON"),
+        ValidationResult.invalid("/tree/b.zip.xml", FileFormat.XML, [ERROR]),
+    ]
+
+def test_store_finds_archive_members():
+    store = ResultStore()
+    for result in results("/tree/b.zip"):
+        store.append(result)
+    assert sorted(store.member_paths("/tree/b.zip")) == ["/tree/b.zip!/amp.xml", "/tree/b.zip!/sub/ok.json"]
+    assert store.member_paths("/tree/a.xml") == []
+
+def test_writer_forgets_members_of_deleted_archives():
+    writer = NdjsonWriter(io.StringIO())
+    writer.write_batch(results("/tree/b.zip"))
+    assert writer.failing == {"/tree/b.zip!/amp.xml", "/tree/b.zip.xml"}
+
+    writer.write_deleted(["/tree/b.zip"])
+    assert writer.failing == {"/tree/b.zip.xml"}
+
+def test_writer_forgets_members_of_changed_archives():
+    writer = NdjsonWriter(io.StringIO())
+    writer.write_batch(results("/tree/b.zip"))
+    writer.forget_members(["/tree/b.zip", "/tree/b.zip.xml"])
+    assert writer.failing == {"/tree/b.zip.xml"}
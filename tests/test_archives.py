@@ -0,0 +1,31 @@
+import io
+import tarfile
+
+from archives import read_members
+from results import FORMAT_BY_EXTENSION
+
+def make_tar(path, members: dict):
+    with tarfile.open(path, "w") as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+def test_unreadable_tar_member_does_not_end_the_archive(tmp_path, monkeypatch):
+    archive_path = str(tmp_path / "bundle.tar")
+    make_tar(archive_path, {"./a.json": b"{}", "b.json": b"{}", "c.json": b"{}"})
+    extractfile = tarfile.TarFile.extractfile
+
+    def failing_extractfile(self, member):
+        if member.name == "b.json":
+            raise tarfile.ReadError("unexpected end of data")
+        return extractfile(self, member)
+
+    monkeypatch.setattr(tarfile.TarFile, "extractfile", failing_extractfile)
+    members = [(path, data) for path, _, data, _ in read_members(archive_path, ".tar", FORMAT_BY_EXTENSION)]
+
+    assert [path for path, _ in members] == [f"{archive_path}!/a.json", f"{archive_path}!/b.json",
+                                             f"{archive_path}!/c.json"]
+    assert members[0][1] == b"{}"
+    assert isinstance(members[1][1], tarfile.ReadError)
+    assert members[2][1] == b"{}"
@@ -0,0 +1,68 @@
+import os
+import sqlite3
+
+import pytest
+
+from engine import ValidationEngine
+
+FILE_COUNT = 1200  # More than one 500-entry store batch and mark_seen batch.
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    root.mkdir()
+    for index in range(FILE_COUNT):
+        (root / f"f{index}.json").write_text('{"a": 1}')
+    return root
+
+def run_engine(root, cache_path, **options):
+    results = []
+    engine = ValidationEngine(str(root), [], cache_path=str(cache_path), on_result=results.append, **options)
+    engine.run()
+    return engine, results
+
+@pytest.mark.parametrize("options", [{}, {"prefetch_depth": 0}])
+def test_cached_run_over_several_store_batches(tree, tmp_path, options):
+    cache_path = tmp_path / "cache.db"
+    engine, results = run_engine(tree, cache_path, **options)
+    assert len(results) == FILE_COUNT
+    assert engine.stats.files == FILE_COUNT
+
+    engine, results = run_engine(tree, cache_path, **options)
+    assert len(results) == FILE_COUNT
+    assert engine.stats.cached == FILE_COUNT
+
+def test_sweep_evicts_deleted_files(tree, tmp_path):
+    cache_path = tmp_path / "cache.db"
+    run_engine(tree, cache_path)
+    os.remove(tree / "f0.json")
+    run_engine(tree, cache_path)
+
+    connection = sqlite3.connect(cache_path)
+    try:
+        count = connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    finally:
+        connection.close()
+    assert count == FILE_COUNT - 1
+
+def test_editing_a_dtd_module_invalidates_cached_results(tmp_path):
+    schema = tmp_path / "schema"
+    schema.mkdir()
+    (schema / "topic.dtd").write_text('<!ENTITY % elements SYSTEM "elements.mod">\n%elements;\n')
+    (schema / "elements.mod").write_text("<!ELEMENT topic (#PCDATA)>\n")
+    root = tmp_path / "docs"
+    root.mkdir()
+    (root / "a.xml").write_text("<!DOCTYPE topic>\n<topic>text</topic>\n")
+    cache_path = tmp_path / "cache.db"
+    dtd_paths = [str(schema / "topic.dtd")]
+
+    results = []
+    ValidationEngine(str(root), dtd_paths, cache_path=str(cache_path), on_result=results.append).run()
+    assert [result.ok for result in results if not result.is_system] == [True]
+
+    (schema / "elements.mod").write_text("<!ELEMENT topic (title)>\n<!ELEMENT title (#PCDATA)>\n")
+    results = []
+    engine = ValidationEngine(str(root), dtd_paths, cache_path=str(cache_path), on_result=results.append)
+    engine.run()
+    assert engine.stats.cached == 0
+    assert [result.ok for result in results if not result.is_system] == [False]
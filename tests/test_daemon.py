@@ -0,0 +1,77 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from daemon import CheckerCache, PooledHTTPServer, RequestHandler, ValidationService
+from dtd_cache import dtd_signature
+from results import FileFormat
+
+@pytest.fixture
+def server():
+    server = PooledHTTPServer(("127.0.0.1", 0), RequestHandler)
+    server.service = ValidationService([])
+    server.start_pool(2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+def post(server, body: bytes, headers: dict) -> tuple[int, dict]:
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    try:
+        connection.putrequest("POST", "/validate", skip_host=True)
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders(body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+def headers(server, **overrides) -> dict:
+    values = {"Host": f"localhost:{server.server_address[1]}", "Content-Type": "application/json"}
+    values.update((name.replace("_", "-"), value) for name, value in overrides.items())
+    return {name: value for name, value in values.items() if value is not None}
+
+def test_valid_request(server):
+    body = b'{"content": "{\\"a\\": 1}", "format": "json"}'
+    status, response = post(server, body, headers(server, Content_Length=str(len(body))))
+    assert status == 200
+    assert response["files"] == 1 and response["failed"] == 0
+
+@pytest.mark.parametrize("length, expected", [("-1", 400), ("abc", 400), (None, 411)])
+def test_bad_content_length(server, length, expected):
+    status, _ = post(server, b"{}", headers(server, Content_Length=length))
+    assert status == expected
+
+@pytest.mark.parametrize("overrides, expected", [
+    ({"Host": "evil.example:8765"}, 403),
+    ({"Host": "localhost:1"}, 403),
+    ({"Host": None}, 403),
+    ({"Content_Type": "text/plain"}, 415),
+    ({"Content_Type": None}, 415),
+])
+def test_rejects_requests_a_browser_page_could_send(server, overrides, expected):
+    status, _ = post(server, b"{}", headers(server, Content_Length="2", **overrides))
+    assert status == expected
+
+def test_checker_cache_reuses_checkers_until_a_dtd_file_changes(tmp_path, monkeypatch):
+    (tmp_path / "topic.dtd").write_text('<!ENTITY % mod SYSTEM "topic.mod">\n%mod;\n')
+    (tmp_path / "topic.mod").write_text("<!ELEMENT topic EMPTY>\n")
+    scans = []
+    monkeypatch.setattr("daemon.dtd_signature", lambda path: scans.append(path) or dtd_signature(path))
+    cache = CheckerCache()
+    dtd_paths = [str(tmp_path / "topic.dtd")]
+    extensions = {".xml": FileFormat.XML}
+
+    checker, _ = cache.get(dtd_paths, False, False, extensions)
+    assert cache.get(dtd_paths, False, False, extensions)[0] is checker
+    assert len(scans) == 1
+
+    (tmp_path / "topic.mod").write_text("<!ELEMENT topic (#PCDATA)>\n")
+    assert cache.get(dtd_paths, False, False, extensions)[0] is not checker
+    assert len(scans) == 2
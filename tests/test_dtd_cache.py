@@ -0,0 +1,39 @@
+import threading
+
+from engine import FileChecker
+
+DTD = """<!ELEMENT note (to, body)>
+<!ELEMENT to (#PCDATA)>
+<!ELEMENT body (#PCDATA)>
+"""
+
+def test_checkers_share_the_dtd_lock(tmp_path):
+    dtd_path = tmp_path / "note.dtd"
+    dtd_path.write_text(DTD)
+    (tmp_path / "missing_body.xml").write_text("<note><to>a</to></note>")
+    (tmp_path / "extra.xml").write_text("<note><to>a</to><body>b</body><cc/></note>")
+    # Different settings build separate checkers around the same compiled DTD.
+    checkers = [FileChecker([str(dtd_path)]), FileChecker([str(dtd_path)], allow_bom=True)]
+    for checker in checkers:
+        assert all(result.ok for result in checker.load_dtds())
+    (_, first), (_, second) = checkers[0].dtds[0], checkers[1].dtds[0]
+    assert first is second
+    assert checkers[0]._dtd_locks[id(first)] is checkers[1]._dtd_locks[id(second)]
+
+    expected = {name: checkers[0].validate_file(str(tmp_path / name), ".xml").messages()
+                for name in ("missing_body.xml", "extra.xml")}
+    mismatches = []
+
+    def validate(checker, name):
+        for _ in range(200):
+            messages = checker.validate_file(str(tmp_path / name), ".xml").messages()
+            if messages != expected[name]:
+                mismatches.append((name, messages))
+
+    threads = [threading.Thread(target=validate, args=(checker, name))
+               for checker, name in zip(checkers, expected)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not mismatches
@@ -0,0 +1,20 @@
+from engine import FileChecker
+
+def test_fallback_names_the_dtd(tmp_path):
+    # Both DTDs declare the root element, so neither can be routed to and every DTD is tried.
+    (tmp_path / "a.dtd").write_text("<!ELEMENT doc (x)>\n<!ELEMENT x EMPTY>\n")
+    (tmp_path / "b.dtd").write_text("<!ELEMENT doc (y)>\n<!ELEMENT y EMPTY>\n")
+    (tmp_path / "ok.xml").write_text("<doc><y/></doc>")
+    (tmp_path / "bad.xml").write_text("<doc><z/></doc>")
+    checker = FileChecker([str(tmp_path / "a.dtd"), str(tmp_path / "b.dtd")])
+    checker.load_dtds()
+    assert [name for name, _ in checker.dtds] == ["a.dtd", "b.dtd"]
+
+    valid = checker.validate_file(str(tmp_path / "ok.xml"), ".xml")
+    assert valid.ok
+    assert valid.note == "Valid and DTD compliant (b.dtd)"
+
+    invalid = checker.validate_file(str(tmp_path / "bad.xml"), ".xml")
+    assert not invalid.ok
+    assert invalid.note == "Validated against b.dtd"
+    assert invalid.errors
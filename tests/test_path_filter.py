@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from engine import discover_files
+from path_filter import PatternSet, PathFilter, compile_pattern
+
+def excluded(lines, relative_path, is_dir=False):
+    return PatternSet(lines).match(relative_path, is_dir)
+
+@pytest.mark.parametrize("pattern, path, expected", [
+    # Without a slash, a pattern matches a name at any depth.
+    ("*.json", "a.json", True),
+    ("*.json", "sub/deep/a.json", True),
+    ("a.json", "sub/a.json", True),
+    # A slash anywhere but at the end anchors the pattern to the ignore file's directory.
+    ("/a.json", "a.json", True),
+    ("/a.json", "sub/a.json", None),
+    ("sub/a.json", "sub/a.json", True),
+    ("sub/a.json", "x/sub/a.json", None),
+    # '*' and '?' stop at slashes; '**' does not.
+    ("sub/*.json", "sub/deep/a.json", None),
+    ("a?.json", "ab.json", True),
+    ("a?.json", "a/.json", None),
+    ("**/deep/*.json", "deep/a.json", True),
+    ("**/deep/*.json", "sub/x/deep/a.json", True),
+    ("sub/**", "sub/deep/a.json", True),
+    ("sub/**/a.json", "sub/a.json", True),
+    ("sub/**/a.json", "sub/x/y/a.json", True),
+    ("sub/**/a.json", "other/a.json", None),
+    # Character classes, negated classes and escapes.
+    ("[ab].json", "b.json", True),
+    ("[!ab].json", "b.json", None),
+    ("[!ab].json", "c.json", True),
+    ("\\#notes.json", "#notes.json", True),
+    ("\\!important.json", "!important.json", True),
+])
+def test_glob_syntax(pattern, path, expected):
+    assert excluded([pattern], path) is expected
+
+def test_comments_and_blank_lines():
+    assert compile_pattern("# comment") is None
+    assert compile_pattern("   ") is None
+    assert compile_pattern("/") is None
+
+def test_dir_only_patterns():
+    assert excluded(["build/"], "build", is_dir=True) is True
+    assert excluded(["build/"], "build", is_dir=False) is None
+    assert excluded(["build/"], "src/build", is_dir=True) is True
+
+def test_negation_uses_the_last_matching_pattern():
+    lines = ["*.json", "!keep.json"]
+    assert excluded(lines, "drop.json") is True
+    assert excluded(lines, "keep.json") is False
+    assert excluded(lines + ["keep.json"], "keep.json") is True
+
+def write_tree(root, paths):
+    for path in paths:
+        file_path = os.path.join(root, *path.split("/"))
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w") as f:
+            f.write("{}" if path.endswith(".json") else "")
+
+def discovered(root, path_filter):
+    return sorted(os.path.relpath(path, root).replace(os.sep, "/")
+                  for path, *_ in discover_files(str(root), (".json",), path_filter))
+
+def test_file_under_an_ignored_directory_cannot_be_reincluded(tmp_path):
+    # As in git: once a directory is excluded, nothing below it is looked at.
+    write_tree(tmp_path, ["build/keep.json", "build/drop.json", "out/keep.json", "out/drop.json", "a.json"])
+    (tmp_path / ".gitignore").write_text("build/\n!build/keep.json\nout/*\n!out/keep.json\n")
+    path_filter = PathFilter(str(tmp_path), ignore_file_names=(".gitignore",))
+    assert discovered(tmp_path, path_filter) == ["a.json", "out/keep.json"]
+
+def test_nested_ignore_files_take_precedence(tmp_path):
+    write_tree(tmp_path, ["a.json", "b.json", "sub/a.json", "sub/b.json", "sub/deep/a.json", "other/b.json"])
+    (tmp_path / ".gitignore").write_text("a.json\n/b.json\n")
+    # Deeper files override the root's rules for their subtree, with paths relative to themselves.
+    (tmp_path / "sub" / ".gitignore").write_text("!a.json\n/b.json\n")
+    path_filter = PathFilter(str(tmp_path), ignore_file_names=(".gitignore",))
+    assert discovered(tmp_path, path_filter) == ["other/b.json", "sub/a.json", "sub/deep/a.json"]
+
+def test_excluded_directories_are_never_entered(tmp_path, monkeypatch):
+    write_tree(tmp_path, ["a.json", "node_modules/pkg/b.json", "src/node_modules/c.json", "src/d.json"])
+    path_filter = PathFilter(str(tmp_path), exclude=["node_modules/"])
+    scanned = []
+    scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: scanned.append(path) or scandir(path))
+
+    assert discovered(tmp_path, path_filter) == ["a.json", "src/d.json"]
+    assert not [path for path in scanned if "node_modules" in path]
+
+def test_include_patterns_and_excludes(tmp_path):
+    write_tree(tmp_path, ["docs/a.json", "docs/drafts/b.json", "src/c.json", ".git/d.json"])
+    path_filter = PathFilter(str(tmp_path), include=["docs/"], exclude=["drafts/"])
+    assert discovered(tmp_path, path_filter) == ["docs/a.json"]
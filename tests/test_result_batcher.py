@@ -0,0 +1,34 @@
+import threading
+import time
+
+from engine import ResultBatcher
+
+def test_deliveries_never_overlap_and_keep_order():
+    active = 0
+    overlaps = 0
+    delivered = []
+    guard = threading.Lock()
+
+    def deliver(batch):
+        nonlocal active, overlaps
+        with guard:
+            active += 1
+            overlaps += active > 1
+        time.sleep(0.001)
+        delivered.extend(batch)
+        with guard:
+            active -= 1
+
+    batcher = ResultBatcher(deliver, batch_size=10, interval_ms=1)
+    threads = [threading.Thread(target=lambda offset=offset: [batcher.add(offset + i) for i in range(500)])
+               for offset in (0, 1000, 2000)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert overlaps == 0
+    assert sorted(delivered) == sorted(offset + i for offset in (0, 1000, 2000) for i in range(500))
+    for offset in (0, 1000, 2000):
+        assert [value for value in delivered if offset <= value < offset + 500] == list(range(offset, offset + 500))
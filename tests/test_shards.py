@@ -0,0 +1,114 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from cli import main, merge_main
+from results import ErrorEntry, FileFormat, ValidationResult
+from shards import ResultFileReader, ResultFileWriter, check_shards, parse_shard, shard_of
+
+SHARD_COUNT = 3
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    for index in range(60):
+        directory = root / f"d{index % 4}"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"f{index}.json").write_text('{"a": 1' if index % 10 == 0 else '{"a": 1}')
+    return root
+
+def run_shards(tree, tmp_path, capsys) -> list[str]:
+    paths = []
+    for index in range(1, SHARD_COUNT + 1):
+        path = str(tmp_path / f"shard{index}.ndjson.gz")
+        main([str(tree), "--shard", f"{index}/{SHARD_COUNT}", "--results", path, "--stats"])
+        paths.append(path)
+    capsys.readouterr()
+    return paths
+
+@pytest.mark.parametrize("spec, expected", [("1/1", (0, 1)), ("2/4", (1, 4)), ("4/4", (3, 4))])
+def test_parse_shard(spec, expected):
+    assert parse_shard(spec) == expected
+
+@pytest.mark.parametrize("spec", ["0/4", "5/4", "1/0", "1", "a/b", "1/2/3"])
+def test_parse_shard_rejects_malformed_specs(spec):
+    with pytest.raises(ValueError):
+        parse_shard(spec)
+
+def test_shard_of_is_stable():
+    assert shard_of("docs/a.json", 4) == shard_of("docs/a.json", 4)
+    assert {shard_of(f"f{index}.json", 4) for index in range(100)} == {0, 1, 2, 3}
+
+def test_shards_cover_the_tree_exactly_once(tree, tmp_path, capsys):
+    shard_files = {}
+    for path in run_shards(tree, tmp_path, capsys):
+        with ResultFileReader(path) as reader:
+            shard_files[reader.shard] = {result.path for result in reader if not result.is_system}
+            assert reader.stats is not None
+    all_files = {str(path) for path in tree.rglob("*.json")}
+
+    assert sorted(shard_files) == [(index, SHARD_COUNT) for index in range(1, SHARD_COUNT + 1)]
+    assert all(shard_files.values())
+    assert sum(len(files) for files in shard_files.values()) == len(all_files)
+    assert set().union(*shard_files.values()) == all_files
+
+def test_result_file_round_trip(tmp_path):
+    path = str(tmp_path / "results.ndjson.gz")
+    root = str(tmp_path / "tree")
+    results = [
+        ValidationResult.valid(os.path.join(root, "sub", "a.json"), FileFormat.JSON, "Valid JSON"),
+        ValidationResult.invalid(os.path.join(root, "b.xml"), FileFormat.XML, [ErrorEntry(2, 5, "ERR", "broken")]),
+        ValidationResult.valid("schema.dtd", FileFormat.DTD, "Successfully loaded"),
+    ]
+    results[0].group_size = 3
+    writer = ResultFileWriter(path, root, (1, 4))
+    for result in results:
+        writer.add(result)
+    writer.close({"files": 2})
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        first = json.loads(f.readline())
+    assert header["shard"] == [2, 4]
+    assert first[0] == "sub/a.json"
+
+    with ResultFileReader(path) as reader:
+        read_back = list(reader)
+    assert reader.shard == (2, 4)
+    assert reader.stats == {"files": 2}
+    assert [(r.path, r.file_format, r.status, r.note, r.errors, r.group_size) for r in read_back] == \
+           [(r.path, r.file_format, r.status, r.note, tuple(r.errors), r.group_size) for r in results]
+
+    with ResultFileReader(path, str(tmp_path / "elsewhere")) as reader:
+        assert next(iter(reader)).path == os.path.join(str(tmp_path / "elsewhere"), "sub/a.json")
+
+def test_interrupted_writer_leaves_no_file(tmp_path):
+    path = str(tmp_path / "results.ndjson.gz")
+    writer = ResultFileWriter(path, str(tmp_path))
+    writer.close(completed=False)
+    assert os.listdir(tmp_path) == []
+
+def test_merge_counts(tree, tmp_path, capsys):
+    paths = run_shards(tree, tmp_path, capsys)
+    assert merge_main(paths + ["--stats"]) == 1
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    results = [record for record in records if "path" in record]
+    stats = [record["stats"] for record in records if "stats" in record]
+
+    assert len(results) == 60
+    assert sum(not record["ok"] for record in results) == 6
+    assert stats[0]["files"] == 60
+
+def test_missing_and_duplicate_shards_are_reported(tree, tmp_path, capsys):
+    paths = run_shards(tree, tmp_path, capsys)
+    readers = [ResultFileReader(path) for path in paths[:2]]
+    try:
+        assert check_shards(readers) == [f"Missing shards 3 of {SHARD_COUNT}; the merged report is incomplete"]
+        readers.append(ResultFileReader(paths[0]))
+        warnings = check_shards(readers)
+        assert any("appears twice" in warning for warning in warnings)
+    finally:
+        for reader in readers:
+            reader.close()
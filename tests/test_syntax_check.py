@@ -0,0 +1,58 @@
+import pytest
+
+from syntax_check import check_json_syntax, check_po_syntax
+
+HEADER = 'msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n\n'
+
+@pytest.mark.parametrize("text", [
+    'msgid "a"\nmsgstr "b"\n',
+    # Plurals.
+    'msgid "file"\nmsgid_plural "files"\nmsgstr[0] "Datei"\nmsgstr[1] "Dateien"\n',
+    # Context.
+    'msgctxt "menu"\nmsgid "Open"\nmsgstr "Öffnen"\n\nmsgctxt "door"\nmsgid "Open"\nmsgstr "Offen"\n',
+    'msgctxt "menu"\nmsgid "file"\nmsgid_plural "files"\nmsgstr[0] "Datei"\nmsgstr[1] "Dateien"\n',
+    # Obsolete entries and other comments are skipped, whatever they contain.
+    '# translator comment\n#: src/a.c:12\n#, fuzzy\nmsgid "a"\nmsgstr "b"\n\n#~ msgid "old"\n#~ msgstr "alt"\n#~ msgstr "again"\n',
+    # Continuation lines, including escaped quotes.
+    'msgid ""\n"first line\\n"\n"second \\"quoted\\" line"\nmsgstr ""\n"erste\\n"\n"zweite"\n',
+    # Empty translations are allowed.
+    'msgid "a"\nmsgstr ""\n',
+])
+def test_well_formed_po(text):
+    assert check_po_syntax(HEADER + text) == []
+
+@pytest.mark.parametrize("text, line, message", [
+    # Missing msgstr, before the next entry and at the end of the file.
+    ('msgid "a"\n\nmsgid "b"\nmsgstr "c"\n', 3, "Missing msgstr for the previous msgid"),
+    ('msgid "a"\nmsgstr "b"\n\nmsgid "c"\n', 4, "Entry is missing its msgstr"),
+    ('msgid "a"\nmsgid_plural "as"\n', 2, "Entry is missing its msgstr"),
+    # Duplicate msgstr.
+    ('msgid "a"\nmsgstr "b"\nmsgstr "c"\n', 3, "msgstr without a preceding msgid"),
+    # Plural forms out of place.
+    ('msgid "a"\nmsgstr[0] "b"\n', 2, "msgstr[0] without a preceding msgid_plural"),
+    ('msgid "a"\nmsgid_plural "as"\nmsgstr "b"\n', 3, "msgstr without a preceding msgid"),
+    ('msgid_plural "as"\nmsgstr[0] "b"\n', 1, "msgid_plural without a preceding msgid"),
+    # Context must open an entry.
+    ('msgid "a"\nmsgctxt "b"\nmsgstr "c"\n', 2, "msgctxt must start a new entry"),
+    ('msgctxt "a"\n', 1, "Entry is missing its msgstr"),
+    # Continuation lines.
+    ('"orphan"\nmsgid "a"\nmsgstr "b"\n', 1, "String continuation without a keyword"),
+    ('msgid ""\n"unterminated\nmsgstr "b"\n', 2, "Unterminated or badly escaped string"),
+    ('msgid "a\nmsgstr "b"\n', 1, "Unterminated or badly escaped string"),
+    ('msgid "a"\nmsgstr "b"\ngarbage\n', 3, "Unexpected content: garbage"),
+])
+def test_malformed_po(text, line, message):
+    errors = check_po_syntax(text)
+    assert [(error.line, error.message) for error in errors] == [(line, message)]
+
+@pytest.mark.parametrize("text, line, column", [
+    ('{"a": [1, 2,]}', 1, 13),
+    ('{"a": 1}\n{"b": 2}', 2, 1),
+    ('[{"a": {"b": [1, {"c": }]}}]', 1, 24),
+])
+def test_malformed_json(text, line, column):
+    errors = check_json_syntax(text)
+    assert [(error.line, error.column, error.code) for error in errors] == [(line, column, "json-syntax")]
+
+def test_well_formed_json():
+    assert check_json_syntax('[{"a": {"b": [1, "x", null, NaN]}}, {"a": 2}]') == []
@@ -0,0 +1,25 @@
+import pytest
+
+from engine import FileChecker
+
+CASES = [
+    ("bad.json", '{"a": 1,\n}', "ok.json", '{"a": 1}', "Valid JSON"),
+    ("bad.yaml", "a: [1, 2\nb: 3\n", "ok.yaml", "a: [1, 2]\n", "Valid YAML"),
+    ("bad.po", 'msgid "a"\nmsgstr "b\n', "ok.po", 'msgid "a"\nmsgstr "b"\n', "Valid PO"),
+]
+
+@pytest.mark.parametrize("bad_name, bad_text, ok_name, ok_text, note", CASES)
+def test_syntax_only_notes(tmp_path, bad_name, bad_text, ok_name, ok_text, note):
+    checker = FileChecker([], syntax_only=True)
+    (tmp_path / bad_name).write_text(bad_text)
+    (tmp_path / ok_name).write_text(ok_text)
+
+    invalid = checker.validate_file(str(tmp_path / bad_name), "." + bad_name.split(".")[1])
+    assert not invalid.ok
+    assert invalid.note == ""
+    assert invalid.messages() == [error.text() for error in invalid.errors]
+    assert note not in invalid.messages()
+
+    valid = checker.validate_file(str(tmp_path / ok_name), "." + ok_name.split(".")[1])
+    assert valid.ok
+    assert valid.messages() == [note]
@@ -0,0 +1,19 @@
+import engine
+from engine import FileChecker
+
+DTD = "<!ELEMENT note (body)>\n<!ELEMENT body (#PCDATA)>\n"
+
+def test_large_files_are_still_validated_against_dtds(tmp_path, monkeypatch):
+    monkeypatch.setattr(engine, "XML_STREAMING_THRESHOLD_BYTES", 16)
+    (tmp_path / "note.dtd").write_text(DTD)
+    file_path = tmp_path / "large.xml"
+    file_path.write_text("<note><body>text</body><extra/></note>")
+
+    streamed = FileChecker([]).validate_file(str(file_path), ".xml")
+    assert streamed.ok
+
+    checker = FileChecker([str(tmp_path / "note.dtd")])
+    checker.load_dtds()
+    result = checker.validate_file(str(file_path), ".xml")
+    assert not result.ok
+    assert result.errors
@@ -70,7 +70,7 @@ def get_stylesheet(checkmark_icon_path: str) -> str:
         font-family: 'Segoe UI Variable', 'Segoe UI', sans-serif; font-size: 9pt; 
     }}
 
-    QLineEdit, QComboBox {{ 
+    QLineEdit, QComboBox, QSpinBox {{ 
         background-color: palette(base); border: 1px solid palette(mid); 
         border-radius: 4px; padding: 4px 6px; color: palette(text); min-height: 20px; 
     }}
@@ -101,7 +101,7 @@ def get_stylesheet(checkmark_icon_path: str) -> str:
         background-color: palette(highlight);
     }}
 
-    QTableWidget {{
+    QTableView {{
         background-color: palette(base);
         border: 1px solid palette(mid);
         gridline-color: palette(midlight);
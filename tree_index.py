@@ -0,0 +1,211 @@
+"""
+Tree Index
+Keeps the size and modification time of every validatable file in a tree, so watch
+mode can work out which files were created, modified or deleted without revalidating
+anything else. Directories are rescanned one at a time, so when change notifications
+name the directories involved, an update costs as much as the directories it touches.
+"""
+
+import os
+import threading
+import time
+from typing import NamedTuple
+
+from archives import file_extension
+
+class TreeChanges(NamedTuple):
+    """Result of a rescan: changed holds discovery entries, the rest are paths."""
+    changed: list      # (file_path, extension, size, mtime_ns) for created and modified files
+    deleted: list
+    added_dirs: list
+    removed_dirs: list
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.deleted or self.added_dirs or self.removed_dirs)
+
+class TreeIndex:
+    """
+    Size/mtime index of the files under root with one of the given extensions,
+    grouped by directory. Directories and files path_filter rejects are left out,
+    as in discovery. Not thread-safe; use it from one thread at a time.
+    """
+    def __init__(self, root: str, extensions: tuple[str, ...], path_filter=None):
+        self.root = root
+        self.extensions = extensions
+        self.path_filter = path_filter
+        self._files = {}    # dir_path -> {file_path: (extension, size, mtime_ns)}
+        self._subdirs = {}  # dir_path -> set of subdirectory paths
+
+    def __len__(self) -> int:
+        return sum(len(files) for files in self._files.values())
+
+    def directories(self) -> list[str]:
+        return list(self._files)
+
+    def files(self) -> list[str]:
+        return [path for files in self._files.values() for path in files]
+
+    def contains(self, file_path: str) -> bool:
+        return file_path in self._files.get(os.path.dirname(file_path), ())
+
+    def build(self):
+        """Indexes the whole tree, replacing any previous contents."""
+        self._files.clear()
+        self._subdirs.clear()
+        self._add_tree(self.root)
+
+    def rescan(self, dir_path: str) -> TreeChanges:
+        """
+        Lists one directory again and compares it with the index. New subdirectories
+        are indexed recursively and vanished ones are dropped with everything below them.
+        """
+        changes = TreeChanges([], [], [], [])
+        if dir_path not in self._files:
+            return changes
+        listing = self._list(dir_path)
+        if listing is None:
+            self._remove_tree(dir_path, changes)
+            return changes
+
+        files, subdirs = listing
+        known = self._files[dir_path]
+        for file_path, entry in files.items():
+            if known.get(file_path) != entry:
+                changes.changed.append((file_path, *entry))
+        changes.deleted.extend(path for path in known if path not in files)
+        self._files[dir_path] = files
+
+        known_dirs = self._subdirs[dir_path]
+        for subdir in subdirs - known_dirs:
+            changes.added_dirs.append(subdir)
+            self._add_tree(subdir, changes.changed, changes.added_dirs)
+        for subdir in known_dirs - subdirs:
+            self._remove_tree(subdir, changes)
+        self._subdirs[dir_path] = subdirs
+        return changes
+
+    def refresh_file(self, file_path: str) -> TreeChanges:
+        """Stats one indexed file again, for notifications that name a single file."""
+        changes = TreeChanges([], [], [], [])
+        dir_path = os.path.dirname(file_path)
+        known = self._files.get(dir_path)
+        if known is None or file_path not in known:
+            return changes
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            del known[file_path]
+            changes.deleted.append(file_path)
+            return changes
+        entry = (known[file_path][0], stat.st_size, stat.st_mtime_ns)
+        if entry != known[file_path]:
+            known[file_path] = entry
+            changes.changed.append((file_path, *entry))
+        return changes
+
+    def poll(self) -> TreeChanges:
+        """Rescans every indexed directory. Used when no change notifications are available."""
+        changes = TreeChanges([], [], [], [])
+        for dir_path in self.directories():
+            # A directory may already be gone as part of an earlier removed subtree.
+            if dir_path in self._files:
+                for merged, found in zip(changes, self.rescan(dir_path)):
+                    merged.extend(found)
+        return changes
+
+    def _list(self, dir_path: str) -> tuple[dict, set] | None:
+        """Returns ({file_path: (extension, size, mtime_ns)}, subdirectories), or None if unreadable."""
+        files = {}
+        subdirs = set()
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.path_filter is None or self.path_filter.allows_dir(entry.path):
+                                subdirs.add(entry.path)
+                            continue
+                        extension = file_extension(entry.name)
+                        if (extension in self.extensions and entry.is_file()
+                                and (self.path_filter is None or self.path_filter.allows_file(entry.path))):
+                            stat = entry.stat()
+                            files[entry.path] = (extension, stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return files, subdirs
+
+    def _add_tree(self, dir_path: str, changed: list | None = None, added_dirs: list | None = None):
+        pending_dirs = [dir_path]
+        while pending_dirs:
+            current_dir = pending_dirs.pop()
+            listing = self._list(current_dir)
+            if listing is None:
+                continue
+            files, subdirs = listing
+            self._files[current_dir] = files
+            self._subdirs[current_dir] = subdirs
+            if changed is not None:
+                changed.extend((file_path, *entry) for file_path, entry in files.items())
+            if added_dirs is not None and current_dir != dir_path:
+                added_dirs.append(current_dir)
+            pending_dirs.extend(subdirs)
+
+    def _remove_tree(self, dir_path: str, changes: TreeChanges):
+        pending_dirs = [dir_path]
+        while pending_dirs:
+            current_dir = pending_dirs.pop()
+            files = self._files.pop(current_dir, None)
+            if files is None:
+                continue
+            changes.deleted.extend(files)
+            changes.removed_dirs.append(current_dir)
+            pending_dirs.extend(self._subdirs.pop(current_dir, ()))
+        parent = self._subdirs.get(os.path.dirname(dir_path))
+        if parent is not None:
+            parent.discard(dir_path)
+
+class PendingChanges:
+    """
+    Accumulates changes until they are taken for revalidation. A file that changes
+    several times is revalidated once, and one deleted after changing is only reported deleted.
+    """
+    def __init__(self):
+        self._changed = {}
+        self._deleted = set()
+
+    def __bool__(self) -> bool:
+        return bool(self._changed or self._deleted)
+
+    def merge(self, changes: TreeChanges):
+        for item in changes.changed:
+            self._deleted.discard(item[0])
+            self._changed[item[0]] = item
+        for file_path in changes.deleted:
+            self._changed.pop(file_path, None)
+            self._deleted.add(file_path)
+
+    def take(self) -> tuple[list, list]:
+        """Returns (changed entries, deleted paths) and clears the pending set."""
+        changed, deleted = list(self._changed.values()), sorted(self._deleted)
+        self._changed = {}
+        self._deleted = set()
+        return changed, deleted
+
+def poll_changes(index: TreeIndex, on_changes, stop: threading.Event, poll_interval: float, debounce: float):
+    """
+    Polls index every poll_interval seconds until stop is set. Changes are collected
+    until the tree has been quiet for debounce seconds, then passed to
+    on_changes(changed, deleted) on the calling thread.
+    """
+    pending = PendingChanges()
+    last_change = 0.0
+    while not stop.wait(poll_interval if not pending else min(poll_interval, debounce)):
+        changes = index.poll()
+        now = time.monotonic()
+        if changes:
+            pending.merge(changes)
+            last_change = now
+        if pending and now - last_change >= debounce:
+            on_changes(*pending.take())
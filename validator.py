@@ -3,135 +3,112 @@ Validation Worker
 Contains the background thread logic for performing file validation.
 """
 
-import os
-import json
 import logging
-from lxml import etree
-import polib
-import ruamel.yaml
 
 from PySide6.QtCore import QObject, QRunnable, Signal
 
+from engine import ValidationEngine
+from git_changes import GitError
+from exporters import export_results
+
 class WorkerSignals(QObject):
     """
     Defines signals available from a running worker thread.
     """
     progress_max_set = Signal(int)
-    file_processed = Signal(str, list)
+    progress_discovered = Signal(int)
+    file_processed = Signal(object)
+    results_batch = Signal(list)
+    stats_updated = Signal(dict)
     finished = Signal()
     error = Signal(str, str)
 
 class ValidatorWorker(QRunnable):
     """
     Worker thread for handling file validation.
+    Runs a ValidationEngine and relays its callbacks as Qt signals.
+    path_filter decides which directories and files discovery visits.
+    With a tree_index, the index is built before the run so watch mode can start from it.
+    With files, only those entries are validated and the deleted paths dropped from the cache.
+    With dedup, byte-identical files are validated once; with changed_since, only files
+    git reports as changed since that ref; with archives, the members of zip and tar files too.
+    With fail_fast, the run stops at the first failing file; max_errors caps the errors kept per file.
+    cancel() may be called from the GUI thread to stop the run early.
     """
-    def __init__(self, directory_path: str, dtd_paths_str: str | None, allow_bom: bool = False):
+    def __init__(self, directory_path: str, dtd_paths_str: str | None, allow_bom: bool = False, max_workers: int = 1,
+                 cache_path: str | None = None, force_revalidate: bool = False, batch_results: bool = False,
+                 syntax_only: bool = False, path_filter=None, dedup: bool = False,
+                 changed_since: str | None = None, archives: bool = False, fail_fast: bool = False,
+                 max_errors: int | None = None, tree_index=None,
+                 files: list[tuple] | None = None, deleted: list[str] = ()):
         super().__init__()
         self.directory_path = directory_path.rstrip()
         self.dtd_paths = [path.strip() for path in dtd_paths_str.split(';') if path.strip()] if dtd_paths_str else []
         self.allow_bom = allow_bom
+        self.tree_index = tree_index
+        self.files = files
+        self.deleted = deleted
         self.signals = WorkerSignals()
-        self.dtds = []
-        self.recovering_parser = etree.XMLParser(recover=True, dtd_validation=False)
+        self.engine = ValidationEngine(
+            self.directory_path, self.dtd_paths, allow_bom, max_workers,
+            cache_path=cache_path, force_revalidate=force_revalidate, syntax_only=syntax_only,
+            path_filter=path_filter, dedup=dedup, changed_since=changed_since,
+            archives=archives, fail_fast=fail_fast, max_errors=max_errors,
+            on_result=self.signals.file_processed.emit,
+            on_batch=self.signals.results_batch.emit if batch_results else None,
+            on_discovered=self.signals.progress_discovered.emit,
+            on_total=self.signals.progress_max_set.emit,
+            on_stats=self.signals.stats_updated.emit,
+        )
+
+    def cancel(self):
+        """Asks the engine to stop; 'finished' is still emitted once it has."""
+        self.engine.cancel()
 
     def run(self):
         """
-        Main worker logic. Scans for files and validates them.
+        Main worker logic. Discovers files and validates them as they arrive.
         """
         try:
-            files_to_validate = []
-            valid_extensions = (".json", ".xml", ".xliff", ".xlf", ".po", ".yaml", ".yml", ".dita")
-
-            for root, _, files in os.walk(self.directory_path):
-                for filename in files:
-                    extension = os.path.splitext(filename)[1].lower()
-                    if extension in valid_extensions:
-                        file_path = os.path.join(root, filename)
-                        files_to_validate.append((file_path, extension))
-
-            self.signals.progress_max_set.emit(len(files_to_validate))
-
-            if self.dtd_paths:
-                for dtd_path in self.dtd_paths:
-                    if not os.path.isfile(dtd_path):
-                        self.signals.file_processed.emit(f"DTD: {os.path.basename(dtd_path)}", ["Error: File not found"])
-                    else:
-                        try:
-                            with open(dtd_path, "rb") as f:
-                                dtd_obj = etree.DTD(f)
-                            self.dtds.append(dtd_obj)
-                            self.signals.file_processed.emit(f"DTD: {os.path.basename(dtd_path)}", ["Successfully loaded"])
-                        except Exception as e:
-                            self.signals.file_processed.emit(f"DTD: {os.path.basename(dtd_path)}", [f"Error parsing DTD: {e}"])
-
-            for file_path, extension in files_to_validate:
-                results = self._validate_file(file_path, extension)
-                self.signals.file_processed.emit(file_path, results)
-
+            if self.tree_index is not None:
+                self.tree_index.build()
+            self.engine.run(self.files, self.deleted)
+        except GitError as e:
+            logging.error(f"Cannot list changed files: {e}")
+            self.signals.error.emit("Git Error", f"Cannot list changed files: {e}")
         except Exception as e:
             logging.error(f"Critical worker error: {e}", exc_info=True)
             self.signals.error.emit("Worker Error", f"An unexpected error occurred: {e}")
         finally:
             self.signals.finished.emit()
 
-    def _validate_file(self, file_path: str, extension: str) -> list[str]:
-        """
-        Validates a single file, returning a list of result messages.
-        """
-        try:
-            if extension == ".json":
-                json_encoding = "utf-8-sig" if self.allow_bom else "utf-8"
-                with open(file_path, "r", encoding=json_encoding) as json_file:
-                    json.load(json_file)
-                return ["Valid JSON"]
-
-            elif extension in (".xml", ".dita", ".xliff", ".xlf"):
-                error_messages = []
-                with open(file_path, "rb") as f:
-                    doc = etree.parse(f, self.recovering_parser)
-
-                for error in self.recovering_parser.error_log:
-                    if "EntityRef: expecting" in error.message:
-                         msg = f"L{error.line}, C{error.column}: Unescaped ampersand '&' must be written as '&amp;'."
-                    else:
-                        msg = f"L{error.line}, C{error.column}: {error.message}"
-                    error_messages.append(msg)
-
-                if not error_messages and self.dtds:
-                    is_dtd_valid = False
-                    last_dtd_errors = []
-                    for dtd in self.dtds:
-                        if dtd.validate(doc):
-                            is_dtd_valid = True
-                            last_dtd_errors.clear()
-                            break
-                        else:
-                            last_dtd_errors = [f"L{e.line}, C{e.column}: {e.message}" for e in dtd.error_log]
-
-                    if not is_dtd_valid:
-                        error_messages.extend(last_dtd_errors)
-
-                if error_messages:
-                    return error_messages
-
-                if self.dtds:
-                    return ["Valid and DTD compliant"]
-                else:
-                    return ["Valid"]
-
-            elif extension == ".po":
-                polib.pofile(file_path)
-                return ["Valid PO"]
-
-            elif extension in (".yaml", ".yml"):
-                yaml_encoding = "utf-8-sig" if self.allow_bom else "utf-8"
-                yaml = ruamel.yaml.YAML(typ='safe')
-                with open(file_path, "r", encoding=yaml_encoding) as yaml_file:
-                    yaml.load(yaml_file)
-                return ["Valid YAML"]
+class ExportSignals(QObject):
+    """
+    Defines signals available from a running export.
+    """
+    progress = Signal(int)
+    finished = Signal(str)
+    error = Signal(str, str)
 
-            else:
-                return ["Unsupported file format"]
+class ExportWorker(QRunnable):
+    """
+    Writes a report from a ResultStore on a pool thread, streaming rows to disk.
+    Only the rows present when the worker is created are exported; the store
+    must not be cleared while the export runs.
+    """
+    def __init__(self, export_path: str, store, stats: dict | None = None):
+        super().__init__()
+        self.export_path = export_path
+        self.store = store
+        self.row_count = len(store)
+        self.stats = stats
+        self.signals = ExportSignals()
 
+    def run(self):
+        try:
+            results = self.store.results(self.row_count)
+            export_results(self.export_path, results, self.stats, progress=self.signals.progress.emit)
+            self.signals.finished.emit(self.export_path)
         except Exception as e:
-            return [f"Critical Error: {e}"]
+            logging.error(f"Export error: {e}", exc_info=True)
+            self.signals.error.emit("Export Failed", f"Could not save the report: {e}")